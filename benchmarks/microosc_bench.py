@@ -0,0 +1,376 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+#
+# SPDX-License-Identifier: MIT
+
+"""Micro-benchmarks of MicroOSC encode, decode and dispatch, with regression checks.
+
+Run in CPython from the repository root:
+
+    python benchmarks/microosc_bench.py                      # print results
+    python benchmarks/microosc_bench.py --save base.json     # store a baseline
+    python benchmarks/microosc_bench.py --compare base.json  # exit 1 on regression
+    python benchmarks/microosc_bench.py --drop-rate          # UDP loss by SO_RCVBUF size
+
+For each benchmark the results are ns per op, ops per second, and the peak
+bytes allocated while doing one op (measured with tracemalloc).
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+from array import array
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import microosc  # noqa: E402  pylint: disable=wrong-import-position
+import microosc_clients  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def bench_create():
+    msg = microosc.OscMsg("/1/xy1", [0.99, 0.3], ("f", "f"))
+    buf = bytearray(128)
+    return lambda: microosc.create_osc_packet(msg, buf)
+
+
+def bench_create_mixed():
+    msg = microosc.OscMsg("/1/message", [1, 0.5, "hello there"], ("i", "f", "s"))
+    buf = bytearray(128)
+    return lambda: microosc.create_osc_packet(msg, buf)
+
+
+def bench_parse():
+    buf = bytearray(128)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/1/xy1", [0.99, 0.3], ("f", "f")), buf
+    )
+    return lambda: microosc.parse_osc_packet(buf, size)
+
+
+def bench_parse_reuse():
+    buf = bytearray(128)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/1/xy1", [0.99, 0.3], ("f", "f")), buf
+    )
+    msg = microosc.MutableOscMsg()
+    return lambda: microosc.parse_osc_packet(buf, size, msg)
+
+
+def bench_pack_string():
+    buf = bytearray(64)
+    return lambda: microosc.pack_string("/1/fader3", buf, 0)
+
+
+def bench_read_string():
+    buf = bytearray(64)
+    microosc.pack_string("/1/fader3", buf, 0)
+    return lambda: microosc.read_string(buf, 0)
+
+
+def bench_create_array():
+    bins = array("f", [i / 256 for i in range(256)])
+    msg = microosc.OscMsg("/spectrum", bins, "f" * 256)
+    buf = bytearray(1300)
+    return lambda: microosc.create_osc_packet(msg, buf)
+
+
+def bench_parse_array():
+    buf = bytearray(1300)
+    bins = array("f", [i / 256 for i in range(256)])
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/spectrum", bins, "f" * 256), buf
+    )
+    out = array("f", bins)
+    return lambda: microosc.parse_osc_array(buf, size, out)
+
+
+def make_bench_dispatch(num_routes):
+    """Dispatch to the last of num_routes routes, plus the catch-all "/" route"""
+
+    def bench():
+        handler = lambda msg: None  # noqa: E731
+        dispatch_map = {"/": handler}
+        for i in range(num_routes):
+            dispatch_map["/route%d/fader" % i] = handler
+        dispatcher = microosc.OSCDispatcher(dispatch_map)
+        msg = microosc.OscMsg("/route%d/fader" % (num_routes - 1), [0.5], ("f",))
+        return lambda: dispatcher._dispatch(msg)  # pylint: disable=protected-access
+
+    return bench
+
+
+def bench_handle_packet():
+    """Parse and dispatch one of 40 routes, as a server does for each packet"""
+    handler = lambda msg: None  # noqa: E731
+    dispatch_map = {"/": handler}
+    for i in range(40):
+        dispatch_map["/mixer/ch%d/fader" % i] = handler
+    dispatcher = microosc.OSCDispatcher(dispatch_map)
+    buf = bytearray(128)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/mixer/ch39/fader", [0.5], ("f",)), buf
+    )
+    return lambda: dispatcher._handle_packet(buf, size)  # pylint: disable=protected-access
+
+
+def make_bench_wide(lazy):
+    """Parse and dispatch a 64-argument message whose handler reads only the first argument"""
+
+    def bench():
+        dispatcher = microosc.OSCDispatcher({"/wide": lambda msg: msg.args[0]})
+        dispatcher.lazy_args = lazy
+        buf = bytearray(512)
+        args = [i if i % 2 else "s%d" % i for i in range(64)]
+        types = ["i" if i % 2 else "s" for i in range(64)]
+        size = microosc.create_osc_packet(microosc.OscMsg("/wide", args, types), buf)
+        return lambda: dispatcher._handle_packet(buf, size)  # pylint: disable=protected-access
+
+    return bench
+
+
+def make_bench_channel(schema):
+    """Parse and dispatch a ",fif" mixer channel message, to a handler or a bound schema"""
+
+    def bench():
+        dispatcher = microosc.OSCDispatcher({"/mixer": lambda msg: msg.args[0]})
+        if schema:
+            dispatcher.bind("/mixer/ch/{n}", ",fif", lambda n, gain, mute, pan: gain)
+        buf = bytearray(128)
+        msg = microosc.OscMsg("/mixer/ch/7", [0.5, 1, -0.25], "fif")
+        size = microosc.create_osc_packet(msg, buf)
+        return lambda: dispatcher._handle_packet(buf, size)  # pylint: disable=protected-access
+
+    return bench
+
+
+def bench_handle_malformed():
+    """Reject a flood of truncated, misaligned and corrupted packets"""
+    dispatcher = microosc.OSCDispatcher({"/": lambda msg: None})
+    good = bytearray(128)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/mixer/ch39/fader", [0.5, 1], "fi"), good
+    )
+    packets = [
+        (bytearray(good), size - 4),  # truncated argument
+        (bytearray(good), size - 1),  # not a multiple of 4
+        (bytearray(b"/abc" + b"\xff" * 124), 32),  # address not terminated
+        (
+            bytearray(b"#bundle\x00" + b"\x00" * 8 + b"\x7f\xff\xff\xf0" + bytes(108)),
+            32,
+        ),
+        (bytearray(b"\x00" * 128), 32),
+    ]
+    state = [0]
+
+    def bench():
+        i = state[0] = (state[0] + 1) % len(packets)
+        dispatcher._handle_packet(*packets[i])  # pylint: disable=protected-access
+
+    return bench
+
+
+def make_bench_send_64(queued):
+    """Send 64 messages to a localhost UDP socket, one datagram each or queued into bundles"""
+
+    def bench():
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(("127.0.0.1", 0))  # never read, the kernel drops what does not fit
+        port = sink.getsockname()[1]
+        if queued:
+            client = microosc_clients.QueuedOSCClient(socket, "127.0.0.1", port)
+        else:
+            client = microosc.OSCClient(socket, "127.0.0.1", port)
+        msgs = [
+            microosc.OscMsg("/mixer/ch%d/fader" % i, [i / 64], ("f",))
+            for i in range(64)
+        ]
+
+        def send_all():
+            for msg in msgs:
+                client.send(msg)
+            if queued:
+                client.flush()
+
+        send_all.sink = sink  # keep it open
+        return send_all
+
+    return bench
+
+
+class _Loopback:
+    """OSCClient sending to an OSCServer over UDP on localhost"""
+
+    def __init__(self):
+        self.server = microosc.OSCServer(
+            socket, "127.0.0.1", 0, {"/": lambda msg: None}, batch_size=64
+        )
+        port = self.server._sock.getsockname()[1]  # pylint: disable=protected-access
+        self.client = microosc.OSCClient(socket, "127.0.0.1", port)
+        self.msg = microosc.OscMsg("/1/xy1", [0.99, 0.3], ("f", "f"))
+
+    def __call__(self):
+        self.client.send(self.msg)
+        while not self.server.poll_batch(1)[0]:
+            pass
+
+
+BENCHMARKS = {
+    "create_osc_packet": bench_create,
+    "create_osc_packet_mixed": bench_create_mixed,
+    "parse_osc_packet": bench_parse,
+    "parse_osc_packet_reuse": bench_parse_reuse,
+    "pack_string": bench_pack_string,
+    "read_string": bench_read_string,
+    "create_osc_packet_256f": bench_create_array,
+    "parse_osc_array_256f": bench_parse_array,
+    "dispatch_1": make_bench_dispatch(1),
+    "dispatch_10": make_bench_dispatch(10),
+    "dispatch_100": make_bench_dispatch(100),
+    "dispatch_1000": make_bench_dispatch(1000),
+    "handle_packet": bench_handle_packet,
+    "handle_packet_malformed": bench_handle_malformed,
+    "handle_packet_channel": make_bench_channel(False),
+    "handle_packet_channel_schema": make_bench_channel(True),
+    "handle_packet_wide": make_bench_wide(False),
+    "handle_packet_wide_lazy": make_bench_wide(True),
+    "send_64": make_bench_send_64(False),
+    "send_64_queued": make_bench_send_64(True),
+    "udp_roundtrip": _Loopback,
+}
+
+
+def measure(func, iterations, repeat=5):
+    """Return best-of-repeat ns per op, and the peak bytes allocated during one op"""
+    func()  # warm up caches
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            func()
+        elapsed = (time.perf_counter_ns() - start) / iterations
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return best, max(peak, 0)
+
+
+def run_benchmarks(names=None, iterations=20000):
+    """Run benchmarks, return dict of name -> result dict"""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        n = iterations // 20 if name == "udp_roundtrip" else iterations
+        ns_per_op, alloc = measure(setup(), n)
+        results[name] = {
+            "ns_per_op": round(ns_per_op, 1),
+            "ops_per_sec": round(1e9 / ns_per_op),
+            "peak_alloc_bytes": alloc,
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return list of regressions of results past threshold (a fraction) against baseline"""
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if res["ns_per_op"] > base["ns_per_op"] * (1 + threshold):
+            regressions.append(
+                "%s: %.1f ns/op vs baseline %.1f"
+                % (name, res["ns_per_op"], base["ns_per_op"])
+            )
+        if res["peak_alloc_bytes"] > base["peak_alloc_bytes"] * (1 + threshold) + 64:
+            regressions.append(
+                "%s: %d bytes allocated vs baseline %d"
+                % (name, res["peak_alloc_bytes"], base["peak_alloc_bytes"])
+            )
+    return regressions
+
+
+def drop_rate(rcvbuf, count=20000, pause=0.05):
+    """
+    Send count packets over localhost as fast as possible while the server is
+    busy (not polling), then drain them, as happens when a main loop is slow.
+    Return the fraction of packets lost because the kernel receive buffer filled.
+    """
+    received = [0]
+
+    def handler(msg):  # pylint: disable=unused-argument
+        received[0] += 1
+
+    server = microosc.OSCServer(
+        socket, "127.0.0.1", 0, {"/": handler}, batch_size=256, rcvbuf=rcvbuf
+    )
+    port = server._sock.getsockname()[1]  # pylint: disable=protected-access
+    client = microosc.OSCClient(socket, "127.0.0.1", port)
+    msg = microosc.OscMsg("/1/xy1", [0.99, 0.3], ("f", "f"))
+    for _ in range(count):
+        client.send(msg)
+    time.sleep(pause)
+    while server.poll_batch()[0]:
+        pass
+    server._sock.close()  # pylint: disable=protected-access
+    client._sock.close()  # pylint: disable=protected-access
+    return 1 - received[0] / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run, default all")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--save", metavar="JSON", help="write results to this file")
+    parser.add_argument(
+        "--compare", metavar="JSON", help="baseline results to compare to"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown, default 0.25 (25%%)",
+    )
+    parser.add_argument(
+        "--drop-rate",
+        action="store_true",
+        help="measure UDP loss for some SO_RCVBUF sizes",
+    )
+    args = parser.parse_args()
+
+    if args.drop_rate:
+        print("%-26s %12s" % ("SO_RCVBUF", "dropped"))
+        for rcvbuf in (0, 1 << 20, 4 << 20):
+            print("%-26s %11.1f%%" % (rcvbuf or "default", 100 * drop_rate(rcvbuf)))
+        return
+
+    results = run_benchmarks(args.names, args.iterations)
+    print("%-26s %12s %12s %10s" % ("benchmark", "ns/op", "ops/s", "alloc B"))
+    for name, res in results.items():
+        print(
+            "%-26s %12.1f %12d %10d"
+            % (name, res["ns_per_op"], res["ops_per_sec"], res["peak_alloc_bytes"])
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
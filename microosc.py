@@ -17,9 +17,25 @@ Implementation Notes
 This is a minimal OSC library.  It can parse and emit OSC packets with the
 following OSC data types:
 
-* floating point numbers ("float32")
-* integer numbers ("int32")
-* strings
+* floating point numbers ("float32" 'f', "float64" 'd')
+* integer numbers ("int32" 'i', "int64" 'h')
+* strings ('s', and symbols 'S') and single characters ('c')
+* blobs of bytes ('b')
+* OSC Time Tags ('t'), RGBA colors ('r') and MIDI messages ('m')
+* True ('T'), False ('F'), Nil ('N') and Impulse ('I'), which have no data
+* arrays ('[' and ']'), as nested lists
+
+OSC Bundles (including nested bundles) can be parsed and sent, and a server
+can hold time-tagged bundles until they are due.
+
+Optional layers built on this module are in their own modules: stream
+transports (TCP, serial, pipes) in `microosc_stream`, fan-out, coalescing and
+queued senders in `microosc_clients`, and for CPython only, `microosc_asyncio`,
+`microosc_workers` and `microosc_capture`.
+
+For boards where garbage collection pauses matter, `OSCServer` and `OSCClient`
+have a static memory mode (``static_addresses``), in which sending and
+receiving messages with numeric arguments allocates nothing once warmed up.
 
 
 **Hardware:**
@@ -54,26 +70,146 @@ __repo__ = "https://github.com/todbot/CircuitPython_MicroOSC.git"
 
 
 import sys
+import time
 import struct
 from collections import namedtuple
 
 impl = sys.implementation.name
 DEBUG = False
 
+# exceptions raised while parsing a malformed packet
+_PARSE_ERRORS = (ValueError, IndexError, UnicodeError)
+if hasattr(struct, "error"):
+    _PARSE_ERRORS += (struct.error,)
+
+# exceptions that encoding into a too small buffer may raise
+try:
+    _OVERFLOW_ERRORS = _PARSE_ERRORS + (BufferError,)
+except NameError:  # no BufferError in CircuitPython
+    _OVERFLOW_ERRORS = _PARSE_ERRORS
+
+if hasattr(struct, "Struct"):
+    _Struct = struct.Struct
+else:
+
+    class _Struct:
+        """Minimal stand-in for `struct.Struct` where it is not available"""
+
+        def __init__(self, fmt):
+            self.format = fmt
+            self.size = struct.calcsize(fmt)
+
+        def unpack_from(self, data, offset=0):
+            """Unpack values from data at offset"""
+            return struct.unpack_from(self.format, data, offset)
+
+        def pack_into(self, data, offset, *values):
+            """Pack values into data at offset"""
+            struct.pack_into(self.format, data, offset, *values)
+
+
+_struct_pack_into = _Struct.pack_into
+
 if impl == "circuitpython":
     # these defines are not yet in CirPy socket, known to work for ESP32 native WiFI
     IPPROTO_IP = 0  # super secret from @jepler
     IP_MULTICAST_TTL = 5  # super secret from @jepler
+    # the rest are lwIP's values too
+    IP_ADD_MEMBERSHIP = 3
+    IP_DROP_MEMBERSHIP = 4
+    IP_MULTICAST_IF = 6
+    IP_MULTICAST_LOOP = 7
+    SOL_SOCKET = 0xFFF
+    SO_SNDBUF = 0x1001
+    SO_RCVBUF = 0x1002
 else:
     import socket
 
     IPPROTO_IP = socket.IPPROTO_IP
     IP_MULTICAST_TTL = socket.IP_MULTICAST_TTL
+    IP_ADD_MEMBERSHIP = socket.IP_ADD_MEMBERSHIP
+    IP_DROP_MEMBERSHIP = socket.IP_DROP_MEMBERSHIP
+    IP_MULTICAST_IF = socket.IP_MULTICAST_IF
+    IP_MULTICAST_LOOP = socket.IP_MULTICAST_LOOP
+    SOL_SOCKET = socket.SOL_SOCKET
+    SO_SNDBUF = socket.SO_SNDBUF
+    SO_RCVBUF = socket.SO_RCVBUF
+
+
+def is_multicast(host):
+    """True if host is an IPv4 multicast address, 224.0.0.0 to 239.255.255.255"""
+    first = host.split(".", 1)[0]
+    return first.isdigit() and 224 <= int(first) <= 239
+
+
+def _inet_aton(host):
+    """The 4 bytes of a dotted-quad IPv4 address"""
+    return bytes(int(part) for part in host.split("."))
+
+
+def _multicast_sender(sock, ttl=2, interface=None, loop=None):
+    """Set a socket's multicast TTL, and if given its outgoing interface and loopback"""
+    sock.setsockopt(IPPROTO_IP, IP_MULTICAST_TTL, ttl)
+    if interface is not None:
+        sock.setsockopt(IPPROTO_IP, IP_MULTICAST_IF, _inet_aton(interface))
+    if loop is not None:
+        sock.setsockopt(IPPROTO_IP, IP_MULTICAST_LOOP, int(bool(loop)))
 
 
 OscMsg = namedtuple("OscMsg", ["addr", "args", "types"])
 """Objects returned by `parse_osc_packet()`"""
 
+
+class MutableOscMsg:
+    """
+    An `OscMsg`-compatible message whose fields can be overwritten, so one
+    object can be reused for every packet parsed. Pass one as the ``msg``
+    argument of `parse_osc_packet()`. Handlers receiving one must copy out any
+    values they want to keep, as the next packet will overwrite them.
+    """
+
+    __slots__ = ("addr", "args", "types", "_lists")
+
+    def __init__(self, addr="", args=None, types=None):
+        self.addr = addr
+        self.args = [] if args is None else args
+        self.types = [] if types is None else types
+        self._lists = None  # in static memory mode: number of args -> list for them
+
+    def _args_for(self, count):
+        """Switch args to a kept list of count items, to be overwritten in place"""
+        args = self._lists.get(count)
+        if args is None:
+            # odd traffic, start over rather than grow forever
+            if len(self._lists) >= 16:
+                self._lists.clear()
+            args = self._lists[count] = [None] * count
+        self.args = args
+        return args
+
+    def __iter__(self):
+        return iter((self.addr, self.args, self.types))
+
+    def __getitem__(self, i):
+        return (self.addr, self.args, self.types)[i]
+
+    def __repr__(self):
+        return "MutableOscMsg(addr=%r, args=%r, types=%r)" % tuple(self)
+
+
+OscBundle = namedtuple("OscBundle", ["timetag", "contents"])
+"""Objects returned by `parse_osc_packet()` when given an OSC Bundle.
+``timetag`` is a 64-bit NTP-format OSC Time Tag, ``contents`` is a list of
+`OscMsg` and (nested) `OscBundle` objects"""
+
+BUNDLE_TAG = b"#bundle\x00"
+"""The OSC-string that starts every OSC Bundle"""
+
+TIMETAG_IMMEDIATELY = 1
+"""The special OSC Time Tag that means dispatch immediately"""
+
+NTP_UNIX_OFFSET = 2208988800  # seconds from 1900-01-01 (NTP epoch) to 1970-01-01
+
 # fmt: off
 default_dispatch_map = {
     "/": lambda msg: print("default_map:", msg.addr, msg.args)
@@ -82,9 +218,24 @@ default_dispatch_map = {
 # fmt: on
 
 
-def read_string(data, pos):
-    """Read padded string from a position, return string and new end pos"""
-    str_end = data.index(b"\x00", pos)  # from pos find null
+def timetag_from_time(t):
+    """Convert a Unix time in seconds (e.g. from `time.time()`) to an OSC Time Tag"""
+    secs = int(t)
+    frac = int((t - secs) * 4294967296)  # 2**32
+    return ((secs + NTP_UNIX_OFFSET) << 32) | frac
+
+
+def time_from_timetag(timetag):
+    """Convert an OSC Time Tag to a Unix time in seconds"""
+    return (timetag >> 32) - NTP_UNIX_OFFSET + (timetag & 0xFFFFFFFF) / 4294967296
+
+
+def read_string(data, pos, end=None):
+    """
+    Read padded string from a position, return string and new end pos.
+    If end is given, the string's null must come before it, or ValueError is raised.
+    """
+    str_end = data.index(b"\x00", pos, end)  # from pos find null
     str_len = str_end - pos
     padded_len = (str_len // 4 + 1) * 4  # account for variable null-padding
     return str(data[pos : pos + str_len], "ascii"), pos + padded_len
@@ -92,39 +243,408 @@ def read_string(data, pos):
 
 def pack_string(astr, data, pos):
     """Pack a string s into data bytearray at position pos, returns new end pos"""
-    n = len(astr) + 1  # for the added extra \x00
-    pos_end = pos + n
-    data[pos:pos_end] = bytes(astr + "\x00", "ascii")
-    if pad_needed := n % 4:
-        extra = 4 - pad_needed
-        data[pos_end : pos_end + extra] = bytes("\x00" * extra, "ascii")
-        pos_end = pos_end + extra
+    return _pack_padded(astr, data, pos, pos)
+
+
+def _pack_padded(astr, data, start, pos):
+    """Write astr at pos, then the nulls ending and padding the OSC-string begun at start"""
+    end = pos + len(astr)
+    data[pos:end] = bytes(astr, "ascii")
+    pos_end = start + ((end - start) // 4 + 1) * 4
+    while end < pos_end:
+        data[end] = 0
+        end += 1
     return pos_end
 
 
-def parse_osc_packet(data, packet_size):  # pylint: disable=unused-variable
+def parse_osc_packet(data, packet_size, msg=None, addr_cache=None):
     """Parse OSC packets into OscMsg objects.
 
     OSC packets contain, in order
 
       - a string that is the OSC Address (null-terminated), e.g. "/1/faderB"
-      - a tag-type string starting with ',' and one or more 'f', 'i', 's' types,
+      - a tag-type string starting with ',' and one or more OSC types, e.g. 'f', 'i', 's'
         (optional, null-terminated), e.g. ",ffi" indicates two float32s, one int32
       - zero or more OSC Arguments in binary form, depending on tag-type string
 
     OSC packet size is always a multiple of 4
 
+    Parsing never reads past packet_size, so stale bytes after the packet in a
+    reused buffer are ignored. A packet that is not a multiple of 4 bytes, does
+    not start with '/' or "#bundle", or is too short for its strings and
+    arguments raises ValueError (or IndexError, UnicodeError or struct.error,
+    see ``_PARSE_ERRORS``) before or while its arguments are decoded.
+
+    If the packet is an OSC Bundle (starts with "#bundle"), an OscBundle is
+    returned instead, containing the OscMsgs and any nested OscBundles.
+
+    Arguments are decoded directly from data, without slicing it, and runs of
+    numeric arguments are decoded with one cached `struct` format per type-tag string.
+    Blob ('b') arguments are returned as memoryviews into data, so copy them
+    (e.g. with `bytes()`) if they must outlive the next packet received into data.
+    Array ('[' ... ']') arguments are returned as nested lists.
+
     :param bytearray data: a data buffer containing a binary OSC packet
     :param int packet_size: the size of the OSC packet (may be smaller than len(data))
+    :param MutableOscMsg msg: optional message object to parse into instead of
+      allocating a new OscMsg, it is returned filled in (not used for OSC Bundles)
+    :param dict addr_cache: optional dict of raw OSC Address bytes to address strings,
+      filled in as packets are parsed, so a repeated address is not decoded again
+      and every message with it shares one string. It is cleared if it grows past
+      256 addresses.
     """
     # examples of OSC packets
     # https://opensoundcontrol.stanford.edu/spec-1_0-examples.html
     # spec: https://opensoundcontrol.stanford.edu/spec-1_0.html#osc-packets
 
-    dpos = 0
-    oscaddr, dpos = read_string(data, dpos)
-    osctypes, dpos = read_string(data, dpos)
-    osctypes = osctypes[1:]  # first element is ',' separator
+    if packet_size & 3 or not 4 <= packet_size <= len(data):
+        raise ValueError("bad OSC packet size %d" % packet_size)
+    if data[0] == 0x23:  # '#', OSC addresses always start with '/'
+        return _parse_bundle(data, 0, packet_size, addr_cache)
+    return _parse_message(data, 0, packet_size, msg, addr_cache)
+
+
+_ADDR_CACHE_MAX = 256
+_MAX_NESTING = 32  # deepest nesting of bundles, or of arrays, a packet may have
+
+
+def _read_addr(data, pos, addr_cache, end=None):
+    """Like read_string(), but reusing the string from addr_cache for known addresses"""
+    str_end = data.index(b"\x00", pos, end)
+    key = bytes(memoryview(data)[pos:str_end])  # one copy, not slice then copy
+    addr = addr_cache.get(key)
+    if addr is None:
+        if len(addr_cache) >= _ADDR_CACHE_MAX:
+            addr_cache.clear()  # odd traffic, start over rather than grow forever
+        addr = addr_cache[key] = str(key, "ascii")
+    return addr, pos + ((str_end - pos) // 4 + 1) * 4
+
+
+class _StaticStrings:
+    """
+    Preallocated table of the OSC Address and type-tag strings seen, for static
+    memory mode. `read()` finds a known string in a packet by comparing bytes
+    in place, so it is returned without allocating anything.
+    Strings are looked up by length, then by the byte where strings of that
+    length differ most, e.g. the channel digit in "/mixer/ch1/fader".
+    """
+
+    def __init__(self, size):
+        """:param int size: most strings kept, others are decoded as usual"""
+        self.size = size
+        self.count = 0
+        # per skip: length -> [offset, {byte: [(raw, str)]}, entries]
+        self._tables = ({}, {})
+
+    def read(self, data, pos, skip, end=None):
+        """Like read_string(), dropping the first skip chars (1 for the ',' of type tags)"""
+        str_end = data.index(b"\x00", pos, end)
+        n = str_end - pos
+        end = pos + (n // 4 + 1) * 4
+        bucket = self._tables[skip].get(n)
+        if bucket is not None:
+            found = bucket[1].get(data[pos + bucket[0]]) if n else bucket[2]
+            if found is not None:
+                for raw, value in found:
+                    if data.startswith(raw, pos):
+                        return value, end
+        raw = bytes(data[pos:str_end])
+        value = str(raw[skip:], "ascii")
+        if self.count < self.size:
+            self.count += 1
+            self._add(self._tables[skip], n, raw, value)
+        return value, end
+
+    @staticmethod
+    def _add(table, n, raw, value):
+        """Add a string, and re-pick the byte offset that best tells its bucket apart"""
+        bucket = table.get(n)
+        if bucket is None:
+            bucket = table[n] = [0, {}, []]
+        entries = bucket[2]
+        entries.append((raw, value))
+        best = 0
+        for i in range(n):
+            distinct = len({entry[0][i] for entry in entries})
+            if distinct > best:
+                best, bucket[0] = distinct, i
+        by_byte = {}
+        for entry in entries:
+            by_byte.setdefault(entry[0][bucket[0]] if n else 0, []).append(entry)
+        bucket[1] = by_byte
+
+
+def _parse_bundle(data, dpos, end, addr_cache=None, depth=0):
+    """Parse the OSC Bundle in data[dpos:end], return an OscBundle"""
+    if depth >= _MAX_NESTING:
+        raise ValueError("OSC Bundles nested too deeply")
+    if dpos + 16 > end or not data.startswith(BUNDLE_TAG, dpos):
+        raise ValueError("bad OSC Bundle header")
+    timetag = struct.unpack_from(">Q", data, dpos + 8)[0]
+    dpos += 16  # "#bundle\0" + timetag
+    contents = []
+    while dpos + 4 <= end:
+        elem_size = struct.unpack_from(">i", data, dpos)[0]
+        dpos += 4
+        elem_end = dpos + elem_size
+        if elem_size < 4 or elem_size & 3 or elem_end > end:
+            raise ValueError("bad OSC Bundle element size %d" % elem_size)
+        if data[dpos] == 0x23:  # nested bundle
+            contents.append(_parse_bundle(data, dpos, elem_end, addr_cache, depth + 1))
+        else:
+            contents.append(_parse_message(data, dpos, elem_end, None, addr_cache))
+        dpos = elem_end
+    return OscBundle(timetag=timetag, contents=contents)
+
+
+class _Impulse:
+    """Type of `IMPULSE`"""
+
+    # pylint: disable=too-few-public-methods
+    def __repr__(self):
+        return "IMPULSE"
+
+
+IMPULSE = _Impulse()
+"""Value of OSC 'I' (Impulse, aka "Infinitum" or "Bang") arguments"""
+
+# fixed-size OSC types and their struct format chars, decoded in runs
+_ARG_FORMATS = {
+    "f": "f",  # float32
+    "i": "i",  # int32
+    "h": "q",  # int64
+    "t": "Q",  # OSC Time Tag
+    "d": "d",  # float64
+    "r": "I",  # RGBA color as uint32
+    "m": "4s",  # MIDI message: port id, status byte, data1, data2
+}
+# how to coerce an argument to its fixed-size type, if struct won't take it as is
+_ARG_COERCE = {
+    "f": float,
+    "i": int,
+    "h": int,
+    "t": int,
+    "d": float,
+    "r": int,
+    "m": bytes,
+}
+
+try:
+    from array import array
+except ImportError:
+    array = None
+
+# numeric OSC types whose runs are copied to/from `array.array` in one operation,
+# with their array typecodes. Needs array.byteswap(), which CircuitPython lacks,
+# so there runs are done with one repeated-format struct instead.
+_ARRAY_CODES = {}
+if array is not None and hasattr(array, "byteswap"):
+    for _otype, _code in (
+        ("f", "f"),
+        ("d", "d"),
+        ("i", "i"),
+        ("h", "q"),
+        ("t", "Q"),
+        ("r", "I"),
+    ):
+        if array(_code).itemsize == struct.calcsize(_ARG_FORMATS[_otype]):
+            _ARRAY_CODES[_otype] = _code
+_SWAP = getattr(sys, "byteorder", "little") == "little"  # OSC is big-endian
+# numpy dtypes of the numeric OSC types, for ndarray arguments
+_NUMPY_DTYPES = {"f": ">f4", "d": ">f8", "i": ">i4", "h": ">i8", "t": ">u8", "r": ">u4"}
+_BULK_MIN = 8  # shorter runs are packed by struct, it is as fast
+
+
+def _pack_bulk(values, otype, data, pos, end):
+    """
+    Copy an `array.array` or numpy ndarray of n args of one OSC type into
+    data[pos:end] as big-endian, in one operation. Returns False if values
+    cannot be copied this way (e.g. an array of another type).
+    """
+    if hasattr(values, "dtype"):  # numpy converts and byteswaps on assignment
+        view = sys.modules["numpy"].frombuffer(
+            data, _NUMPY_DTYPES[otype], len(values), pos
+        )
+        view[:] = values
+        return True
+    if getattr(values, "typecode", None) != _ARRAY_CODES.get(otype) or end > len(data):
+        return False  # let struct convert it, or raise on overflow
+    if _SWAP:
+        values = array(values.typecode, values)  # copy, to byteswap
+        values.byteswap()
+    data[pos:end] = values
+    return True
+
+
+def parse_osc_array(data, packet_size, out=None):
+    """
+    Parse an OSC Message whose arguments are all one numeric type, like
+    ",fff...f" spectrum bins or ",iii...i" LED frames, into an array in one
+    operation, without building a list of Python numbers.
+
+    On CPython the args are an `array.array`, copied and byteswapped in bulk,
+    or are written into ``out`` if it is given, which may also be a numpy ndarray.
+    On CircuitPython they are decoded with one repeated-format struct.
+
+    :param bytearray data: a data buffer containing a binary OSC packet
+    :param int packet_size: the size of the OSC packet (may be smaller than len(data))
+    :param out: optional `array.array` (of the matching typecode) or ndarray
+      to decode into, its length must be the number of arguments
+    :return OscMsg: the message, with args an array (or ``out``)
+    """
+    if packet_size > len(data):
+        raise ValueError("bad OSC packet size %d" % packet_size)
+    addr, osctypes, dpos = _read_header(data, 0, packet_size, None)
+    n = len(osctypes)
+    otype = osctypes[0] if n else "f"
+    if otype not in _NUMPY_DTYPES or osctypes.count(otype) != n:
+        raise ValueError("not a numeric array OSC message: ," + osctypes)
+    steps, types = _type_plan(osctypes)
+    end = dpos + n * struct.calcsize(_ARG_FORMATS[otype])
+    if end > packet_size:
+        raise ValueError("OSC packet too short for its arguments")
+    if out is not None and len(out) != n:
+        raise ValueError("out must hold %d arguments" % n)
+    if hasattr(out, "dtype"):
+        out[:] = sys.modules["numpy"].frombuffer(data, _NUMPY_DTYPES[otype], n, dpos)
+    elif otype in _ARRAY_CODES:
+        code = _ARRAY_CODES[otype]
+        if out is None:
+            out = array(code)
+            out.frombytes(memoryview(data)[dpos:end])
+        elif out.typecode != code:
+            raise ValueError("out must be an array of typecode " + repr(code))
+        else:
+            memoryview(out).cast("B")[:] = memoryview(data)[dpos:end]
+        if _SWAP:
+            out.byteswap()
+    else:
+        vals = steps[0][0].unpack_from(data, dpos) if n else ()
+        if out is None:
+            out = array(_ARG_FORMATS[otype], vals) if array is not None else list(vals)
+        else:
+            for i, val in enumerate(vals):
+                out[i] = val
+    return OscMsg(addr, out, list(types))
+
+
+def _read_blob(data, pos, end):
+    """Read an OSC blob ending before end, returning a memoryview into data and the new end pos"""
+    size = struct.unpack_from(">i", data, pos)[0]
+    if size < 0:
+        raise ValueError("negative OSC blob size")
+    pos += 4
+    if pos + size > end:
+        raise ValueError("OSC blob longer than its packet")
+    return memoryview(data)[pos : pos + size], pos + (size + 3) // 4 * 4
+
+
+def _pack_blob(blob, data, pos):
+    """Pack a bytes-like blob into data at pos, returns new end pos"""
+    size = len(blob)
+    struct.pack_into(">i", data, pos, size)
+    pos += 4
+    data[pos : pos + size] = blob
+    pos_end = pos + (size + 3) // 4 * 4
+    for i in range(pos + size, pos_end):
+        data[i] = 0
+    return pos_end
+
+
+def _read_char(data, pos, end):  # pylint: disable=unused-argument
+    return chr(struct.unpack_from(">i", data, pos)[0]), pos + 4
+
+
+def _pack_char(char, data, pos):
+    struct.pack_into(">i", data, pos, char if isinstance(char, int) else ord(char))
+    return pos + 4
+
+
+# variable-size and special OSC types:
+#   type -> (reader(data, pos, end) -> (value, pos), packer(value, data, pos) -> pos,
+#            sizer(value))
+# fmt: off
+_ARG_CODECS = {
+    "s": (read_string, pack_string, lambda arg: (len(arg) // 4 + 1) * 4),  # string
+    "S": (read_string, pack_string, lambda arg: (len(arg) // 4 + 1) * 4),  # symbol
+    "b": (_read_blob, _pack_blob, lambda arg: 4 + (len(arg) + 3) // 4 * 4),  # blob
+    "c": (_read_char, _pack_char, lambda arg: 4),  # ascii char
+    "T": (lambda data, pos, end: (True, pos), lambda arg, data, pos: pos, lambda arg: 0),
+    "F": (lambda data, pos, end: (False, pos), lambda arg, data, pos: pos, lambda arg: 0),
+    "N": (lambda data, pos, end: (None, pos), lambda arg, data, pos: pos, lambda arg: 0),
+    "I": (lambda data, pos, end: (IMPULSE, pos), lambda arg, data, pos: pos, lambda arg: 0),
+}
+# fmt: on
+
+_type_plans = {}  # cache of type-tag string -> (steps, types tuple)
+_TYPE_PLANS_MAX = 64
+
+
+def _type_plan(osctypes):
+    """
+    Compile an OSC type-tag string (without the ',') into a list of steps,
+    each a (Struct, run_types) for a run of fixed-size args, or (None, type)
+    for any other type, plus the tuple of types. Plans are cached,
+    so each type-tag string is compiled once. Raises ValueError for an unknown type,
+    as the size of its argument, and so of all that follow, is not known.
+    """
+    plan = _type_plans.get(osctypes)
+    if plan is not None:
+        return plan
+    steps = []
+    types = []
+    run = ""
+    for otype in osctypes:
+        if otype in _ARG_FORMATS:
+            run += otype
+            types.append(otype)
+            continue
+        if run:
+            steps.append((_Struct(">" + "".join(_ARG_FORMATS[t] for t in run)), run))
+            run = ""
+        if otype in _ARG_CODECS or otype in "[]":
+            steps.append((None, otype))
+            types.append(otype)
+        elif otype != "\x00":  # null padding
+            raise ValueError("unknown OSC type: " + repr(otype))
+    if run:
+        steps.append((_Struct(">" + "".join(_ARG_FORMATS[t] for t in run)), run))
+    plan = (steps, tuple(types))
+    if len(_type_plans) >= _TYPE_PLANS_MAX:
+        _type_plans.clear()  # odd traffic, start over rather than grow forever
+    _type_plans[osctypes] = plan
+    return plan
+
+
+def _read_header(data, dpos, end, addr_cache):
+    """
+    Read the OSC Address and type tags (without ',') of the message in data[dpos:end],
+    return them and the pos of the first argument
+    """
+    if data[dpos] != 0x2F:  # '/'
+        raise ValueError("OSC Address must start with '/'")
+    static = addr_cache if isinstance(addr_cache, _StaticStrings) else None
+    if static is not None:
+        oscaddr, dpos = static.read(data, dpos, 0, end)
+    elif addr_cache is None:
+        oscaddr, dpos = read_string(data, dpos, end)
+    else:
+        oscaddr, dpos = _read_addr(data, dpos, addr_cache, end)
+    osctypes = ""
+    if dpos < end:  # type tag string is optional in very old OSC senders
+        if data[dpos] != 0x2C:  # ','
+            raise ValueError("OSC type tags must start with ','")
+        if static is not None:
+            osctypes, dpos = static.read(data, dpos, 1, end)
+        else:
+            osctypes, dpos = read_string(data, dpos, end)
+            osctypes = osctypes[1:]  # first element is ',' separator
+    return oscaddr, osctypes, dpos
+
+
+def _parse_message(data, dpos, end, msg=None, addr_cache=None):
+    """Parse the OSC Message in data[dpos:end], return an OscMsg (or fill in msg)"""
+    oscaddr, osctypes, dpos = _read_header(data, dpos, end, addr_cache)
 
     # fmt: off
     if DEBUG:
@@ -132,68 +652,1332 @@ def parse_osc_packet(data, packet_size):  # pylint: disable=unused-variable
         print("oscaddr:", oscaddr, "osctypes:", osctypes)
     # fmt: on
 
-    args = []
-    types = []
+    steps, types = _type_plan(osctypes)
+    # args are written over a reused msg's args in place, so its list is not resized
+    if msg is None:
+        args = []
+    else:
+        args = msg.args
+        if len(args) != len(types) and msg._lists is not None:  # pylint: disable=protected-access
+            args = msg._args_for(len(types))  # pylint: disable=protected-access
+    outer = args
+    k = 0  # number of args written
+    stack = None
 
-    for otype in osctypes:
-        if otype == "f":  # osc float32
-            arg = struct.unpack(">f", data[dpos : dpos + 4])
-            args.append(arg[0])
-            types.append("f")
-            dpos += 4
-        elif otype == "i":  # osc int32
-            arg = struct.unpack(">i", data[dpos : dpos + 4])
-            args.append(arg[0])
-            types.append("i")
-            dpos += 4
-        elif otype == "s":  # osc string  TODO: find OSC emitter that sends string
-            arg, dpos = read_string(data, dpos)
-            args.append(arg)
-            types.append("s")
-        elif otype == "\x00":  # null padding
-            pass
+    for fmt, otype in steps:
+        if fmt is not None:  # run of fixed-size args, e.g. float32s / int32s
+            if dpos + fmt.size > end:
+                raise ValueError("OSC packet too short for its arguments")
+            n = len(otype)
+            if k == len(args):
+                args.extend(fmt.unpack_from(data, dpos))
+            else:
+                args[k : k + n] = fmt.unpack_from(data, dpos)
+            k += n
+            dpos += fmt.size
+            continue
+        if otype in _ARG_CODECS:
+            arg, dpos = _ARG_CODECS[otype][0](data, dpos, end)
+            if dpos > end:
+                raise ValueError("OSC packet too short for its arguments")
+        elif otype == "[":  # array, its args go in a nested list
+            arg = []
+        elif otype == "]":
+            if not stack:
+                raise ValueError("unbalanced ']' in OSC type tags")
+            args, k = stack.pop()
+            continue
+        if k < len(args):
+            args[k] = arg
         else:
-            args.append("unknown type:" + otype)
+            args.append(arg)
+        k += 1
+        if otype == "[":
+            if stack is None:
+                stack = []
+            elif len(stack) >= _MAX_NESTING:
+                raise ValueError("OSC arrays nested too deeply")
+            stack.append((args, k))
+            args, k = arg, 0
+    if stack:
+        k = stack[0][1]  # unclosed array, trim the outer args
+    if len(outer) > k:
+        del outer[k:]
+
+    if msg is None:
+        return OscMsg(addr=oscaddr, args=outer, types=list(types))
+    msg.addr = oscaddr
+    if isinstance(msg.types, list):
+        msg.types[:] = types  # overwritten in place, like args
+    else:
+        msg.types = list(types)
+    return msg
+
+
+_ARG_STRUCTS = {otype: _Struct(">" + fmt) for otype, fmt in _ARG_FORMATS.items()}
+_view_layouts = {}  # cache of type-tag string -> (type index of each arg, known offsets)
+
+
+def _view_layout(osctypes):
+    """
+    The type-tag index of each (top-level) argument, and the offsets from the
+    first argument of the leading arguments whose position does not depend on
+    the data, i.e. up to and including the first string, blob or array.
+    """
+    layout = _view_layouts.get(osctypes)
+    if layout is not None:
+        return layout
+    tis = []
+    offsets = []
+    known = 0  # offset of the next argument, or None once it depends on the data
+    depth = 0
+    for ti, otype in enumerate(osctypes):
+        if otype == "\x00":
+            continue
+        if depth == 0 and otype != "]":
+            tis.append(ti)
+            if known is not None:
+                offsets.append(known)
+        if otype == "[":
+            depth += 1
+            known = None
+        elif otype == "]":
+            depth = max(depth - 1, 0)
+        elif known is not None:
+            if otype in _ARG_FORMATS:
+                known += _ARG_STRUCTS[otype].size
+            elif otype in "TFNI":
+                pass
+            elif otype == "c":
+                known += 4
+            else:
+                known = None
+    layout = (tuple(tis), tuple(offsets))
+    if len(_view_layouts) >= _TYPE_PLANS_MAX:
+        _view_layouts.clear()
+    _view_layouts[osctypes] = layout
+    return layout
+
 
-    return OscMsg(addr=oscaddr, args=args, types=types)
+def _view_arg(data, pos, end, osctypes, ti, decode, depth=0):
+    """
+    Decode (or if not decode, just skip) the argument of type osctypes[ti] at pos,
+    which must end before end.
+    Returns the value (None if skipped), its end pos, and the next type index.
+    """
+    otype = osctypes[ti]
+    if otype == "[":
+        if depth >= _MAX_NESTING:
+            raise ValueError("OSC arrays nested too deeply")
+        items = [] if decode else None
+        ti += 1
+        while ti < len(osctypes) and osctypes[ti] != "]":
+            if osctypes[ti] == "\x00":
+                ti += 1
+                continue
+            value, pos, ti = _view_arg(data, pos, end, osctypes, ti, decode, depth + 1)
+            if decode:
+                items.append(value)
+        return items, pos, ti + 1
+    fmt = _ARG_STRUCTS.get(otype)
+    if fmt is not None:
+        value = fmt.unpack_from(data, pos)[0] if decode else None
+        return value, pos + fmt.size, ti + 1
+    if not decode and otype in "sS":
+        str_end = data.index(b"\x00", pos, end)
+        return None, pos + ((str_end - pos) // 4 + 1) * 4, ti + 1
+    codec = _ARG_CODECS.get(otype)
+    if codec is None:
+        raise ValueError("unknown OSC type: " + repr(otype))
+    value, pos = codec[0](data, pos, end)
+    return value, pos, ti + 1
 
 
-def create_osc_packet(msg, data):
+class OscArgsView:
     """
-    :param OscMsg msg: OscMsg to convert into an OSC Packet
+    The arguments of an `OscMsgView`, decoded from the packet each time one is
+    indexed. Supports ``len()``, indexing (including negative and slices),
+    iteration and comparison with lists.
+    """
+
+    __slots__ = ("_data", "_types", "_start", "_end", "_tis", "_offsets")
+
+    def __init__(self, data, osctypes, start, end):
+        self._data = data
+        self._types = osctypes
+        self._start = start
+        self._end = end
+        self._tis, self._offsets = _view_layout(osctypes)
+
+    def __len__(self):
+        return len(self._tis)
+
+    def _offset(self, i):
+        """Offset of argument i from the first, finding it by skipping earlier ones"""
+        offsets = self._offsets
+        if i < len(offsets):
+            return offsets[i]
+        # this message's own, extended as needed
+        offsets = self._offsets = list(offsets)
+        while len(offsets) <= i:
+            j = len(offsets) - 1
+            start = self._start + offsets[j]
+            pos = _view_arg(
+                self._data, start, self._end, self._types, self._tis[j], False
+            )[1]
+            if pos > self._end:
+                raise ValueError("OSC packet too short for its arguments")
+            offsets.append(pos - self._start)
+        return offsets[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self._tis)))]
+        if i < 0:
+            i += len(self._tis)
+            if i < 0:
+                raise IndexError("OSC argument index out of range")
+        ti = self._tis[i]  # raises IndexError when out of range
+        value, pos, _ = _view_arg(
+            self._data, self._start + self._offset(i), self._end, self._types, ti, True
+        )
+        if pos > self._end:
+            raise ValueError("OSC packet too short for its arguments")
+        return value
+
+    def __iter__(self):
+        for i in range(len(self._tis)):
+            yield self[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class OscMsgView:
+    """
+    An `OscMsg`-compatible view of an OSC Message in a receive buffer. The OSC
+    Address and type tags are read up front, but each argument is only decoded
+    when it is indexed, which saves work and garbage for wide messages whose
+    handlers read few arguments. The view is only valid until the buffer is
+    reused, call `materialize()` for a message that can be kept.
+    A malformed argument raises an exception when it is accessed.
+    """
+
+    __slots__ = ("addr", "args", "types")
+
+    def __init__(self, data, packet_size, addr_cache=None, pos=0):
+        """
+        :param bytearray data: a data buffer containing a binary OSC Message
+        :param int packet_size: the size of the OSC packet (may be smaller than len(data))
+        :param dict addr_cache: optional address string cache, see `parse_osc_packet()`
+        :param int pos: position of the message in data, default 0
+        """
+        if packet_size & 3 or not pos + 4 <= packet_size <= len(data):
+            raise ValueError("bad OSC packet size %d" % packet_size)
+        self.addr, osctypes, start = _read_header(data, pos, packet_size, addr_cache)
+        self.types = list(_type_plan(osctypes)[1])
+        self.args = OscArgsView(data, osctypes, start, packet_size)
+
+    def __iter__(self):
+        return iter((self.addr, self.args, self.types))
+
+    def __getitem__(self, i):
+        return (self.addr, self.args, self.types)[i]
+
+    def __repr__(self):
+        return "OscMsgView(addr=%r, args=%r, types=%r)" % tuple(self)
+
+    def materialize(self):
+        """
+        Decode all the arguments into an `OscMsg` that does not refer to the
+        buffer, with blobs copied to bytes, so it can be kept.
+
+        :return OscMsg: the message
+        """
+        return OscMsg(self.addr, _copy_blobs(list(self.args)), self.types)
+
+
+def _copy_blobs(args):
+    """Replace memoryview blobs in args (and nested arrays) with bytes copies, return args"""
+    for i, arg in enumerate(args):
+        if isinstance(arg, memoryview):
+            args[i] = bytes(arg)
+        elif isinstance(arg, list):
+            _copy_blobs(arg)
+    return args
+
+
+def create_osc_packet(msg, data, pos=0):
+    """
+    :param OscMsg msg: OscMsg to convert into an OSC Packet. Its args may be an
+      `array.array` or numpy ndarray when all are one numeric type (e.g. ",fff...f"),
+      which is then packed in one operation instead of value by value
     :param bytearray data: an empty data buffer to write OSC Packet into
+    :param int pos: position in data to start writing at, default 0
 
     :return size of actual OSC Packet written into data buffer
+      (or the end position of the packet, if pos was given)
     """
     if DEBUG:
         print("create_osc_packet:", msg)
 
     # create header of OSC addr and OSC types
-    pos = pack_string(msg.addr, data, 0)
-    pos = pack_string("," + "".join(msg.types), data, pos)
+    osctypes = msg.types if isinstance(msg.types, str) else "".join(msg.types)
+    pos = pack_string(msg.addr, data, pos)
+    data[pos] = 0x2C  # ','
+    pos = _pack_padded(osctypes, data, pos, pos + 1)
 
     # if there are OSC Arguments, march through them
     if len(msg.args) > 0:
-        for oarg, otype in zip(msg.args, msg.types):
-            if otype == "f":
-                data[pos : pos + 4] = struct.pack(">f", float(oarg))
-                pos += 4
-            elif otype == "i":
-                data[pos : pos + 4] = struct.pack(">i", int(oarg))
-                pos += 4
-            elif otype == "s":
-                pos = pack_string(oarg, data, pos)
+        pos = _pack_args(_type_plan(osctypes)[0], msg.args, data, pos)
 
     return pos
 
 
-class OSCServer:
+def _pack_args(steps, args, data, pos):
+    """Pack args into data at pos following a type plan's steps, returns new end pos"""
+    stack = None
+    i = 0
+    for fmt, otype in steps:
+        if fmt is not None:  # run of fixed-size args, packed in one go
+            n = len(otype)
+            vals = args if i == 0 and n == len(args) else args[i : i + n]
+            if (
+                n >= _BULK_MIN
+                and vals is args
+                and hasattr(args, "itemsize")  # array.array or ndarray
+                and otype.count(otype[0]) == n
+                and otype[0] in _NUMPY_DTYPES
+                and _pack_bulk(args, otype[0], data, pos, pos + fmt.size)
+            ):
+                pos += fmt.size
+                i += n
+                continue
+            try:  # unbound call, fmt.pack_into(*vals) would allocate a bound method
+                _struct_pack_into(fmt, data, pos, *vals)
+            except _PARSE_ERRORS + (TypeError,):  # e.g. float given for int32
+                coerced = [_ARG_COERCE[t](a) for t, a in zip(otype, vals)]
+                _struct_pack_into(fmt, data, pos, *coerced)
+            pos += fmt.size
+            i += n
+        elif otype in _ARG_CODECS:
+            pos = _ARG_CODECS[otype][1](args[i], data, pos)
+            i += 1
+        elif otype == "[":
+            if stack is None:
+                stack = []
+            stack.append((args, i + 1))
+            args = args[i]
+            i = 0
+        elif otype == "]" and stack:
+            args, i = stack.pop()
+        else:
+            raise ValueError("unknown OSC type: " + repr(otype))
+    return pos
+
+
+def create_osc_bundle(bundle, data, pos=0):
+    """
+    :param OscBundle bundle: OscBundle to convert into an OSC Packet,
+      its contents may be OscMsgs or nested OscBundles
+    :param bytearray data: an empty data buffer to write OSC Packet into
+    :param int pos: position in data to start writing at, default 0
+
+    :return end position of the OSC Bundle written into data buffer
+    """
+    data[pos : pos + 8] = BUNDLE_TAG
+    struct.pack_into(">Q", data, pos + 8, bundle.timetag)
+    pos += 16
+    for elem in bundle.contents:
+        start = pos + 4  # leave room for element size
+        if isinstance(elem, OscBundle):
+            end = create_osc_bundle(elem, data, start)
+        else:
+            end = create_osc_packet(elem, data, start)
+        struct.pack_into(">i", data, pos, end - start)
+        pos = end
+    return pos
+
+
+class OscTemplate:
+    """
+    A precompiled OSC Message: the encoded OSC Address and type-tag header,
+    plus a `struct` format for the argument values. Create with `OSCClient.template()`.
+    """
+
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("addr", "types", "header", "fmt", "size")
+
+    def __init__(self, addr, types):
+        """
+        :param str addr: the OSC Address, e.g. "/1/xy1"
+        :param types: the OSC types, e.g. ("f", "f"), only fixed-size types are allowed
+        """
+        fmt = ">"
+        for otype in types:
+            if otype not in _ARG_FORMATS:
+                raise ValueError("OscTemplate cannot hold OSC type " + repr(otype))
+            fmt += _ARG_FORMATS[otype]
+        header = bytearray(_padded_len(len(addr)) + _padded_len(len(types) + 1))
+        pack_string("," + "".join(types), header, pack_string(addr, header, 0))
+        self.addr = addr
+        self.types = tuple(types)
+        self.header = bytes(header)
+        self.fmt = _Struct(fmt)
+        self.size = len(header) + self.fmt.size
+
+    def pack_into(self, data, pos, *args):
+        """Write an OSC Packet with the given args into data at pos, return end pos"""
+        end = pos + len(self.header)
+        data[pos:end] = self.header
+        self.fmt.pack_into(data, end, *args)
+        return end + self.fmt.size
+
+
+class OscSchema:
+    """
+    A precompiled decoder for the OSC Messages of an address pattern with a
+    fixed type-tag string, e.g. "/mixer/ch/{n}" with ",fif". A message is
+    checked with one compare of its encoded type tags and its size, and its
+    arguments are unpacked with one `struct` format straight into the handler,
+    without building an args list. Create with `OSCDispatcher.bind()`.
+
+    A ``{name}`` in the pattern matches one part of the OSC Address (or part of
+    one, e.g. "/ch{n}/fader"), and is passed to the handler before the
+    arguments, as an int if it is all digits.
+    """
+
+    __slots__ = (
+        "pattern",
+        "types",
+        "tags",
+        "fmt",
+        "size",
+        "func",
+        "record",
+        "_parts",
+        "_fields",
+    )
+
+    def __init__(self, pattern, types, func, names=None):
+        """
+        :param str pattern: the OSC Address, with any ``{name}`` placeholders
+        :param types: the OSC types, e.g. ",fif" or ("f", "i", "f"),
+          only fixed-size types are allowed
+        :param func: function called as ``func(*placeholders, *args)``, or as
+          ``func(record)`` if names are given
+        :param names: if given, names of the arguments: the handler is given
+          one reused record whose attributes are the placeholders and arguments
+        """
+        types = "".join(types)
+        if types.startswith(","):
+            types = types[1:]
+        fmt = ">"
+        for otype in types:
+            if otype not in _ARG_FORMATS:
+                raise ValueError("OscSchema cannot hold OSC type " + repr(otype))
+            fmt += _ARG_FORMATS[otype]
+        tags = bytearray(_padded_len(len(types) + 1))
+        pack_string("," + types, tags, 0)
+        self.pattern = pattern
+        self.types = tuple(types)
+        self.tags = bytes(tags)
+        self.fmt = _Struct(fmt)
+        self.size = len(tags) + self.fmt.size
+        self.func = func
+        self._parts = []  # per address part: (prefix, placeholder name or None, suffix)
+        captures = []
+        for part in pattern.split("/"):
+            start = part.find("{")
+            end = part.find("}", start)
+            if start < 0 or end < 0:
+                self._parts.append((part, None, ""))
+            else:
+                captures.append(part[start + 1 : end])
+                self._parts.append((part[:start], captures[-1], part[end + 1 :]))
+        self.record = None
+        """The record given to func, if names were given"""
+        self._fields = None
+        if names is not None:
+            if len(names) != len(types):
+                raise ValueError("OscSchema needs one name per argument")
+            self._fields = tuple(captures) + tuple(names)
+            self.record = type("OscRecord", (), {"__slots__": self._fields})()
+
+    def match(self, addr):
+        """
+        :param str addr: an OSC Address
+        :return tuple: the placeholder values if addr matches the pattern, else None
+        """
+        parts = addr.split("/")
+        if len(parts) != len(self._parts):
+            return None
+        captures = ()
+        for part, (prefix, name, suffix) in zip(parts, self._parts):
+            if name is None:
+                if part != prefix:
+                    return None
+                continue
+            if len(part) <= len(prefix) + len(suffix) or not (
+                part.startswith(prefix) and part.endswith(suffix)
+            ):
+                return None
+            value = part[len(prefix) : len(part) - len(suffix)]
+            captures += (int(value) if value.isdigit() else value,)
+        return captures
+
+    def decode(self, data, pos, end):
+        """
+        Unpack the arguments of a message whose type tags start at pos and
+        which ends at end.
+
+        :return tuple: the arguments, or None if the message does not fit this schema
+        """
+        if pos + self.size != end or not data.startswith(self.tags, pos):
+            return None
+        return self.fmt.unpack_from(data, pos + len(self.tags))
+
+    def call(self, captures, values):
+        """Call func with placeholder values and arguments, or with the record filled in"""
+        record = self.record
+        if record is None:
+            self.func(*(captures + values if captures else values))
+            return
+        fields = self._fields
+        i = 0
+        for value in captures:
+            setattr(record, fields[i], value)
+            i += 1
+        for value in values:
+            setattr(record, fields[i], value)
+            i += 1
+        self.func(record)
+
+
+def _padded_len(str_len):
+    """Size of an OSC-string of str_len chars, with null and padding"""
+    return (str_len // 4 + 1) * 4
+
+
+def osc_packet_size(msg):
+    """
+    Compute the size of the OSC Packet for a message without creating it.
+
+    :param OscMsg msg: the OscMsg (or OscBundle) to measure
+    :return int: size in bytes that `create_osc_packet()` would write
+    """
+    if isinstance(msg, OscBundle):
+        return 16 + sum(4 + osc_packet_size(elem) for elem in msg.contents)
+    osctypes = msg.types if isinstance(msg.types, str) else "".join(msg.types)
+    size = _padded_len(len(msg.addr)) + _padded_len(len(osctypes) + 1)
+    if len(msg.args) > 0:
+        size += _args_size(_type_plan(osctypes)[0], msg.args)
+    return size
+
+
+def _args_size(steps, args):
+    """Size in bytes of args packed following a type plan's steps"""
+    size = 0
+    stack = []
+    i = 0
+    for fmt, otype in steps:
+        if fmt is not None:
+            size += fmt.size
+            i += len(otype)
+        elif otype in _ARG_CODECS:
+            size += _ARG_CODECS[otype][2](args[i])
+            i += 1
+        elif otype == "[":
+            stack.append((args, i + 1))
+            args = args[i]
+            i = 0
+        elif otype == "]" and stack:
+            args, i = stack.pop()
+    return size
+
+
+def _has_pattern(addr):
+    """True if an OSC Address contains any OSC pattern-matching characters"""
+    for c in "*?[{":
+        if c in addr:
+            return True
+    return False
+
+
+def match_address_part(pattern, name, pi=0, ni=0, partial=False):
+    """
+    Match one ``/``-separated part of an OSC Address Pattern against a name,
+    using OSC 1.0 pattern rules: ``?`` any char, ``*`` any chars,
+    ``[a-z]`` and ``[!a-z]`` char sets, ``{foo,bar}`` alternatives.
+
+    :param str pattern: the pattern part, e.g. "fader[1-4]"
+    :param str name: the address part to match against, e.g. "fader3"
+    :param bool partial: if True, also match if name is only the start of
+      a name the pattern matches, e.g. "fader" for "fader[1-4]"
+    :return bool: True if the name matches
+    """
+    plen = len(pattern)
+    # Run the pattern as an NFA over the name, one char at a time, so the time
+    # taken is at most len(pattern) * len(name), whatever the ``*``s and ``{}``s.
+    # A state is a position in pattern, or (end of "{...}", alternative, position in it).
+    states = _pattern_closure(pattern, (pi,))
+    for i in range(ni, len(name)):
+        ch = name[i]
+        moved = []
+        for state in states:
+            if isinstance(state, tuple):  # in an alternative of "{...}"
+                end, alt, j = state
+                if alt[j] == ch:
+                    moved.append((end, alt, j + 1))
+                continue
+            if state == plen:
+                continue
+            c = pattern[state]
+            if c == "*":
+                moved.append(state)
+            elif c == "[":
+                end = pattern.find("]", state + 1)
+                if end >= 0 and _match_char_set(pattern, state + 1, end, ch):
+                    moved.append(end + 1)
+            elif c in ("?", ch):
+                moved.append(state + 1)
+        if not moved:
+            return False
+        states = _pattern_closure(pattern, moved)
+    if partial:
+        return bool(states)  # name ran out in the middle of a match, or at its end
+    return plen in states
+
+
+def _pattern_closure(pattern, states):
+    """
+    The states of `match_address_part()` reachable from states without
+    matching a char: past ``*`` (which can match none), into ``{...}``
+    alternatives, and out of the end of one.
+    """
+    plen = len(pattern)
+    found = set()
+    todo = list(states)
+    while todo:
+        state = todo.pop()
+        if state in found:
+            continue
+        if isinstance(state, tuple):
+            end, alt, j = state
+            if j == len(alt):
+                todo.append(end + 1)
+                continue
+        elif state < plen:
+            c = pattern[state]
+            if c == "*":
+                todo.append(state + 1)
+            elif c == "{":
+                end = pattern.find("}", state)
+                if end >= 0:
+                    for alt in pattern[state + 1 : end].split(","):
+                        todo.append((end, alt, 0))
+                continue  # not itself a state, only its alternatives are
+        found.add(state)
+    return found
+
+
+def _match_char_set(pattern, start, end, ch):
+    """Match ch against the OSC char set in pattern[start:end] (between the brackets)"""
+    negate = pattern[start] == "!" if start < end else False
+    if negate:
+        start += 1
+    found = False
+    i = start
+    while i < end:
+        if i + 2 < end and pattern[i + 1] == "-":  # a range like "a-z"
+            if pattern[i] <= ch <= pattern[i + 2]:
+                found = True
+            i += 3
+        else:
+            if pattern[i] == ch:
+                found = True
+            i += 1
+    return found != negate
+
+
+class _TrieNode:
+    """One level of a `_DispatchTrie`, one per OSC Address part"""
+
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("children", "prefixes", "prefix_lens")
+
+    def __init__(self):
+        self.children = {}  # address part -> _TrieNode
+        self.prefixes = {}  # prefix of next address part -> (order, func, key)
+        self.prefix_lens = []  # sorted distinct lengths of the keys of prefixes
+
+
+class _DispatchTrie:
+    """
+    Routing structure compiled from a dispatch_map.
+
+    A dispatch_map key like "/1/fader" matches any address that starts with it,
+    so each key is stored as the exact parts before its last '/' ("1"), and a
+    prefix of the next part ("fader"). Looking up a plain address costs one
+    dict lookup per address part, plus one per distinct prefix length.
+    Addresses containing OSC pattern characters walk the matching branches.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.others = {}  # keys that don't start with '/', matched with startswith
+        self._order = 0
+
+    @staticmethod
+    def _split(key):
+        return key[1:].split("/")
+
+    def add(self, key, func):
+        """Add (or replace) the handler for a dispatch_map key"""
+        self._order += 1
+        if key and key[0] != "/":
+            old = self.others.get(key)
+            self.others[key] = (old[0] if old else self._order, func, key)
+            return
+        parts = self._split(key)
+        node = self.root
+        for part in parts[:-1]:
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _TrieNode()
+            node = child
+        prefix = parts[-1]
+        old = node.prefixes.get(prefix)
+        node.prefixes[prefix] = (old[0] if old else self._order, func, key)
+        if len(prefix) not in node.prefix_lens:
+            node.prefix_lens.append(len(prefix))
+            node.prefix_lens.sort()
+
+    def remove(self, key):
+        """Remove the handler for a dispatch_map key, pruning empty nodes"""
+        if key and key[0] != "/":
+            self.others.pop(key, None)
+            return
+        parts = self._split(key)
+        path = [self.root]
+        for part in parts[:-1]:
+            node = path[-1].children.get(part)
+            if node is None:
+                return
+            path.append(node)
+        node = path[-1]
+        prefix = parts[-1]
+        if node.prefixes.pop(prefix, None) is None:
+            return
+        if not any(len(p) == len(prefix) for p in node.prefixes):
+            node.prefix_lens.remove(len(prefix))
+        for i in range(len(path) - 1, 0, -1):  # prune now-empty nodes
+            if path[i].children or path[i].prefixes:
+                break
+            del path[i - 1].children[parts[i - 1]]
+
+    def match(self, addr):
+        """Return list of handler functions matching an OSC Address, in dispatch_map order"""
+        return [entry[1] for entry in self.match_entries(addr)]
+
+    def match_entries(self, addr):
+        """Return list of (order, func, key) matching an OSC Address, in dispatch_map order"""
+        found = []
+        if _has_pattern(addr):
+            self._match_pattern(self.root, self._split(addr), 0, found)
+        else:
+            node = self.root
+            for part in self._split(addr):
+                prefixes = node.prefixes
+                if prefixes:
+                    plen = len(part)
+                    for n in node.prefix_lens:
+                        if n > plen:
+                            break
+                        entry = prefixes.get(part if n == plen else part[:n])
+                        if entry:
+                            found.append(entry)
+                node = node.children.get(part)
+                if node is None:
+                    break
+        if self.others:
+            for key, entry in self.others.items():
+                if addr.startswith(key):
+                    found.append(entry)
+        if len(found) > 1:
+            found.sort(key=lambda entry: entry[0])
+        return found
+
+    def _match_pattern(self, node, parts, i, found):
+        """Walk every branch of the trie that matches the address pattern parts"""
+        part = parts[i]
+        for prefix, entry in node.prefixes.items():  # a key matches what it starts
+            if not prefix or match_address_part(part, prefix, partial=True):
+                found.append(entry)
+        if i + 1 < len(parts):
+            for name, child in node.children.items():
+                if match_address_part(part, name):
+                    self._match_pattern(child, parts, i + 1, found)
+
+
+class _DispatchMap(dict):
+    """
+    The dispatch_map of an `OSCDispatcher`, a dict that updates the
+    dispatcher's routing trie whenever it's edited in place.
+    """
+
+    def __init__(self, dispatcher, dispatch_map):
+        super().__init__(dispatch_map)
+        self._dispatcher = dispatcher
+
+    def __setitem__(self, addr, func):
+        super().__setitem__(addr, func)
+        self._dispatcher._handler_set(addr, func)
+
+    def __delitem__(self, addr):
+        super().__delitem__(addr)
+        self._dispatcher._handler_deleted(addr)
+
+    def pop(self, addr, *default):
+        if addr not in self:
+            return super().pop(addr, *default)
+        func = super().pop(addr)
+        self._dispatcher._handler_deleted(addr)
+        return func
+
+    def popitem(self):
+        addr, func = super().popitem()
+        self._dispatcher._handler_deleted(addr)
+        return addr, func
+
+    def setdefault(self, addr, func=None):
+        if addr not in self:
+            self[addr] = func
+        return self[addr]
+
+    def update(self, *args, **kwargs):
+        for addr, func in dict(*args, **kwargs).items():
+            self[addr] = func
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self._dispatcher._compile()
+
+
+_TIMEOUT_ERRNOS = (11, 35, 60, 110, 116)  # EAGAIN and ETIMEDOUT on Linux, macOS, lwIP
+
+
+try:
+    _TIMEOUT_ERRORS = (TimeoutError,)  # socket.timeout, which has no errno, on CPython
+except NameError:  # CircuitPython raises OSError(ETIMEDOUT)
+    _TIMEOUT_ERRORS = ()
+
+
+def _errno(err):
+    """The errno of an OSError, which CircuitPython only passes in args, or None"""
+    errno = getattr(err, "errno", None)
+    if errno is None and err.args:
+        errno = err.args[0]
+    return errno if isinstance(errno, int) else None
+
+
+def _is_timeout(err):
+    """True if an OSError from a socket receive is just a timeout (no data yet)"""
+    return isinstance(err, _TIMEOUT_ERRORS) or _errno(err) in _TIMEOUT_ERRNOS
+
+
+class OSCStats:
+    """
+    Counters and latency histograms for an `OSCServer` or `OSCClient`,
+    created by their ``enable_stats()`` method and reset with `reset()`.
+
+    Latency histograms are lists of counts, bucket ``n`` counts times under
+    ``2**n`` microseconds (roughly), the last bucket counts anything longer.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    num_buckets = 16
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Set all counters and histograms back to zero"""
+        self.packets_in = 0
+        self.bytes_in = 0
+        self.packets_out = 0
+        self.bytes_out = 0
+        self.truncated = 0
+        self.unmatched = 0
+        self.parse_errors = {}  # exception name -> count
+        self.recv_errors = {}  # errno -> count, for errors that are not timeouts
+        self.send_errors = {}  # errno -> count
+        self.route_hits = {}  # dispatch_map key -> count
+        self.parse_time = [0] * self.num_buckets
+        self.dispatch_time = [0] * self.num_buckets
+        self.handler_time = [0] * self.num_buckets
+
+    @staticmethod
+    def add_time(hist, ns):
+        """Count a duration of ns nanoseconds in a histogram"""
+        usecs = ns >> 10
+        bucket = 0
+        last = len(hist) - 1
+        while usecs and bucket < last:
+            usecs >>= 1
+            bucket += 1
+        hist[bucket] += 1
+
+    def snapshot(self):
+        """:return dict: a copy of all counters and histograms"""
+        return {
+            "packets_in": self.packets_in,
+            "bytes_in": self.bytes_in,
+            "packets_out": self.packets_out,
+            "bytes_out": self.bytes_out,
+            "truncated": self.truncated,
+            "unmatched": self.unmatched,
+            "parse_errors": dict(self.parse_errors),
+            "recv_errors": dict(self.recv_errors),
+            "send_errors": dict(self.send_errors),
+            "route_hits": dict(self.route_hits),
+            "parse_time": list(self.parse_time),
+            "dispatch_time": list(self.dispatch_time),
+            "handler_time": list(self.handler_time),
+        }
+
+
+class OSCDispatcher:
+    """
+    Routes received OSC Messages and Bundles to handler functions using a dispatch_map.
+    This is the transport-independent part of `OSCServer`, usable by other receivers.
+    """
+
+    max_scheduled = 32
+    """Most OSC Bundles held for later dispatch, beyond this they are dispatched early"""
+
+    lazy_args = False
+    """If True, handlers are given an `OscMsgView` that decodes arguments on access,
+    instead of a message with all arguments decoded (not for messages in OSC Bundles).
+    A malformed argument then raises in the handler reading it, this is caught
+    and counted in ``stats.parse_errors`` like any unparseable packet, and the
+    packet's remaining handlers are skipped. Handlers raising the same exception
+    types (such as ValueError) are caught the same way."""
+
+    route_cache_size = 64
+    """Most OSC Addresses whose matching handlers are cached, the least recently
+    used are dropped beyond this. Set to 0 to match every message against the dispatch_map"""
+
+    def __init__(self, dispatch_map=None, clock=None):
+        """
+        :param dict dispatch_map: map of OSC Addresses to functions,
+          if no dispatch_map is specified, a default_map will be used that prints out OSC messages
+        :param clock: function returning the current Unix time in seconds (e.g. `time.time`).
+          If given, OSC Bundles with a future Time Tag are held until due,
+          otherwise all bundles are dispatched as soon as they arrive
+        """
+        self.dispatch_map = dispatch_map or default_dispatch_map
+        self.clock = clock
+        self._scheduled = []  # list of (unix_time, OscBundle), sorted by time
+        self._msg = None  # MutableOscMsg to parse into, if reusing one
+        self._state = None  # addr -> slot index, when the state store is enabled
+        self._state_msgs = None
+        self._state_dirty = None
+        self._state_flags = None
+        self._state_dispatch = False
+        self.stats = None
+        """The `OSCStats` of this receiver, or None if not enabled"""
+        self._addr_cache = {}  # raw address bytes -> interned address string
+        self._schemas = None  # OscSchemas, once bind() is used
+        self._schema_routes = {}  # address -> (OscSchema, placeholder values) or None
+
+    def enable_stats(self):
+        """
+        Start counting packets, errors and route hits and timing parsing,
+        dispatch and handlers. When not enabled this costs one check per packet.
+
+        :return OSCStats: the stats, also available as ``stats``
+        """
+        self.stats = OSCStats()
+        return self.stats
+
+    def enable_state_store(self, max_addresses=32, dispatch=False):
+        """
+        Keep the latest arguments of each OSC Address in a preallocated table,
+        instead of (or as well as) calling handlers for every message.
+        Read the addresses that changed with `changed()` or any address with `get()`.
+        Messages for addresses beyond ``max_addresses`` are dispatched to handlers.
+
+        :param int max_addresses: number of addresses the table can hold
+        :param bool dispatch: if True, also call handlers for every message
+        """
+        self._state = {}
+        self._state_msgs = [None] * max_addresses
+        self._state_dirty = []  # slots changed since last changed(), in order
+        self._state_flags = [False] * max_addresses  # True if slot is in _state_dirty
+        self._state_dispatch = dispatch
+
+    def get(self, addr):
+        """
+        :param str addr: an OSC Address
+        :return MutableOscMsg: the latest message stored for addr, or None
+        """
+        slot = self._state.get(addr) if self._state is not None else None
+        return None if slot is None else self._state_msgs[slot]
+
+    def changed(self):
+        """
+        Iterate over the latest message of each OSC Address that changed since
+        the last call. Only addresses that received messages are visited,
+        however many messages each received. The messages are reused, so copy
+        out any values you want to keep (including blobs, which are views
+        of the receive buffer).
+
+        :return: iterator of `MutableOscMsg`
+        """
+        dirty = self._state_dirty
+        msgs = self._state_msgs
+        i = 0
+        try:
+            while i < len(dirty):
+                slot = dirty[i]
+                i += 1
+                self._state_flags[slot] = False
+                yield msgs[slot]
+        finally:
+            del dirty[:i]
+
+    def _store(self, msg):
+        """Store msg in the state table, return False if the table is full"""
+        slot = self._state.get(msg.addr)
+        if slot is None:
+            slot = len(self._state)
+            if slot >= len(self._state_msgs):
+                return False
+            self._state[msg.addr] = slot
+            self._state_msgs[slot] = MutableOscMsg(msg.addr)
+        stored = self._state_msgs[slot]
+        if not self._state_flags[slot]:
+            self._state_flags[slot] = True
+            self._state_dirty.append(slot)
+        stored.args[:] = msg.args
+        stored.types[:] = msg.types
+        return True
+
+    def _dispatch_packet(self, pkt):
+        """:param pkt: OscMsg or OscBundle to be dispatched"""
+        if isinstance(pkt, OscBundle):
+            self._dispatch_bundle(pkt)
+        elif self._state is None or not self._store(pkt) or self._state_dispatch:
+            if self._schemas is None or not self._dispatch_bound(pkt):
+                self._dispatch(pkt)
+
+    def _dispatch_bundle(self, bundle):
+        """Dispatch bundle contents now, or schedule them if the Time Tag is in the future"""
+        if self.clock and bundle.timetag != TIMETAG_IMMEDIATELY:
+            when = time_from_timetag(bundle.timetag)
+            if when > self.clock() and len(self._scheduled) < self.max_scheduled:
+                i = len(self._scheduled)
+                while i and self._scheduled[i - 1][0] > when:
+                    i -= 1
+                self._scheduled.insert(i, (when, bundle))
+                return
+        for elem in bundle.contents:
+            self._dispatch_packet(elem)
+
+    def _run_scheduled(self):
+        """Dispatch the contents of any scheduled bundles that are now due"""
+        now = self.clock()
+        while self._scheduled and self._scheduled[0][0] <= now:
+            bundle = self._scheduled.pop(0)[1]
+            for elem in bundle.contents:
+                self._dispatch_packet(elem)  # nested bundles may schedule again
+
+    @property
+    def dispatch_map(self):
+        """
+        The map of OSC Addresses to handler functions. A handler is called for
+        every message whose OSC Address starts with its key. Setting this copies
+        the given dict and compiles a routing trie from it. Edit the map with
+        `add_handler()` and `remove_handler()`, or in place through this
+        property, e.g. ``server.dispatch_map["/1/fader"] = func``: the trie is
+        updated as you go. Later edits to the dict originally given are not seen.
+        """
+        return self._dispatch_map
+
+    @dispatch_map.setter
+    def dispatch_map(self, dispatch_map):
+        self._dispatch_map = _DispatchMap(self, dispatch_map)
+        self._compile()
+
+    def _compile(self):
+        """Build the routing trie from the dispatch_map, dropping cached routes"""
+        self._routes = {}  # address -> matching trie entries, least recently used first
+        self._trie = _DispatchTrie()
+        for addr, func in self._dispatch_map.items():
+            self._trie.add(addr, func)
+
+    def _handler_set(self, addr, func):
+        """Update the trie for a handler added to or replaced in the dispatch_map"""
+        self._trie.add(addr, func)
+        self._routes.clear()
+
+    def _handler_deleted(self, addr):
+        """Update the trie for a handler removed from the dispatch_map"""
+        self._trie.remove(addr)
+        self._routes.clear()
+
+    def add_handler(self, addr, func):
+        """
+        Add or replace a handler in the dispatch_map.
+
+        :param str addr: OSC Address (or address prefix) to handle, e.g. "/1/fader"
+        :param func: function taking an OscMsg, called for matching messages
+        """
+        self._dispatch_map[addr] = func
+
+    def remove_handler(self, addr):
+        """
+        Remove a handler from the dispatch_map.
+
+        :param str addr: OSC Address key the handler was added with
+        """
+        del self._dispatch_map[addr]
+
+    def bind(self, pattern, types, func, names=None):
+        """
+        Handle the messages to an address pattern with a known type-tag string
+        with a precompiled `OscSchema`, e.g.
+        ``bind("/mixer/ch/{n}", ",fif", set_channel)`` calls
+        ``set_channel(n, gain, mute, pan)``. Matching messages are decoded
+        straight into func's arguments, and are not given to the dispatch_map,
+        including messages in OSC Bundles. Messages with other type tags are
+        dispatched as usual. Bound messages are kept by the state store and
+        counted in ``stats.route_hits`` under the pattern like other messages.
+
+        :param str pattern: OSC Address, with ``{name}`` placeholders, see `OscSchema`
+        :param types: OSC types of the arguments, e.g. ",fif"
+        :param func: function taking the placeholders and arguments, or a record
+        :param names: names of the arguments, to give func one reused record instead
+        :return OscSchema: the schema, pass it to `unbind()` to remove it
+        """
+        schema = OscSchema(pattern, types, func, names)
+        if self._schemas is None:
+            self._schemas = []
+        self._schemas.append(schema)
+        self._schema_routes.clear()
+        return schema
+
+    def unbind(self, schema):
+        """:param OscSchema schema: schema returned by `bind()` to stop using"""
+        self._schemas.remove(schema)
+        self._schema_routes.clear()
+        if not self._schemas:
+            self._schemas = None
+
+    def _handle_schema(self, data, size):
+        """Decode and handle a message with a bound schema, return False if none fits"""
+        if size & 3 or not 4 <= size <= len(data) or data[0] != 0x2F:
+            return False  # let the parser reject it
+        cache = self._addr_cache
+        try:
+            if isinstance(cache, _StaticStrings):
+                addr, pos = cache.read(data, 0, 0, size)
+            else:
+                addr, pos = _read_addr(data, 0, cache, size)
+        except _PARSE_ERRORS:
+            return False
+        route = self._schema_route(addr)
+        if route is None:
+            return False
+        values = route[0].decode(data, pos, size)
+        if values is None:
+            return False
+        self._call_schema(route, values)
+        return True
+
+    def _dispatch_bound(self, msg):
+        """Handle a parsed message with a bound schema, return False if none fits"""
+        route = self._schema_route(msg.addr)
+        if route is None or tuple(msg.types) != route[0].types:
+            return False
+        self._call_schema(route, tuple(msg.args))
+        return True
+
+    def _schema_route(self, addr):
+        """Return the (OscSchema, placeholder values) bound to addr, or None"""
+        routes = self._schema_routes
+        route = routes.get(addr, False)
+        if route is False:  # not seen yet, find its schema
+            route = None
+            for schema in self._schemas:
+                captures = schema.match(addr)
+                if captures is not None:
+                    route = (schema, captures)
+                    break
+            if len(routes) >= _ADDR_CACHE_MAX:
+                routes.clear()
+            routes[addr] = route
+        return route
+
+    def _call_schema(self, route, values):
+        """Call the func of a bound schema, counted like a dispatch_map handler"""
+        schema, captures = route
+        stats = self.stats
+        if stats is None:
+            schema.call(captures, values)
+            return
+        key = schema.pattern
+        stats.route_hits[key] = stats.route_hits.get(key, 0) + 1
+        start = time.monotonic_ns()
+        schema.call(captures, values)
+        stats.add_time(stats.handler_time, time.monotonic_ns() - start)
+
+    def _route(self, addr):
+        """Return the (order, func, key) trie entries matching addr, cached per address"""
+        routes = self._routes
+        full = len(routes) >= self.route_cache_size
+        if not full:  # recency only matters once something must be dropped
+            entries = routes.get(addr)
+            if entries is not None:
+                return entries
+        entries = routes.pop(addr, None)
+        if entries is None:
+            entries = self._trie.match_entries(addr)
+            if full:
+                if not routes:  # caching disabled
+                    return entries
+                del routes[next(iter(routes))]  # least recently used
+        routes[addr] = entries  # most recently used go last
+        return entries
+
+    def _dispatch(self, msg):
+        """:param OscMsg msg: message to be dispatched using dispatch_map"""
+        stats = self.stats
+        if stats is None:
+            for entry in self._route(msg.addr):
+                self._call(entry[1], msg)
+            return
+        entries = self._route(msg.addr)
+        if not entries:
+            stats.unmatched += 1
+        for entry in entries:
+            key = entry[2]
+            stats.route_hits[key] = stats.route_hits.get(key, 0) + 1
+            start = time.monotonic_ns()
+            self._call(entry[1], msg)
+            stats.add_time(stats.handler_time, time.monotonic_ns() - start)
+
+    def _call(self, func, msg):
+        """Call one handler matching msg, receivers override this to call handlers differently"""
+        func(msg)
+
+    def _handle_datagram(self, data, size):
+        """
+        Parse and dispatch one received datagram, return True if it was dispatched.
+        data is a receive buffer one byte larger than buf_size.
+        """
+        stats = self.stats
+        if stats is not None:
+            stats.packets_in += 1
+            stats.bytes_in += size
+        if size >= len(data):  # larger than buf_size, so truncated
+            if stats is not None:
+                stats.truncated += 1
+            return False
+        return self._handle_packet(data, size)
+
+    def _handle_packet(self, data, size):
+        """Parse and dispatch one complete OSC Packet, return True if it was dispatched"""
+        if (
+            self._schemas is not None
+            and self._state is None  # the state store needs the message parsed
+            and self._handle_schema(data, size)
+        ):
+            return True
+        stats = self.stats
+        if stats is None:
+            try:
+                pkt = self._parse(data, size)
+            except _PARSE_ERRORS:
+                return False
+            if self.lazy_args:
+                return self._dispatch_lazy(pkt)
+            self._dispatch_packet(pkt)
+            return True
+
+        start = time.monotonic_ns()
+        try:
+            pkt = self._parse(data, size)
+        except _PARSE_ERRORS as err:
+            name = type(err).__name__
+            stats.parse_errors[name] = stats.parse_errors.get(name, 0) + 1
+            return False
+        parsed = time.monotonic_ns()
+        stats.add_time(stats.parse_time, parsed - start)
+        if self.lazy_args:
+            dispatched = self._dispatch_lazy(pkt)
+        else:
+            self._dispatch_packet(pkt)
+            dispatched = True
+        stats.add_time(stats.dispatch_time, time.monotonic_ns() - parsed)
+        return dispatched
+
+    def _dispatch_lazy(self, pkt):
+        """
+        Dispatch a packet parsed with lazy_args, where handlers decode the arguments,
+        return False if one was malformed
+        """
+        try:
+            self._dispatch_packet(pkt)
+        except _PARSE_ERRORS as err:
+            if self.stats is not None:
+                name = type(err).__name__
+                self.stats.parse_errors[name] = self.stats.parse_errors.get(name, 0) + 1
+            return False
+        return True
+
+    def _parse(self, data, size):
+        """Parse one OSC Packet into an OscMsg (or view of one), or an OscBundle"""
+        if self.lazy_args and data[0] != 0x23:  # not a bundle
+            return OscMsgView(data, size, self._addr_cache)
+        return parse_osc_packet(data, size, self._msg, self._addr_cache)
+
+    def _recv_error(self, err):
+        """Count socket receive errors that are not just timeouts"""
+        if self.stats is not None and not _is_timeout(err):
+            errno = _errno(err)
+            self.stats.recv_errors[errno] = self.stats.recv_errors.get(errno, 0) + 1
+
+
+class OSCServer(OSCDispatcher):
     """
     In OSC parlance, a "server" is a receiver of OSC messages, usually UDP packets.
     This OSC server is an OSC UDP receiver.
     """
 
-    def __init__(self, socket_source, host, port, dispatch_map=None):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        socket_source,
+        host,
+        port,
+        dispatch_map=None,
+        clock=None,
+        reuse_msg=False,
+        buf_size=128,
+        batch_size=16,
+        static_addresses=0,
+        timeout=0.001,
+        rcvbuf=0,
+        interface=None,
+    ):
         """
         Create an OSCServer and start it listening on a host/port.
 
@@ -204,43 +1988,177 @@ class OSCServer:
         :param int port: port to receive on
         :param dict dispatch_map: map of OSC Addresses to functions,
           if no dispatch_map is specified, a default_map will be used that prints out OSC messages
+        :param clock: function returning the current Unix time in seconds (e.g. `time.time`).
+          If given, OSC Bundles with a future Time Tag are held and dispatched by `poll()`
+          when due, otherwise all bundles are dispatched as soon as they arrive
+        :param bool reuse_msg: if True, parse every (non-bundle) packet into the same
+          `MutableOscMsg` instead of allocating a new OscMsg, to reduce garbage.
+          Handlers must then not keep a reference to the message they are given.
+        :param int buf_size: largest UDP packet received, larger packets are truncated
+          and dropped
+        :param int batch_size: number of receive buffers used by `poll_batch()`
+        :param int static_addresses: if not 0, use static memory mode: messages are
+          parsed into one reused `MutableOscMsg` (as with ``reuse_msg``), and the OSC
+          Address and type-tag strings of up to this many addresses are kept in a
+          preallocated table, so receiving and dispatching them allocates nothing.
+          The message's args are a kept list per number of arguments, and the
+          sender's address is not read, so ``source`` is None.
+        :param float timeout: seconds `poll()` waits for a packet
+        :param int rcvbuf: if not 0, the kernel receive buffer size (``SO_RCVBUF``)
+          to ask for. A larger one holds more packets between polls, so fewer
+          are dropped in bursts.
+        :param str interface: IP address of the network interface to join
+          multicast groups on, default is chosen by the system
         """
+        super().__init__(dispatch_map, clock)
         self._socket_source = socket_source
         self.host = host
         self.port = port
-        self.dispatch_map = dispatch_map or default_dispatch_map
-        self._server_start()
+        self._static = bool(static_addresses)
+        if static_addresses:
+            reuse_msg = True
+            # addresses and type tags
+            self._addr_cache = _StaticStrings(2 * static_addresses)
+        self._msg = MutableOscMsg() if reuse_msg else None
+        if static_addresses:
+            self._msg._lists = {}  # pylint: disable=protected-access
+        self._batch_size = batch_size
+        self._ring = None  # poll_batch() receive buffers, allocated on first use
+        self._ring_sizes = None
+        self._ring_addrs = None
+        self.source = None
+        """Address (host, port) of the sender of the packet being dispatched"""
+        self.capture = None
+        """Function called with (data, size, source address) for every datagram received,
+        before it is parsed, e.g. to record traffic with ``microosc_capture``"""
+        self.interface = interface
+        self.groups = []
+        """Multicast groups joined, see `join_group()`"""
+        self._server_start(buf_size, timeout, rcvbuf=rcvbuf)
 
-    def _server_start(self, buf_size=128, timeout=0.001, ttl=2):
-        """ """
-        self._buf = bytearray(buf_size)
+    def _server_start(self, buf_size=128, timeout=0.001, ttl=2, rcvbuf=0):
+        """Create and bind the socket, joining the multicast group if host is one"""
+        self._rx_buf = bytearray(buf_size + 1)  # a packet filling it is over buf_size
+        self._timeout = timeout
         self._sock = self._socket_source.socket(
             self._socket_source.AF_INET, self._socket_source.SOCK_DGRAM
         )  # UDP
-        if self.host.startswith("224"):  # multicast
+        if rcvbuf:  # before bind, so it applies from the first packet
+            self._sock.setsockopt(SOL_SOCKET, SO_RCVBUF, rcvbuf)
+        if is_multicast(self.host):
             self._sock.setsockopt(IPPROTO_IP, IP_MULTICAST_TTL, ttl)
         self._sock.bind((self.host, self.port))
+        if is_multicast(self.host):
+            self.join_group(self.host)
         self._sock.settimeout(timeout)
 
+    def join_group(self, group, interface=None):
+        """
+        Start receiving packets sent to a multicast group (on this server's port).
+        The group given as host is joined when the server starts.
+
+        :param str group: multicast address, 224.0.0.0 to 239.255.255.255
+        :param str interface: IP address of the interface to join on,
+          default is the server's ``interface``, or one chosen by the system
+        """
+        self._membership(IP_ADD_MEMBERSHIP, group, interface)
+        if group not in self.groups:
+            self.groups.append(group)
+
+    def leave_group(self, group, interface=None):
+        """
+        Stop receiving packets sent to a multicast group.
+
+        :param str group: multicast address joined with `join_group()`
+        :param str interface: IP address of the interface it was joined on
+        """
+        self._membership(IP_DROP_MEMBERSHIP, group, interface)
+        if group in self.groups:
+            self.groups.remove(group)
+
+    def _membership(self, option, group, interface):
+        if not is_multicast(group):
+            raise ValueError("not a multicast address: " + group)
+        interface = interface or self.interface or "0.0.0.0"
+        self._sock.setsockopt(
+            IPPROTO_IP, option, _inet_aton(group) + _inet_aton(interface)
+        )
+
     def poll(self):
         """
         Call this method inside your main loop to get the server to check for
         new incoming packets. When a packet comes in, it will be parsed and
         dispatched to your provided handler functions specified in your dispatch_map.
+        OSC Bundles have each of their messages dispatched, and any scheduled
+        bundles that are now due are dispatched too. Truncated or malformed
+        packets are dropped, and counted if `enable_stats()` was called.
         """
+        if self._scheduled:
+            self._run_scheduled()
+        addr = None
         try:
-            # pylint: disable=unused-variable
-            datasize, addr = self._sock.recvfrom_into(self._buf)
-            msg = parse_osc_packet(self._buf, datasize)
-            self._dispatch(msg)
-        except OSError:
-            pass  # timeout
+            if self._static:  # recvfrom_into() allocates the source address
+                datasize = self._sock.recv_into(self._rx_buf)
+            else:
+                datasize, addr = self._sock.recvfrom_into(self._rx_buf)
+        except OSError as err:
+            self._recv_error(err)
+            return
+        if self.capture is not None:
+            self.capture(self._rx_buf, datasize, addr)
+        self.source = addr
+        self._handle_datagram(self._rx_buf, datasize)
 
-    def _dispatch(self, msg):
-        """:param OscMsg msg: message to be dispatched using dispatch_map"""
-        for addr, func in self.dispatch_map.items():
-            if msg.addr.startswith(addr):
-                func(msg)
+    def poll_batch(self, max_packets=None, time_budget=None):
+        """
+        Like `poll()`, but drains every pending packet from the socket, up to
+        ``max_packets`` or ``time_budget``, into a ring of preallocated buffers
+        and then dispatches them all. This keeps up with bursts of packets
+        that would otherwise overflow the network buffers between calls to `poll()`.
+
+        Packets larger than ``buf_size`` (and so truncated) or that cannot be
+        parsed are dropped.
+
+        :param int max_packets: most packets to receive, defaults to ``batch_size``
+          (and can be no larger)
+        :param float time_budget: most seconds to spend receiving, default is no limit
+        :return tuple: (number of packets dispatched, number of packets dropped)
+        """
+        if self._ring is None:
+            self._ring = [bytearray(len(self._rx_buf)) for _ in range(self._batch_size)]
+            self._ring_sizes = [0] * self._batch_size
+            self._ring_addrs = [None] * self._batch_size
+        if self._scheduled:
+            self._run_scheduled()
+        ring = self._ring
+        sizes = self._ring_sizes
+        addrs = self._ring_addrs
+        limit = min(max_packets or self._batch_size, self._batch_size)
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+        count = 0
+        self._sock.settimeout(0)  # non-blocking while draining
+        try:
+            while count < limit:
+                try:
+                    sizes[count], addrs[count] = self._sock.recvfrom_into(ring[count])
+                except OSError as err:
+                    self._recv_error(err)
+                    break  # nothing more pending
+                if self.capture is not None:
+                    self.capture(ring[count], sizes[count], addrs[count])
+                count += 1
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        finally:
+            self._sock.settimeout(self._timeout)
+
+        processed = 0
+        for i in range(count):
+            self.source = addrs[i]
+            if self._handle_datagram(ring[i], sizes[i]):
+                processed += 1
+        return processed, count - processed
 
 
 class OSCClient:
@@ -249,7 +2167,18 @@ class OSCClient:
     This OSC client is an OSC UDP sender.
     """
 
-    def __init__(self, socket_source, host, port, buf_size=128):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        socket_source,
+        host,
+        port,
+        buf_size=128,
+        static_addresses=0,
+        ttl=2,
+        sndbuf=0,
+        interface=None,
+        multicast_loop=None,
+    ):
         """
         Create an OSCClient ready to send to a host/port.
 
@@ -259,17 +2188,48 @@ class OSCClient:
           can use multicast addresses like '224.0.0.1'
         :param int port: port to send to
         :param int buf_size: size of UDP buffer to use
+        :param int static_addresses: if not 0, use static memory mode: the encoded
+          OSC Address and type-tag header of up to this many addresses is kept,
+          so `send()` of those addresses only packs the arguments and allocates nothing
+        :param int ttl: number of router hops multicast packets may take
+        :param int sndbuf: if not 0, the kernel send buffer size (``SO_SNDBUF``) to ask for
+        :param str interface: IP address of the network interface to send multicast
+          packets from, default is chosen by the system
+        :param bool multicast_loop: if given, whether multicast packets sent are
+          also received by this host (the system default is usually True)
         """
         self._socket_source = socket_source
         self.host = host
         self.port = port
-        self._buf = bytearray(buf_size)
+        self._init_buf(buf_size, static_addresses)
         self._sock = self._socket_source.socket(
             self._socket_source.AF_INET, self._socket_source.SOCK_DGRAM
         )
-        if self.host.startswith("224"):  # multicast
-            ttl = 2  # TODO: make this an arg?
-            self._sock.setsockopt(IPPROTO_IP, IP_MULTICAST_TTL, ttl)
+        if sndbuf:
+            self._sock.setsockopt(SOL_SOCKET, SO_SNDBUF, sndbuf)
+        if is_multicast(self.host):
+            _multicast_sender(self._sock, ttl, interface, multicast_loop)
+
+    def _init_buf(self, buf_size, static_addresses=0):
+        """Allocate the transmit buffer, and the static memory mode pools"""
+        self._buf = bytearray(buf_size)
+        self._mv = memoryview(self._buf)  # send from views, not copies, of _buf
+        self._buf_template = None  # the OscTemplate whose header is in _buf
+        self.stats = None
+        self._max_headers = static_addresses
+        # addr -> (types, header, steps)
+        self._headers = {} if static_addresses else None
+        self._views = {} if static_addresses else None  # size -> view of _buf
+        self._hostport = None  # (host, port) sent to, in static mode
+
+    def _view(self, size):
+        """A memoryview of the first size bytes of the transmit buffer"""
+        if self._views is None:
+            return self._mv[:size]
+        view = self._views.get(size)
+        if view is None:
+            view = self._views[size] = self._mv[:size]
+        return view
 
     def send(self, msg):
         """
@@ -279,5 +2239,310 @@ class OSCClient:
         :return int: return code from socket.sendto
         """
 
-        pkt_size = create_osc_packet(msg, self._buf)
-        return self._sock.sendto(self._buf[:pkt_size], (self.host, self.port))
+        self._buf_template = None
+        try:
+            if self._headers is None:
+                pkt_size = create_osc_packet(msg, self._buf)
+            else:
+                pkt_size = self._pack_static(msg)
+        except _OVERFLOW_ERRORS:
+            if osc_packet_size(msg) > len(self._buf):
+                # pylint: disable=raise-missing-from
+                raise ValueError("OSC message larger than buf_size")
+            raise
+        return self._sendto(pkt_size)
+
+    def _pack_static(self, msg):
+        """Encode msg into the transmit buffer using its kept header, return its size"""
+        header = self._headers.get(msg.addr)
+        if header is None or header[0] != msg.types:
+            if header is None and len(self._headers) >= self._max_headers:
+                return create_osc_packet(msg, self._buf)  # table full
+            size = create_osc_packet(OscMsg(msg.addr, (), msg.types), self._buf)
+            osctypes = msg.types if isinstance(msg.types, str) else "".join(msg.types)
+            steps = _type_plan(osctypes)[0]
+            fmt = steps[0][0] if len(steps) == 1 else None  # all args in one run
+            header = (msg.types, bytes(self._buf[:size]), steps, fmt)
+            self._headers[msg.addr] = header
+        size = len(header[1])
+        self._buf[:size] = header[1]
+        fmt = header[3]
+        if fmt is not None and len(msg.args) == len(msg.types):
+            try:
+                _struct_pack_into(fmt, self._buf, size, *msg.args)
+                return size + fmt.size
+            except _PARSE_ERRORS + (TypeError,):  # needs coercing, see _pack_args
+                pass
+        if msg.args:
+            size = _pack_args(header[2], msg.args, self._buf, size)
+        return size
+
+    def send_packet(self, data, size=None):
+        """
+        Send an already encoded OSC Packet, e.g. one that was received or recorded.
+
+        :param data: bytes-like object holding the OSC Packet
+        :param int size: size of the OSC Packet in data, default is all of it
+        :return int: return code from socket.sendto
+        """
+        if size is None:
+            size = len(data)
+        if size > len(self._buf):
+            raise ValueError("OSC packet larger than buf_size")
+        self._buf_template = None
+        self._buf[:size] = data[:size]
+        return self._sendto(size)
+
+    def _sendto(self, size):
+        """Send the first size bytes of the transmit buffer"""
+        hostport = self._hostport
+        if hostport is None or hostport[0] is not self.host or hostport[1] != self.port:
+            hostport = (self.host, self.port)
+            if self._views is not None:  # static mode, keep it
+                self._hostport = hostport
+        ret = self._sock.sendto(self._view(size), hostport)
+        if self.stats is not None:
+            self.stats.packets_out += 1
+            self.stats.bytes_out += size
+        return ret
+
+    def enable_stats(self):
+        """
+        Start counting packets and bytes sent.
+
+        :return OSCStats: the stats, also available as ``stats``
+        """
+        self.stats = OSCStats()
+        return self.stats
+
+    def template(self, addr, types):  # pylint: disable=no-self-use
+        """
+        Precompile an OSC Message template, for sending the same OSC Address
+        and types over and over with `send_template()`.
+
+        :param str addr: the OSC Address, e.g. "/1/xy1"
+        :param types: the OSC types, e.g. ("f", "f"), any of the fixed-size types
+          f, i, h, t, d, r and m
+        :return OscTemplate: the compiled template
+        """
+        return OscTemplate(addr, types)
+
+    def send_template(self, tmpl, *args):
+        """
+        Send an OSC Message from a template, packing only the argument values.
+
+        :param OscTemplate tmpl: a template from `template()`
+        :param args: the argument values, one per type in the template
+        :return int: return code from socket.sendto
+        """
+        buf = self._buf
+        if self._buf_template is not tmpl:  # header already in place if sent last
+            buf[: len(tmpl.header)] = tmpl.header
+            self._buf_template = tmpl
+        tmpl.fmt.pack_into(buf, len(tmpl.header), *args)
+        return self._sendto(tmpl.size)
+
+    def send_bundle(self, msgs, timetag=TIMETAG_IMMEDIATELY, mtu=None):
+        """
+        Send many OSC Messages packed into as few OSC Bundle datagrams as possible.
+        The client's ``buf_size`` must be large enough to hold a datagram.
+
+        :param list msgs: the OscMsgs (or nested OscBundles) to send
+        :param int timetag: OSC Time Tag for the bundles, default is "immediately".
+          Use `timetag_from_time()` to create one from a Unix time.
+        :param int mtu: largest datagram to send, default is ``buf_size``
+        :return int: number of datagrams sent
+        """
+        data = self._buf
+        self._buf_template = None
+        limit = min(mtu or len(data), len(data))
+        count = 0
+        pos = 0
+        for msg in msgs:
+            elem_size = 4 + osc_packet_size(msg)
+            if 16 + elem_size > limit:
+                raise ValueError("OSC message too large for datagram")
+            if pos and pos + elem_size > limit:  # current datagram full, send it
+                self._sendto(pos)
+                count += 1
+                pos = 0
+            if not pos:  # start a new bundle
+                data[0:8] = BUNDLE_TAG
+                struct.pack_into(">Q", data, 8, timetag)
+                pos = 16
+            if isinstance(msg, OscBundle):
+                end = create_osc_bundle(msg, data, pos + 4)
+            else:
+                end = create_osc_packet(msg, data, pos + 4)
+            struct.pack_into(">i", data, pos, end - pos - 4)
+            pos = end
+        if pos:
+            self._sendto(pos)
+            count += 1
+        return count
+
+
+class OSCEndpoint(OSCServer, OSCClient):
+    """
+    An OSC UDP receiver and sender sharing one socket, for devices that answer
+    queries and for controllers that query them. Handlers are called with the
+    message and the sender's (host, port), and can answer with `reply()`,
+    which encodes into the preallocated transmit buffer. `request()` and
+    `query()` send a message and route the answer to it back to the caller.
+    It has all the receiving methods of `OSCServer` and sending methods of `OSCClient`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        socket_source,
+        host,
+        port,
+        dispatch_map=None,
+        remote=None,
+        clock=None,
+        reuse_msg=False,
+        buf_size=128,
+    ):
+        """
+        :param socket socket_source: An object that is a source of sockets.
+          This could be a `socketpool` in CircuitPython or the `socket` module in CPython.
+        :param str host: hostname or IP address to receive on
+        :param int port: port to receive on, and send from
+        :param dict dispatch_map: map of OSC Addresses to functions taking (msg, source)
+        :param tuple remote: default (host, port) that `send()` and `request()` send to
+        :param clock: function returning the current Unix time in seconds, see `OSCServer`
+        :param bool reuse_msg: parse into one reused `MutableOscMsg`, see `OSCServer`
+        :param int buf_size: size of each of the receive and transmit buffers
+        """
+        dispatch_map = dispatch_map or {
+            "/": lambda msg, src: print("default_map:", src, msg.addr, msg.args)
+        }
+        OSCServer.__init__(
+            self, socket_source, host, port, dispatch_map, clock, reuse_msg, buf_size
+        )
+        self._init_buf(buf_size)
+        self.remote = remote
+        self._dest = None  # destination of the packet being sent, if not remote
+        self._pending = {}  # reply OSC Address -> list of (deadline, callback)
+
+    def send_to(self, msg, dest):
+        """
+        Send an OSC Message to a destination other than ``remote``.
+
+        :param OscMsg msg: the OSC Message to send
+        :param tuple dest: (host, port) to send to
+        :return int: return code from socket.sendto
+        """
+        self._dest = dest
+        try:
+            return self.send(msg)
+        finally:
+            self._dest = None
+
+    def reply(self, msg):
+        """
+        Send an OSC Message to the sender of the packet being dispatched.
+        Call this from a handler.
+
+        :param OscMsg msg: the OSC Message to send
+        :return int: return code from socket.sendto
+        """
+        return self.send_to(msg, self.source)
+
+    def reply_template(self, tmpl, *args):
+        """Like `reply()`, but sending an OSC Message from a template, see `send_template()`"""
+        self._dest = self.source
+        try:
+            return self.send_template(tmpl, *args)
+        finally:
+            self._dest = None
+
+    def request(self, msg, callback, reply_addr=None, timeout=1.0, dest=None):
+        """
+        Send an OSC Message and call callback with the answer, from `poll()`.
+        The answer is the next message received with OSC Address ``reply_addr``,
+        it is given to the callback instead of to handlers. Requests waiting for
+        the same address are answered in the order they were made.
+
+        :param OscMsg msg: the OSC Message to send
+        :param callback: function taking (msg, source), called with the answer,
+          or with (None, None) if no answer came within timeout
+        :param str reply_addr: OSC Address of the answer, default is ``msg.addr``
+        :param float timeout: seconds to wait for the answer
+        :param tuple dest: (host, port) to send to, default is ``remote``
+        """
+        key = reply_addr or msg.addr
+        waiting = self._pending.get(key)
+        if waiting is None:
+            waiting = self._pending[key] = []
+        waiting.append((time.monotonic() + timeout, callback))
+        if dest is None:
+            self.send(msg)
+        else:
+            self.send_to(msg, dest)
+
+    def query(self, msg, reply_addr=None, timeout=0.5, dest=None):
+        """
+        Send an OSC Message and wait for the answer, see `request()`.
+        Other messages received meanwhile are dispatched as usual.
+
+        :return OscMsg: a copy of the answer, or None if it timed out
+        """
+        result = []
+
+        def answered(reply, src):  # pylint: disable=unused-argument
+            if reply is not None:
+                reply = OscMsg(reply.addr, list(reply.args), reply.types)
+            result.append(reply)
+
+        self.request(msg, answered, reply_addr, timeout, dest)
+        while not result:
+            self.poll()
+        return result[0]
+
+    def poll(self):
+        """Like `OSCServer.poll()`, and also times out unanswered requests"""
+        if self._pending:
+            self._expire()
+        super().poll()
+
+    def poll_batch(self, max_packets=None, time_budget=None):
+        """Like `OSCServer.poll_batch()`, and also times out unanswered requests"""
+        if self._pending:
+            self._expire()
+        return super().poll_batch(max_packets, time_budget)
+
+    def _expire(self):
+        """Call back requests whose timeout has passed with (None, None)"""
+        now = time.monotonic()
+        for key in list(self._pending):
+            waiting = self._pending[key]
+            while waiting and waiting[0][0] <= now:
+                waiting.pop(0)[1](None, None)
+            if not waiting:
+                del self._pending[key]
+
+    def _dispatch(self, msg):
+        """Answer a pending request with msg, or dispatch it to its handlers"""
+        if self._pending:
+            waiting = self._pending.get(msg.addr)
+            if waiting:
+                callback = waiting.pop(0)[1]
+                if not waiting:
+                    del self._pending[msg.addr]
+                callback(msg, self.source)
+                return
+        super()._dispatch(msg)
+
+    def _call(self, func, msg):
+        """Handlers are called with (msg, source)"""
+        func(msg, self.source)
+
+    def _sendto(self, size):
+        """Send the first size bytes of the transmit buffer to dest, or remote"""
+        ret = self._sock.sendto(self._view(size), self._dest or self.remote)
+        if self.stats is not None:
+            self.stats.packets_out += 1
+            self.stats.bytes_out += size
+        return ret
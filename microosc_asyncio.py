@@ -0,0 +1,177 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+#
+# SPDX-License-Identifier: MIT
+"""
+`microosc_asyncio`
+================================================================================
+
+asyncio OSC server and client for CPython, built on `microosc`
+
+
+* Author(s): Tod Kurt
+
+Implementation Notes
+--------------------
+
+The server and client are `asyncio.DatagramProtocol` implementations, so the
+UDP socket is serviced by the event loop when packets arrive, instead of being
+polled with a timeout. Handlers in the dispatch_map may be plain functions
+or coroutine functions, coroutines are run as tasks on the event loop.
+
+This module needs CPython's `asyncio`, it does not run on CircuitPython.
+
+"""
+
+import asyncio
+
+import microosc
+
+
+class _TransportSocket:
+    """Gives an asyncio datagram transport the socket ``sendto()`` used by OSCClient"""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, transport):
+        self._transport = transport
+
+    def sendto(self, data, addr):
+        """Queue data for sending, the transport copies it if it cannot send now"""
+        self._transport.sendto(data, addr)
+        return len(data)
+
+
+class AsyncOSCServer(microosc.OSCDispatcher, asyncio.DatagramProtocol):
+    """
+    An OSC UDP receiver run by the asyncio event loop.
+    Create one with `create_server()`.
+    """
+
+    def __init__(self, dispatch_map=None, clock=None):
+        """
+        :param dict dispatch_map: map of OSC Addresses to functions or coroutine functions
+        :param clock: function returning the current Unix time in seconds (e.g. `time.time`),
+          if given, OSC Bundles with a future Time Tag are dispatched when due
+        """
+        super().__init__(dispatch_map, clock)
+        self.transport = None
+        self._tasks = set()  # running handler coroutines, referenced until done
+        self._timer = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        if self._timer:
+            self._timer.cancel()
+
+    def datagram_received(self, data, addr):
+        if self.stats is not None:
+            self.stats.packets_in += 1
+            self.stats.bytes_in += len(data)
+        if self._handle_packet(data, len(data)):
+            self._arm_timer()
+
+    def _call(self, func, msg):
+        ret = func(msg)
+        if asyncio.iscoroutine(ret):
+            task = asyncio.get_running_loop().create_task(ret)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _arm_timer(self):
+        """Wake up when the earliest scheduled bundle is due"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._scheduled:
+            delay = max(0, self._scheduled[0][0] - self.clock())
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._run_scheduled()
+        self._arm_timer()
+
+    async def join(self):
+        """Wait for all running handler coroutines to finish"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def close(self):
+        """Stop receiving"""
+        if self.transport:
+            self.transport.close()
+
+
+class AsyncOSCClient(microosc.OSCClient, asyncio.DatagramProtocol):
+    """
+    An OSC UDP sender whose sends never block: packets the socket cannot take
+    right away are queued by the event loop. It has all the sending methods of
+    `microosc.OSCClient`. Create one with `create_client()`.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, host, port, buf_size=1472):
+        """
+        :param str host: hostname or IP address to send to
+        :param int port: port to send to
+        :param int buf_size: size of the transmit buffer, also the largest bundle sent
+        """
+        self.host = host
+        self.port = port
+        self._init_buf(buf_size)
+        self._sock = None
+        self.transport = None
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._sock = _TransportSocket(transport)
+
+    def pause_writing(self):
+        self._writable.clear()
+
+    def resume_writing(self):
+        self._writable.set()
+
+    async def drain(self):
+        """Wait until the send queue is below its high-water mark"""
+        await self._writable.wait()
+
+    def close(self):
+        """Stop sending"""
+        if self.transport:
+            self.transport.close()
+
+
+async def create_server(host, port, dispatch_map=None, clock=None):
+    """
+    Create an `AsyncOSCServer` receiving on a host/port.
+
+    :param str host: hostname or IP address to receive on
+    :param int port: port to receive on
+    :param dict dispatch_map: map of OSC Addresses to functions or coroutine functions
+    :param clock: function returning the current Unix time in seconds (e.g. `time.time`)
+    :return AsyncOSCServer: the running server
+    """
+    loop = asyncio.get_running_loop()
+    server = AsyncOSCServer(dispatch_map, clock)
+    await loop.create_datagram_endpoint(lambda: server, local_addr=(host, port))
+    return server
+
+
+async def create_client(host, port, buf_size=1472):
+    """
+    Create an `AsyncOSCClient` sending to a host/port.
+
+    :param str host: hostname or IP address to send to
+    :param int port: port to send to
+    :param int buf_size: size of the transmit buffer
+    :return AsyncOSCClient: the connected client
+    """
+    loop = asyncio.get_running_loop()
+    client = AsyncOSCClient(host, port, buf_size)
+    await loop.create_datagram_endpoint(lambda: client, local_addr=("0.0.0.0", 0))
+    return client
@@ -0,0 +1,360 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+#
+# SPDX-License-Identifier: MIT
+"""
+`microosc_capture`
+================================================================================
+
+Record received OSC traffic to a compact binary log and replay it, for CPython
+
+
+* Author(s): Tod Kurt
+
+Implementation Notes
+--------------------
+
+A capture file starts with an 8-byte magic and the Unix time the capture
+started. Each record is the receive time, the packet size, the source port and
+source host, then the raw packet bytes::
+
+    "MOSCCAP1" f64 start_time
+    f64 time, u32 size, u16 port, u8 host_len, host, packet ...
+
+A sidecar index (the capture file name plus ``.idx``) holds the time and file
+offset of one record per ``index_interval`` seconds, so `CaptureReader.records()`
+can seek by time without scanning. The reader memory-maps the capture, so
+captures of any size are streamed, not loaded.
+
+Record with ``OSCServer.capture = CaptureWriter(path).write``, and replay with
+`replay()` into an `microosc.OSCClient` (to generate load) or straight into an
+`microosc.OSCDispatcher` (to soak-test parsing and handlers). From the command line::
+
+    python -m microosc_capture record capture.osc --port 5000
+    python -m microosc_capture info capture.osc
+    python -m microosc_capture replay capture.osc 127.0.0.1 5000 --speed 0
+
+"""
+
+import os
+import mmap
+import time
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+
+import microosc
+
+MAGIC = b"MOSCCAP1"
+"""First bytes of a capture file"""
+
+_HEADER = struct.Struct("<8sd")  # magic, start time
+_RECORD = struct.Struct("<dIHB")  # time, packet size, source port, source host length
+_INDEX = struct.Struct("<dQ")  # time, offset of record
+
+CaptureRecord = namedtuple("CaptureRecord", ("time", "src", "data"))
+"""
+A recorded packet: receive time (Unix seconds), source address (host, port),
+and the packet as a memoryview into the memory-mapped capture
+"""
+
+
+class CaptureWriter:
+    """Writes received packets to a capture file and its index"""
+
+    def __init__(self, path, index_interval=1.0, clock=time.time):
+        """
+        :param str path: capture file to create (overwritten if it exists)
+        :param float index_interval: seconds between index entries
+        :param clock: function returning the current Unix time in seconds
+        """
+        self.path = path
+        self.index_interval = index_interval
+        self.clock = clock
+        self.count = 0
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+        self._index = open(path + ".idx", "wb")  # pylint: disable=consider-using-with
+        self._file.write(_HEADER.pack(MAGIC, clock()))
+        self._pos = _HEADER.size
+        self._next_index = None
+
+    def write(self, data, size, src=None, t=None):
+        """
+        Record one packet. This has the signature of ``OSCServer.capture``.
+
+        :param data: buffer holding the packet
+        :param int size: size of the packet in data
+        :param tuple src: source (host, port), if known
+        :param float t: receive time, default is now
+        """
+        if t is None:
+            t = self.clock()
+        host, port = src if src else ("", 0)
+        host = host.encode()
+        if self._next_index is None or t >= self._next_index:
+            self._index.write(_INDEX.pack(t, self._pos))
+            self._next_index = t + self.index_interval
+        self._file.write(_RECORD.pack(t, size, port, len(host)))
+        self._file.write(host)
+        self._file.write(memoryview(data)[:size])
+        self._pos += _RECORD.size + len(host) + size
+        self.count += 1
+
+    def close(self):
+        """Flush and close the capture"""
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """
+    Reads a capture file through a memory map. Records are returned as views
+    into the map, so release them (or copy the packets) before calling `close()`.
+    """
+
+    def __init__(self, path):
+        """:param str path: capture file to read"""
+        self.path = path
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size:
+            self._file.close()
+            raise ValueError("not a capture file: " + path)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, self.start_time = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("not a capture file: " + path)
+        self._index_times = []
+        self._index_offsets = []
+        try:
+            with open(path + ".idx", "rb") as idx:
+                for t, offset in _INDEX.iter_unpack(idx.read()):
+                    self._index_times.append(t)
+                    self._index_offsets.append(offset)
+        except OSError:
+            self.build_index()
+
+    def build_index(self, index_interval=1.0):
+        """
+        Rebuild the index by scanning the capture, and write it next to the capture
+        if possible. Needed if the index was lost or the capture was cut short.
+
+        :param float index_interval: seconds between index entries
+        """
+        times, offsets = [], []
+        next_index = None
+        for offset, t, _, _, _ in self._scan(_HEADER.size):
+            if next_index is None or t >= next_index:
+                times.append(t)
+                offsets.append(offset)
+                next_index = t + index_interval
+        self._index_times, self._index_offsets = times, offsets
+        try:
+            with open(self.path + ".idx", "wb") as idx:
+                for t, offset in zip(times, offsets):
+                    idx.write(_INDEX.pack(t, offset))
+        except OSError:
+            pass  # read-only location, keep the index in memory
+
+    def _scan(self, offset):
+        """Yield (offset, time, size, host_end, data_end) for each record from offset on"""
+        mm = self._map
+        end = len(mm)
+        while offset + _RECORD.size <= end:
+            t, size, _, host_len = _RECORD.unpack_from(mm, offset)
+            host_end = offset + _RECORD.size + host_len
+            data_end = host_end + size
+            if data_end > end:  # record cut short, e.g. capture still being written
+                return
+            yield offset, t, size, host_end, data_end
+            offset = data_end
+
+    def records(self, start=None, end=None):
+        """
+        Iterate over the recorded packets, optionally only those received between
+        two Unix times. The index is used to seek to ``start``.
+
+        :param float start: earliest receive time, default is the beginning
+        :param float end: latest receive time, default is the end
+        :return: iterator of `CaptureRecord`
+        """
+        offset = _HEADER.size
+        if start is not None:
+            i = bisect_right(self._index_times, start) - 1
+            if i >= 0:
+                offset = self._index_offsets[i]
+        mm = self._map
+        view = self._view
+        for rec_offset, t, _, host_end, data_end in self._scan(offset):
+            if start is not None and t < start:
+                continue
+            if end is not None and t > end:
+                return
+            _, _, port, host_len = _RECORD.unpack_from(mm, rec_offset)
+            host = str(mm[host_end - host_len : host_end], "ascii")
+            yield CaptureRecord(t, (host, port), view[host_end:data_end])
+
+    def __iter__(self):
+        return self.records()
+
+    def close(self):
+        """Unmap and close the capture"""
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(  # pylint: disable=too-many-arguments
+    reader,
+    target,
+    speed=1.0,
+    start=None,
+    end=None,
+    sleep=time.sleep,
+    clock=time.monotonic,
+):
+    """
+    Replay a capture into a client or a dispatcher.
+
+    :param CaptureReader reader: the capture to replay
+    :param target: an `microosc.OSCClient` to send the packets with, or an
+      `microosc.OSCDispatcher` (such as an `microosc.OSCServer`) to parse and
+      dispatch them directly, without the network
+    :param float speed: 1.0 replays with the original timing, 2.0 twice as fast,
+      0 or None as fast as possible
+    :param float start: earliest receive time to replay, default is the beginning
+    :param float end: latest receive time to replay, default is the end
+    :param sleep: function to sleep a number of seconds
+    :param clock: monotonic clock function, in seconds
+    :return int: number of packets replayed
+    """
+    if isinstance(target, microosc.OSCClient):
+        send = target.send_packet
+    elif isinstance(target, microosc.OSCDispatcher):
+        buf = bytearray(65536)  # the parser needs a bytearray, not a view of the map
+
+        def send(data, size):
+            buf[:size] = data
+            target._handle_packet(buf, size)  # pylint: disable=protected-access
+
+    else:
+        raise TypeError("target must be an OSCClient or an OSCDispatcher")
+    count = 0
+    first = None
+    for rec in reader.records(start, end):
+        if speed:
+            if first is None:
+                first = (rec.time, clock())
+            delay = first[1] + (rec.time - first[0]) / speed - clock()
+            if delay > 0:
+                sleep(delay)
+        send(rec.data, len(rec.data))
+        rec.data.release()
+        count += 1
+    return count
+
+
+def _record(args):
+    import select  # pylint: disable=import-outside-toplevel
+    import socket  # pylint: disable=import-outside-toplevel
+
+    # the server binds (and joins any multicast group), but packets are only
+    # recorded here, not parsed or dispatched
+    server = microosc.OSCServer(
+        socket, args.host, args.port, {"/": lambda msg: None}, timeout=0
+    )
+    sock = server._sock  # pylint: disable=protected-access
+    buf = bytearray(65536)
+    with CaptureWriter(args.path) as writer:
+        deadline = time.monotonic() + args.duration if args.duration else None
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                if not select.select([sock], [], [], 0.1)[0]:
+                    continue  # idle, check the deadline
+                while True:  # read everything pending
+                    try:
+                        size, src = sock.recvfrom_into(buf)
+                    except OSError:
+                        break
+                    writer.write(buf, size, src)
+        except KeyboardInterrupt:
+            pass
+        print(f"recorded {writer.count} packets to {args.path}")
+
+
+def _replay(args):
+    import socket  # pylint: disable=import-outside-toplevel
+
+    client = microosc.OSCClient(socket, args.host, args.port, buf_size=65536)
+    with CaptureReader(args.path) as reader:
+        began = time.monotonic()
+        count = replay(reader, client, args.speed, args.start, args.end)
+        elapsed = time.monotonic() - began
+    print(
+        f"replayed {count} packets in {elapsed:.3f} s ({count / max(elapsed, 1e-9):.0f}/s)"
+    )
+
+
+def _info(args):
+    with CaptureReader(args.path) as reader:
+        count = 0
+        size = 0
+        last = reader.start_time
+        for rec in reader:
+            count += 1
+            size += len(rec.data)
+            last = rec.time
+            rec.data.release()
+        print(
+            f"{args.path}: {count} packets, {size} bytes, {last - reader.start_time:.3f} s"
+        )
+
+
+def main():
+    """Command line: record, replay, or summarize a capture"""
+    import argparse  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[3])
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="record OSC UDP packets to a capture")
+    rec.add_argument("path")
+    rec.add_argument("--host", default="0.0.0.0")
+    rec.add_argument("--port", type=int, default=5000)
+    rec.add_argument(
+        "--duration", type=float, help="seconds to record, default until ^C"
+    )
+    rec.set_defaults(func=_record)
+    rep = commands.add_parser(
+        "replay", help="send a capture's packets to a host and port"
+    )
+    rep.add_argument("path")
+    rep.add_argument("host")
+    rep.add_argument("port", type=int)
+    rep.add_argument(
+        "--speed", type=float, default=1.0, help="0 for as fast as possible"
+    )
+    rep.add_argument("--start", type=float, help="earliest Unix time to replay")
+    rep.add_argument("--end", type=float, help="latest Unix time to replay")
+    rep.set_defaults(func=_replay)
+    info = commands.add_parser("info", help="summarize a capture")
+    info.add_argument("path")
+    info.set_defaults(func=_info)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
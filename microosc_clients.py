@@ -0,0 +1,572 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+#
+# SPDX-License-Identifier: MIT
+"""
+`microosc_clients`
+================================================================================
+
+OSC senders layered on `microosc.OSCClient`, for CircuitPython and CPython
+
+
+* Author(s): Tod Kurt
+
+Implementation Notes
+--------------------
+
+`FanoutOSCClient` mirrors every message to many destinations,
+`CoalescingOSCClient` sends only the latest value of each OSC Address at a
+fixed rate, and `QueuedOSCClient` packs queued messages into MTU-sized OSC
+Bundles. Only `QueuedOSCClient.start_flusher()` needs CPython (for threads).
+
+"""
+
+import time
+import struct
+
+import microosc
+
+
+class FanoutOSCClient(microosc.OSCClient):
+    """
+    An OSC UDP sender that mirrors every message to many destinations. Each
+    message is encoded once and the same buffer is sent to each destination
+    over one socket. Destinations can be added and removed at any time, and
+    each can have OSC Address prefixes it is limited to.
+
+    A destination that fails to send (unreachable, buffer full) does not stop
+    the others: the error is counted in ``stats.send_errors``, if stats are
+    enabled, and the send methods return only the successful sends.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, socket_source, destinations=(), buf_size=128):
+        """
+        :param socket socket_source: An object that is a source of sockets.
+          This could be a `socketpool` in CircuitPython or the `socket` module in CPython.
+        :param destinations: initial destinations, as (host, port) or
+          (host, port, prefixes) tuples, see `add_destination()`
+        :param int buf_size: size of UDP buffer to use
+        """
+        self._socket_source = socket_source
+        self.host = self.port = None
+        self._init_buf(buf_size)
+        self._sock = socket_source.socket(
+            socket_source.AF_INET, socket_source.SOCK_DGRAM
+        )
+        self._multicast = False
+        self._dests = []  # list of ((host, port), prefixes)
+        self._all = []  # every (host, port)
+        self._filtered = False  # True if any destination has prefixes
+        self._targets = self._all  # destinations of the packet being sent
+        self._target_cache = {}  # addr -> destinations, when filtered
+        self._sent = 0  # successful sends, counted by _sendto()
+        for dest in destinations:
+            self.add_destination(*dest)
+
+    @property
+    def destinations(self):
+        """List of the (host, port) destinations"""
+        return list(self._all)
+
+    def add_destination(self, host, port, prefixes=None):
+        """
+        Start sending to a destination, or change its prefixes.
+
+        :param str host: hostname or IP address to send to,
+          can use multicast addresses like '224.0.0.1'
+        :param int port: port to send to
+        :param prefixes: if given, only messages whose OSC Address starts with
+          this string (or one of this tuple of strings) are sent to this destination
+        """
+        self.remove_destination(host, port)
+        if microosc.is_multicast(host) and not self._multicast:
+            microosc._multicast_sender(self._sock)  # pylint: disable=protected-access
+            self._multicast = True
+        if isinstance(prefixes, list):
+            prefixes = tuple(prefixes)
+        self._dests.append(((host, port), prefixes))
+        self._all.append((host, port))
+        self._changed()
+
+    def remove_destination(self, host, port):
+        """Stop sending to a destination, if it was added"""
+        for i, (dest, _) in enumerate(self._dests):
+            if dest == (host, port):
+                del self._dests[i]
+                self._all.remove(dest)
+                self._changed()
+                return
+
+    def _changed(self):
+        self._filtered = any(prefixes is not None for _, prefixes in self._dests)
+        self._target_cache.clear()
+
+    def _select(self, addr):
+        """Set the destinations of a message to addr, return True if there are any"""
+        if not self._filtered:
+            self._targets = self._all
+            return bool(self._all)
+        targets = self._target_cache.get(addr)
+        if targets is None:
+            targets = [d for d, p in self._dests if p is None or addr.startswith(p)]
+            if len(self._target_cache) >= 64:
+                self._target_cache.clear()
+            self._target_cache[addr] = targets
+        self._targets = targets
+        return bool(targets)
+
+    def send(self, msg):
+        """
+        Send an OSC Message to every destination whose prefixes match it.
+
+        :param microosc.OscMsg msg: the OSC Message to send
+        :return int: number of destinations it was sent to
+        """
+        return super().send(msg) if self._select(msg.addr) else 0
+
+    def send_template(self, tmpl, *args):
+        """
+        Send an OSC Message from a template to every destination whose prefixes match it.
+
+        :return int: number of destinations it was sent to
+        """
+        return super().send_template(tmpl, *args) if self._select(tmpl.addr) else 0
+
+    def send_packet(self, data, size=None):
+        """
+        Send an already encoded OSC Packet to every destination, regardless of prefixes.
+
+        :return int: number of destinations it was sent to
+        """
+        self._targets = self._all
+        return super().send_packet(data, size)
+
+    def send_bundle(self, msgs, timetag=microosc.TIMETAG_IMMEDIATELY, mtu=None):
+        """
+        Send many OSC Messages packed into OSC Bundle datagrams,
+        see `microosc.OSCClient.send_bundle()`.
+        Destinations with prefixes get bundles of only the messages matching them
+        (nested OscBundles are not filtered), encoded once per distinct prefixes.
+
+        :return int: number of datagrams sent, counting each destination
+        """
+        self._sent = 0
+        if not self._filtered:
+            self._targets = self._all
+            super().send_bundle(msgs, timetag, mtu)
+            return self._sent
+        groups = {}  # prefixes -> destinations
+        for dest, prefixes in self._dests:
+            groups.setdefault(prefixes, []).append(dest)
+        for prefixes, dests in groups.items():
+            if prefixes is not None:
+                msgs_for = [
+                    m
+                    for m in msgs
+                    if isinstance(m, microosc.OscBundle) or m.addr.startswith(prefixes)
+                ]
+            else:
+                msgs_for = msgs
+            if msgs_for:
+                self._targets = dests
+                super().send_bundle(msgs_for, timetag, mtu)
+        return self._sent
+
+    def _sendto(self, size):
+        """
+        Send the first size bytes of the transmit buffer to each target,
+        return how many sends succeeded
+        """
+        view = self._view(size)
+        sendto = self._sock.sendto
+        sent = 0
+        for dest in self._targets:
+            try:
+                sendto(view, dest)
+            except OSError as err:
+                if self.stats is not None:
+                    errno = microosc._errno(err)  # pylint: disable=protected-access
+                    errors = self.stats.send_errors
+                    errors[errno] = errors.get(errno, 0) + 1
+                continue
+            sent += 1
+        if self.stats is not None:
+            self.stats.packets_out += sent
+            self.stats.bytes_out += size * sent
+        self._sent += sent
+        return sent
+
+
+class CoalescingOSCClient:
+    """
+    Sends only the latest value for each OSC Address, at a fixed rate.
+
+    Each `update()` overwrites any unsent value for its address in a fixed-size
+    slot table, and `poll()` (called in your main loop) sends all the changed
+    addresses, packed into as few OSC Bundle datagrams as fit, once per flush
+    period. Per-address minimum intervals and deadbands further suppress
+    redundant traffic, e.g. a fader sampled at 1 kHz can be sent at 60 Hz,
+    and only when it moved by more than 0.01.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments
+        self, client, max_addresses=32, rate=60, min_interval=0, deadband=0
+    ):
+        """
+        :param microosc.OSCClient client: the client to send with, its ``buf_size`` limits
+          the size of each datagram
+        :param int max_addresses: number of slots, addresses beyond this are
+          sent immediately by `update()`, without coalescing
+        :param float rate: flushes per second done by `poll()`
+        :param float min_interval: default least seconds between sends of an address
+        :param float deadband: default least change in a numeric argument to send
+        """
+        self.client = client
+        self.period = 1 / rate
+        self.min_interval = min_interval
+        self.deadband = deadband
+        self._slots = {}  # addr -> slot index
+        self._msgs = [None] * max_addresses  # OscMsg per slot, args updated in place
+        self._sent_args = [None] * max_addresses  # args as last sent
+        self._sent_time = [0.0] * max_addresses
+        self._limits = [None] * max_addresses  # (min_interval, deadband) per slot
+        self._dirty = [False] * max_addresses
+        self._num_dirty = 0
+        self._next_flush = 0
+        self._batch = []  # reused list of OscMsgs to send in a flush
+
+    def set_limits(self, addr, min_interval=None, deadband=None):
+        """
+        Set the minimum interval and deadband for one OSC Address.
+
+        :param str addr: the OSC Address, it takes a slot if it does not have one
+        :param float min_interval: least seconds between sends, None for the default
+        :param float deadband: least change in a numeric argument to send, None for the default
+        """
+        slot = self._slot(addr, (), ())
+        if slot is not None:
+            self._limits[slot] = (
+                self.min_interval if min_interval is None else min_interval,
+                self.deadband if deadband is None else deadband,
+            )
+
+    def _slot(self, addr, args, types):
+        """Find or create the slot for addr, return None if the table is full"""
+        slot = self._slots.get(addr)
+        if slot is None:
+            if len(self._slots) >= len(self._msgs):
+                return None
+            slot = len(self._slots)
+            self._slots[addr] = slot
+            self._msgs[slot] = microosc.OscMsg(addr, list(args), tuple(types))
+            self._sent_args[slot] = []
+            self._limits[slot] = (self.min_interval, self.deadband)
+        return slot
+
+    def update(self, addr, args, types):
+        """
+        Set the latest value of an OSC Address, to be sent by the next flush.
+
+        :param str addr: the OSC Address, e.g. "/1/fader1"
+        :param list args: the OSC Arguments
+        :param types: the OSC types of the arguments, e.g. ("f",)
+        :return bool: True if the value will be sent, False if it is within the deadband
+        """
+        slot = self._slot(addr, args, types)
+        if slot is None:  # slot table full
+            self.client.send(microosc.OscMsg(addr, args, types))
+            return True
+        msg = self._msgs[slot]
+        if tuple(types) != tuple(msg.types):
+            msg = self._msgs[slot] = microosc.OscMsg(addr, msg.args, tuple(types))
+        elif self._within_deadband(self._sent_args[slot], args, self._limits[slot][1]):
+            if self._dirty[slot]:  # back to what was last sent, nothing to send
+                self._dirty[slot] = False
+                self._num_dirty -= 1
+            return False
+        msg.args[:] = args
+        if not self._dirty[slot]:
+            self._dirty[slot] = True
+            self._num_dirty += 1
+        return True
+
+    @staticmethod
+    def _within_deadband(sent, args, deadband):
+        """True if args are the same as sent, give or take deadband for numbers"""
+        if len(sent) != len(args):
+            return False
+        for old, new in zip(sent, args):
+            if isinstance(new, (int, float)) and isinstance(old, (int, float)):
+                if abs(new - old) > deadband or (deadband == 0 and new != old):
+                    return False
+            elif new != old:
+                return False
+        return True
+
+    def poll(self):
+        """
+        Call this in your main loop, it flushes if a flush period has passed.
+
+        :return int: number of datagrams sent
+        """
+        if not self._num_dirty:
+            return 0
+        now = time.monotonic()
+        if now < self._next_flush:
+            return 0
+        self._next_flush = now + self.period
+        return self.flush(now)
+
+    def flush(self, now=None):
+        """
+        Send every changed OSC Address whose minimum interval has passed.
+
+        :param float now: the current `time.monotonic()`, if already known
+        :return int: number of datagrams sent
+        """
+        if now is None:
+            now = time.monotonic()
+        batch = self._batch
+        for slot in range(len(self._slots)):
+            if (
+                self._dirty[slot]
+                and now - self._sent_time[slot] >= self._limits[slot][0]
+            ):
+                msg = self._msgs[slot]
+                batch.append(msg)
+                self._sent_args[slot][:] = msg.args
+                self._sent_time[slot] = now
+                self._dirty[slot] = False
+                self._num_dirty -= 1
+        if not batch:
+            return 0
+        if len(batch) == 1:
+            self.client.send(batch[0])
+            count = 1
+        else:
+            count = self.client.send_bundle(batch)
+        del batch[:]
+        return count
+
+
+class _NoLock:
+    """Stands in for a lock where only one thread uses an object"""
+
+    # pylint: disable=too-few-public-methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class QueuedOSCClient(microosc.OSCClient):
+    """
+    An OSC UDP sender that queues messages and sends them packed into OSC
+    Bundles of up to ``mtu`` bytes, so many messages cost one ``sendto()``.
+    `send()` only encodes the message into a preallocated arena. A datagram is
+    sent when the next message does not fit in it, when its first message has
+    waited ``max_delay`` seconds (checked by `poll()`, or by a background thread
+    started with `start_flusher()`), or by `flush()`. A datagram holding one
+    message is sent as a plain OSC Message.
+
+    Messages too large for a datagram raise ValueError in `send()`, before
+    anything is queued. The other sending methods of `microosc.OSCClient` send
+    at once, after flushing the queue.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        socket_source,
+        host,
+        port,
+        mtu=1472,
+        arena_size=16384,
+        max_delay=0.005,
+        **kwargs,
+    ):
+        """
+        :param socket socket_source: An object that is a source of sockets.
+          This could be a `socketpool` in CircuitPython or the `socket` module in CPython.
+        :param str host: hostname or IP address to send to
+        :param int port: port to send to
+        :param int mtu: largest datagram to send, also the ``buf_size`` of the
+          other sending methods. 1472 fits an Ethernet frame.
+        :param int arena_size: bytes for queued datagrams, at least mtu. With a
+          flusher thread, the messages of several datagrams can be queued while
+          earlier ones are sent.
+        :param float max_delay: most seconds a message waits to be sent
+        :param kwargs: other `microosc.OSCClient` arguments, e.g. ``ttl``
+        """
+        super().__init__(socket_source, host, port, buf_size=mtu, **kwargs)
+        if arena_size < mtu:
+            raise ValueError("arena_size must be at least mtu")
+        self.mtu = mtu
+        self.max_delay = max_delay
+        self._arena = bytearray(arena_size)
+        self._arena_mv = memoryview(self._arena)
+        self._ready = []  # sealed datagrams not sent yet, (start, end, count), oldest first
+        self._start = 0  # start of the open datagram in the arena
+        self._pos = 0  # end of the open datagram (or of the last sealed one)
+        self._count = 0  # messages in the open datagram, 0 if none is open
+        self._deadline = 0  # time.monotonic() by which the open datagram is sent
+        self._lock = _NoLock()
+        self._thread = None
+        self._running = False
+
+    def send(self, msg):
+        """
+        Queue an OSC Message to be sent.
+
+        :param microosc.OscMsg msg: the OSC Message to send
+        :return int: number of datagrams this call sent (without a flusher thread)
+        """
+        elem_size = 4 + microosc.osc_packet_size(msg)
+        if 16 + elem_size > self.mtu:
+            raise ValueError("OSC message too large for datagram")
+        sent = 0
+        with self._lock:
+            if self._count and self._pos + elem_size - self._start > self.mtu:
+                sent = self._seal()
+            if not self._count:
+                self._open()
+            pos = self._pos
+            end = microosc.create_osc_packet(msg, self._arena, pos + 4)
+            struct.pack_into(">i", self._arena, pos, end - pos - 4)
+            self._pos = end
+            self._count += 1
+        return sent
+
+    def _open(self):
+        """Start a datagram where mtu bytes of the arena are free, the lock is held"""
+        mtu = self.mtu
+        while True:
+            if not self._ready:
+                pos = 0
+                break
+            tail = self._ready[0][0]  # oldest unsent datagram
+            # not wrapped around, free after _pos and before tail
+            if self._ready[-1][0] >= tail:
+                if self._pos + mtu <= len(self._arena):
+                    pos = self._pos
+                    break
+                if mtu <= tail:  # wrap around
+                    pos = 0
+                    break
+            elif self._pos + mtu <= tail:
+                pos = self._pos
+                break
+            self._lock.wait()  # arena full, wait for the flusher thread
+        self._arena[pos : pos + 8] = microosc.BUNDLE_TAG
+        struct.pack_into(">Q", self._arena, pos + 8, microosc.TIMETAG_IMMEDIATELY)
+        self._start = pos
+        self._pos = pos + 16
+        self._deadline = time.monotonic() + self.max_delay
+        if self._thread is not None:
+            self._lock.notify_all()  # the flusher now has a deadline to wait for
+
+    def _seal(self):
+        """
+        Close the open datagram and send it, or hand it to the flusher thread.
+        The lock is held. Return the number of datagrams sent.
+        """
+        dgram = (self._start, self._pos, self._count)
+        self._count = 0
+        if self._thread is None:
+            self._send_dgram(dgram)
+            return 1
+        self._ready.append(dgram)
+        self._lock.notify_all()
+        return 0
+
+    def _send_dgram(self, dgram):
+        start, end, count = dgram
+        if count == 1:
+            start += 20  # the lone message, without bundle header and element size
+        self._sock.sendto(self._arena_mv[start:end], (self.host, self.port))
+        if self.stats is not None:
+            self.stats.packets_out += 1
+            self.stats.bytes_out += end - start
+
+    def poll(self):
+        """
+        Call this in your main loop when not using `start_flusher()`, it sends
+        the queued messages once the first has waited ``max_delay``.
+
+        :return int: number of datagrams sent
+        """
+        if self._count and time.monotonic() >= self._deadline:
+            with self._lock:
+                return self._seal() if self._count else 0
+        return 0
+
+    def flush(self):
+        """
+        Send all queued messages now (waiting for the flusher thread to send them).
+
+        :return int: number of datagrams sent
+        """
+        with self._lock:
+            sent = self._seal() if self._count else 0
+            if self._thread is not None:
+                sent = len(self._ready)
+                while self._ready:
+                    self._lock.wait()
+            return sent
+
+    def _sendto(self, size):
+        self.flush()  # keep messages in order
+        return super()._sendto(size)
+
+    def start_flusher(self):
+        """
+        Start a thread that sends datagrams as they fill or their ``max_delay``
+        passes, so `send()` never waits on the socket (CPython only).
+        Call this before sending.
+        """
+        import threading  # pylint: disable=import-outside-toplevel
+
+        self._lock = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._flusher, name="osc-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop_flusher(self):
+        """Send any queued messages and stop the flusher thread"""
+        if self._thread is None:
+            return
+        with self._lock:
+            self._running = False
+            self._lock.notify_all()
+        self._thread.join()
+        self._thread = None
+        self._lock = _NoLock()
+
+    def _flusher(self):
+        """Flusher thread: send sealed datagrams, and seal the open one when due"""
+        lock = self._lock
+        while True:
+            with lock:
+                while not self._ready:
+                    if self._count:
+                        delay = self._deadline - time.monotonic()
+                        if delay <= 0 or not self._running:
+                            self._seal()
+                            continue
+                    elif not self._running:
+                        return
+                    else:
+                        delay = None
+                    lock.wait(delay)
+                dgram = self._ready[0]
+            try:
+                self._send_dgram(dgram)  # without the lock, so send() can go on
+            except OSError:
+                pass  # lost, as a datagram can be anyway, but keep the thread going
+            with lock:
+                self._ready.pop(0)
+                lock.notify_all()
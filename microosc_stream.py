@@ -0,0 +1,276 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+#
+# SPDX-License-Identifier: MIT
+"""
+`microosc_stream`
+================================================================================
+
+OSC over stream transports (TCP, serial, pipes), for CircuitPython and CPython
+
+
+* Author(s): Tod Kurt
+
+Implementation Notes
+--------------------
+
+UDP keeps packet boundaries, streams do not, so each OSC Packet is framed:
+with SLIP (`FRAMING_SLIP`, OSC 1.1) or an int32 size prefix (`FRAMING_LENGTH`,
+OSC 1.0). `OSCStreamReceiver` reads any stream with ``recv_into()`` or
+``readinto()``, e.g. a connected TCP socket or `usb_cdc.data`, and
+`OSCStreamClient` writes to one with ``sendall()`` or ``write()``.
+
+"""
+
+import struct
+
+import microosc
+
+
+FRAMING_SLIP = "slip"
+"""Stream framing of OSC 1.1: packets are SLIP-encoded, with an END byte before and after"""
+
+FRAMING_LENGTH = "length"
+"""Stream framing of OSC 1.0: each packet is preceded by its size as a big-endian int32"""
+
+_SLIP_END = 0xC0
+_SLIP_ESC = 0xDB
+_SLIP_ESC_END = 0xDC
+_SLIP_ESC_ESC = 0xDD
+
+
+def slip_encode(data, size, out, pos=0):
+    """
+    SLIP-encode an OSC Packet, with an END byte before and after it as in OSC 1.1.
+
+    :param bytearray data: buffer holding the OSC Packet
+    :param int size: size of the OSC Packet in data
+    :param bytearray out: buffer to write into, needs up to ``2 * size + 2`` bytes
+    :param int pos: position in out to start writing at, default 0
+    :return int: end position in out
+    """
+    out[pos] = _SLIP_END
+    pos += 1
+    i = 0
+    while i < size:
+        end = data.find(b"\xc0", i, size)
+        esc = data.find(b"\xdb", i, size)
+        stop = size if end < 0 else end
+        if 0 <= esc < stop:
+            stop = esc
+        out[pos : pos + stop - i] = data[i:stop]  # copy the run with nothing to escape
+        pos += stop - i
+        if stop < size:
+            out[pos] = _SLIP_ESC
+            out[pos + 1] = _SLIP_ESC_END if data[stop] == _SLIP_END else _SLIP_ESC_ESC
+            pos += 2
+        i = stop + 1
+    out[pos] = _SLIP_END
+    return pos + 1
+
+
+class OSCStreamDecoder:
+    """
+    Incrementally splits a byte stream (TCP, serial, pipe) into OSC Packets.
+    Feed it chunks of any size with `feed()`, and it calls ``on_packet(data, size)``
+    for every complete packet. Packets are reassembled in one reused buffer,
+    packets larger than it are dropped and counted in ``overflows``.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, on_packet, framing=FRAMING_SLIP, buf_size=1024):
+        """
+        :param on_packet: function called with (data, size) for each packet, data is
+          reused for the next packet
+        :param str framing: `FRAMING_SLIP` or `FRAMING_LENGTH`
+        :param int buf_size: largest packet that can be received
+        """
+        if framing not in (FRAMING_SLIP, FRAMING_LENGTH):
+            raise ValueError("unknown framing: " + repr(framing))
+        self.on_packet = on_packet
+        self.framing = framing
+        self.frames = 0
+        self.overflows = 0
+        self._frame = bytearray(buf_size)
+        self._pos = 0  # bytes of the current packet received so far
+        self._skip = False  # True while dropping an oversized packet
+        self._esc = False  # SLIP: last byte was ESC
+        self._need = -1  # length framing: packet bytes still to come, -1 in the header
+        self._hdr = bytearray(4)
+        self._hdr_pos = 0
+
+    def feed(self, chunk, size=None):
+        """
+        Consume bytes from the stream.
+
+        :param bytearray chunk: bytes received
+        :param int size: number of bytes in chunk, default is all of it
+        """
+        if size is None:
+            size = len(chunk)
+        if self.framing == FRAMING_SLIP:
+            self._feed_slip(chunk, size)
+        else:
+            self._feed_length(chunk, size)
+
+    def _put(self, chunk, start, stop):
+        """Append chunk[start:stop] to the current packet"""
+        if self._skip or start == stop:
+            return
+        end = self._pos + stop - start
+        if end > len(self._frame):
+            self._skip = True
+            self.overflows += 1
+            return
+        self._frame[self._pos : end] = chunk[start:stop]
+        self._pos = end
+
+    def _packet_done(self):
+        if not self._skip and self._pos:
+            self.frames += 1
+            self.on_packet(self._frame, self._pos)
+        self._skip = False
+        self._pos = 0
+
+    def _feed_slip(self, chunk, size):
+        i = 0
+        while i < size:
+            if self._esc:
+                self._esc = False
+                c = chunk[i]
+                if c == _SLIP_ESC_END:
+                    c = _SLIP_END
+                elif c == _SLIP_ESC_ESC:
+                    c = _SLIP_ESC
+                self._put(bytes((c,)), 0, 1)
+                i += 1
+                continue
+            end = chunk.find(b"\xc0", i, size)
+            stop = size if end < 0 else end
+            esc = chunk.find(b"\xdb", i, stop)
+            if esc >= 0:
+                self._put(chunk, i, esc)
+                self._esc = True
+                i = esc + 1
+            else:
+                self._put(chunk, i, stop)
+                if end >= 0:
+                    self._packet_done()
+                i = stop + 1
+
+    def _feed_length(self, chunk, size):
+        i = 0
+        while i < size:
+            if self._need < 0:  # in the size header
+                take = min(4 - self._hdr_pos, size - i)
+                self._hdr[self._hdr_pos : self._hdr_pos + take] = chunk[i : i + take]
+                self._hdr_pos += take
+                i += take
+                if self._hdr_pos == 4:
+                    self._hdr_pos = 0
+                    self._need = struct.unpack_from(">i", self._hdr)[0]
+                    if self._need > len(self._frame) or self._need < 0:
+                        self._skip = True
+                        self.overflows += 1
+                        self._need = max(self._need, 0)
+                    if self._need == 0:
+                        self._need = -1
+                        self._packet_done()
+                continue
+            take = min(self._need, size - i)
+            self._put(chunk, i, i + take)
+            i += take
+            self._need -= take
+            if self._need == 0:
+                self._need = -1
+                self._packet_done()
+
+
+class OSCStreamReceiver(microosc.OSCDispatcher):
+    """
+    An OSC receiver for stream transports: a connected TCP socket, a serial port
+    like `usb_cdc.data`, or a pipe. Call `poll()` in your main loop.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, stream, dispatch_map=None, framing=FRAMING_SLIP, buf_size=1024, clock=None
+    ):
+        """
+        :param stream: the stream to read, with ``recv_into()`` (sockets) or ``readinto()``.
+          It should be non-blocking or have a short timeout, so `poll()` does not wait.
+        :param dict dispatch_map: map of OSC Addresses to functions
+        :param str framing: `FRAMING_SLIP` (OSC 1.1, default) or `FRAMING_LENGTH` (OSC 1.0)
+        :param int buf_size: size of the read buffer and largest packet that can be received
+        :param clock: function returning the current Unix time in seconds, see `microosc.OSCServer`
+        """
+        super().__init__(dispatch_map, clock)
+        self.stream = stream
+        self.decoder = OSCStreamDecoder(self._handle_frame, framing, buf_size)
+        self._chunk = bytearray(buf_size)
+        self._readinto = getattr(stream, "recv_into", None) or stream.readinto
+
+    def _handle_frame(self, data, size):
+        """Count and dispatch one complete OSC Packet from the decoder"""
+        if self.stats is not None:
+            self.stats.packets_in += 1
+        self._handle_packet(data, size)
+
+    def poll(self):
+        """
+        Read what is available from the stream and dispatch any complete packets.
+
+        :return int: number of bytes read, 0 if none (or the stream was closed)
+        """
+        if self._scheduled:
+            self._run_scheduled()
+        try:
+            size = self._readinto(self._chunk)
+        except OSError as err:
+            self._recv_error(err)
+            return 0
+        if size:
+            if self.stats is not None:
+                self.stats.bytes_in += size
+            self.decoder.feed(self._chunk, size)
+        return size or 0
+
+
+class OSCStreamClient(microosc.OSCClient):
+    """
+    An OSC sender for stream transports: a connected TCP socket, a serial port
+    like `usb_cdc.data`, or a pipe. It has all the sending methods of
+    `microosc.OSCClient`.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, stream, framing=FRAMING_SLIP, buf_size=1024):
+        """
+        :param stream: the stream to write, with ``sendall()`` (sockets) or ``write()``
+        :param str framing: `FRAMING_SLIP` (OSC 1.1, default) or `FRAMING_LENGTH` (OSC 1.0)
+        :param int buf_size: size of the transmit buffer, the largest packet that can be sent
+        """
+        if framing not in (FRAMING_SLIP, FRAMING_LENGTH):
+            raise ValueError("unknown framing: " + repr(framing))
+        self.stream = stream
+        self.framing = framing
+        self.host = self.port = None
+        self._init_buf(buf_size)
+        self._frame = bytearray(
+            2 * buf_size + 2 if framing == FRAMING_SLIP else buf_size + 4
+        )
+        self._frame_mv = memoryview(self._frame)
+        self._write = getattr(stream, "sendall", None) or stream.write
+
+    def _sendto(self, size):
+        """Frame and write the first size bytes of the transmit buffer"""
+        frame = self._frame
+        if self.framing == FRAMING_SLIP:
+            end = slip_encode(self._buf, size, frame)
+        else:
+            struct.pack_into(">i", frame, 0, size)
+            frame[4 : 4 + size] = self._view(size)
+            end = 4 + size
+        self._write(self._frame_mv[:end])
+        if self.stats is not None:
+            self.stats.packets_out += 1
+            self.stats.bytes_out += end
+        return end
@@ -0,0 +1,548 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+#
+# SPDX-License-Identifier: MIT
+"""
+`microosc_workers`
+================================================================================
+
+Multi-process OSC UDP receiving for CPython, built on `microosc`
+
+
+* Author(s): Tod Kurt
+
+Implementation Notes
+--------------------
+
+`MultiprocessOSCServer` starts several worker processes that each bind the same
+UDP port with ``SO_REUSEPORT``, so the kernel spreads incoming packets across
+them and parsing and dispatch run on several cores. Each worker runs a normal
+`microosc.OSCServer`.
+
+Handlers run in the workers. A handler can return a value (a number, a string,
+bytes, or a list of them), the latest value per OSC Address is sent back to the
+parent process as an OSC Message through a shared-memory ring, and read there
+with `MultiprocessOSCServer.collect()`. Handler exceptions and values that can't
+be sent as OSC are counted in `MultiprocessOSCServer.stats()` and otherwise
+ignored, as in `ThreadPoolOSCServer`.
+
+`ThreadPoolOSCServer` instead runs handlers on a thread pool, for handlers that
+block (DMX writes, database inserts) and would otherwise stall receiving. Each
+OSC Address has its own bounded queue, messages to one address are handled in
+the order received, and a full queue drops or coalesces messages as configured.
+
+This module needs Linux (or another OS with ``SO_REUSEPORT`` and ``fork``),
+it does not run on CircuitPython.
+
+"""
+
+import os
+import time
+import select
+import socket
+import struct
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import microosc
+
+# per-worker counters, indexes into the shared counter array
+PACKETS = 0
+"""Counter index: packets dispatched"""
+DROPPED = 1
+"""Counter index: packets dropped as truncated or malformed"""
+RESULTS = 2
+"""Counter index: results sent to the parent"""
+RESULTS_DROPPED = 3
+"""Counter index: results lost because the ring was full"""
+ERRORS = 4
+"""Counter index: handler exceptions, and results that could not be sent as OSC"""
+_NUM_COUNTERS = 5
+
+# what encoding a handler's result may raise: no OSC type, non-ASCII, too large
+_ENCODE_ERRORS = microosc._OVERFLOW_ERRORS  # pylint: disable=protected-access
+
+_WRAP = 0xFFFFFFFF  # record length meaning "continue at start of ring"
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+"""Overflow policy: a full queue drops its oldest message to take the new one"""
+OVERFLOW_DROP_NEWEST = "drop_newest"
+"""Overflow policy: a full queue drops the new message"""
+OVERFLOW_COALESCE = "coalesce"
+"""Overflow policy: a full queue replaces its newest message with the new one,
+so the latest value is always handled"""
+_OVERFLOWS = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_COALESCE)
+_DRAIN_BATCH = 16  # messages a pool thread handles from one queue before yielding
+
+
+class ShmRing:
+    """
+    Single-producer, single-consumer ring of variable-size records in shared memory.
+    The first 16 bytes hold the total bytes written and read, records are a
+    4-byte length then the record, padded to 4 bytes.
+    """
+
+    def __init__(self, size, name=None):
+        """
+        :param int size: bytes of record space
+        :param str name: shared memory name, to attach to an existing ring of the
+          same size instead of creating a new one
+        """
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size + 16)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        self._cap = size  # the shared memory may be rounded up to a page
+        if name is None:
+            struct.pack_into("<QQ", self._buf, 0, 0, 0)
+
+    def put(self, data, size):
+        """Append data[:size] as one record, return False if the ring is full"""
+        head, tail = struct.unpack_from("<QQ", self._buf, 0)
+        need = 4 + (size + 3) // 4 * 4
+        pos = head % self._cap
+        room_to_end = self._cap - pos
+        used = head - tail
+        if need > room_to_end:  # wrap, wasting the end of the ring
+            if used + room_to_end + need > self._cap:
+                return False
+            if room_to_end >= 4:
+                struct.pack_into("<I", self._buf, 16 + pos, _WRAP)
+            head += room_to_end
+            pos = 0
+        elif used + need > self._cap:
+            return False
+        struct.pack_into("<I", self._buf, 16 + pos, size)
+        self._buf[16 + pos + 4 : 16 + pos + 4 + size] = data[:size]
+        struct.pack_into("<Q", self._buf, 0, head + need)  # publish last
+        return True
+
+    def get(self, out):
+        """Copy the oldest record into bytearray out, return its size or -1 if empty"""
+        head, tail = struct.unpack_from("<QQ", self._buf, 0)
+        if tail == head:
+            return -1
+        pos = tail % self._cap
+        if (
+            self._cap - pos < 4
+            or struct.unpack_from("<I", self._buf, 16 + pos)[0] == _WRAP
+        ):
+            tail += self._cap - pos
+            pos = 0
+        size = struct.unpack_from("<I", self._buf, 16 + pos)[0]
+        out[:size] = self._buf[16 + pos + 4 : 16 + pos + 4 + size]
+        struct.pack_into("<Q", self._buf, 8, tail + 4 + (size + 3) // 4 * 4)
+        return size
+
+    def close(self, unlink=False):
+        """Detach from the shared memory, and free it if unlink is True"""
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class _ReusePortSocketSource:
+    """A socket source for OSCServer whose sockets can share a port"""
+
+    AF_INET = socket.AF_INET
+    SOCK_DGRAM = socket.SOCK_DGRAM
+
+    def socket(self, family, sock_type):  # pylint: disable=no-self-use
+        """Create a socket with SO_REUSEPORT set, before OSCServer binds it"""
+        sock = socket.socket(family, sock_type)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        return sock
+
+
+def _result_msg(addr, value):
+    """
+    Make an OscMsg from a handler's return value.
+    Raises ValueError for a value that has no OSC type.
+    """
+    args = list(value) if isinstance(value, (list, tuple)) else [value]
+    types = []
+    for arg in args:
+        if isinstance(arg, float):
+            types.append("f")
+        elif isinstance(arg, int):
+            if -(2**31) <= arg < 2**31:
+                types.append("i")
+            elif -(2**63) <= arg < 2**63:
+                types.append("h")
+            else:
+                raise ValueError("handler result out of int64 range: %d" % arg)
+        elif isinstance(arg, str):
+            types.append("s")
+        elif isinstance(arg, (bytes, bytearray, memoryview)):
+            types.append("b")
+        else:
+            raise ValueError("handler result has no OSC type: " + repr(arg))
+    return microosc.OscMsg(addr, args, types)
+
+
+class _WorkerServer(microosc.OSCServer):
+    """OSCServer that remembers the latest handler return value per OSC Address"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.results = {}
+        self.errors = 0  # handler exceptions since last counted
+
+    def _call(self, func, msg):
+        try:
+            ret = func(msg)
+        except Exception:  # pylint: disable=broad-except
+            self.errors += 1
+            return
+        if ret is not None:
+            self.results[msg.addr] = ret
+
+
+class MultiprocessOSCServer:
+    """
+    An OSC UDP receiver that runs parsing and dispatch in several worker
+    processes sharing one port with ``SO_REUSEPORT``.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host,
+        port,
+        dispatch_map=None,
+        num_workers=None,
+        buf_size=1472,
+        batch_size=64,
+        ring_size=65536,
+        flush_interval=0.01,
+    ):
+        """
+        :param str host: hostname or IP address to receive on
+        :param int port: port to receive on
+        :param dict dispatch_map: map of OSC Addresses to functions, run in the workers
+        :param int num_workers: number of worker processes, default is one per CPU
+        :param int buf_size: size of each worker's UDP receive buffers
+        :param int batch_size: packets each worker drains per `OSCServer.poll_batch()`
+        :param int ring_size: bytes of shared memory per worker for results
+        :param float flush_interval: seconds between workers sending results
+        """
+        self.host = host
+        self.port = port
+        self.dispatch_map = dict(dispatch_map or microosc.default_dispatch_map)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self._buf_size = buf_size
+        self._batch_size = batch_size
+        self._ring_size = ring_size
+        self._flush_interval = flush_interval
+        self._ctx = multiprocessing.get_context("fork")
+        self._counters = None
+        self._rings = []
+        self._pipes = []
+        self._procs = []
+        self._stop = None
+        self._rx_buf = bytearray(buf_size)
+        self._last_stats = (time.monotonic(), 0)
+
+    def start(self):
+        """Start the worker processes, the dispatch_map is copied into each"""
+        self._stop = self._ctx.Event()
+        self._counters = self._ctx.Array(
+            "Q", self.num_workers * _NUM_COUNTERS, lock=False
+        )
+        for i in range(self.num_workers):
+            ring = ShmRing(self._ring_size)
+            parent_conn, child_conn = self._ctx.Pipe()
+            proc = self._ctx.Process(
+                target=self._worker_main, args=(i, ring.name, child_conn), daemon=True
+            )
+            proc.start()
+            self._rings.append(ring)
+            self._pipes.append(parent_conn)
+            self._procs.append(proc)
+
+    def stop(self, timeout=2):
+        """Stop the worker processes and free the shared memory"""
+        if self._stop:
+            self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        for ring in self._rings:
+            ring.close(unlink=True)
+        self._procs, self._rings, self._pipes = [], [], []
+
+    def add_handler(self, addr, func):
+        """
+        Add or replace a handler, in this process and in all running workers.
+        For running workers the function must be picklable (e.g. a module-level function).
+
+        :param str addr: OSC Address (or address prefix) to handle
+        :param func: function taking an OscMsg
+        """
+        self.dispatch_map[addr] = func
+        for conn in self._pipes:
+            conn.send(("add", addr, func))
+
+    def remove_handler(self, addr):
+        """:param str addr: OSC Address key of the handler to remove from all workers"""
+        del self.dispatch_map[addr]
+        for conn in self._pipes:
+            conn.send(("remove", addr, None))
+
+    def collect(self, func):
+        """
+        Read the results sent by the workers, calling func with each as an OscMsg.
+
+        :param func: function taking an OscMsg
+        :return int: number of results read
+        """
+        count = 0
+        for ring in self._rings:
+            while (size := ring.get(self._rx_buf)) >= 0:
+                func(microosc.parse_osc_packet(self._rx_buf, size))
+                count += 1
+        return count
+
+    def counters(self):
+        """:return list: per-worker lists of counters, see `PACKETS`, `DROPPED`, etc."""
+        c = self._counters
+        return [
+            list(c[i * _NUM_COUNTERS : (i + 1) * _NUM_COUNTERS])
+            for i in range(self.num_workers)
+        ]
+
+    def stats(self):
+        """
+        :return dict: total packets, dropped, and errors, per-worker packet
+          counts, and packets per second since the last call to stats()
+        """
+        per_worker = self.counters()
+        packets = sum(c[PACKETS] for c in per_worker)
+        now = time.monotonic()
+        last_time, last_packets = self._last_stats
+        self._last_stats = (now, packets)
+        return {
+            "packets": packets,
+            "dropped": sum(c[DROPPED] for c in per_worker),
+            "errors": sum(c[ERRORS] for c in per_worker),
+            "per_worker": [c[PACKETS] for c in per_worker],
+            "packets_per_sec": (packets - last_packets) / max(now - last_time, 1e-9),
+        }
+
+    def _worker_main(self, index, ring_name, conn):
+        """Worker process: receive, dispatch, and send results until stopped"""
+        ring = ShmRing(self._ring_size, ring_name)
+        server = _WorkerServer(
+            _ReusePortSocketSource(),
+            self.host,
+            self.port,
+            self.dispatch_map,
+            buf_size=self._buf_size,
+            batch_size=self._batch_size,
+        )
+        counters = self._counters
+        base = index * _NUM_COUNTERS
+        tx_buf = bytearray(self._buf_size)
+        next_flush = time.monotonic() + self._flush_interval
+        try:
+            while not self._stop.is_set():
+                processed, dropped = server.poll_batch()
+                if not processed and not dropped:  # idle, wait on the socket a while
+                    select.select([server._sock], [], [], 0.05)  # pylint: disable=protected-access
+                counters[base + PACKETS] += processed
+                counters[base + DROPPED] += dropped
+                if server.errors:
+                    counters[base + ERRORS] += server.errors
+                    server.errors = 0
+                while conn.poll():
+                    op, addr, func = conn.recv()
+                    if op == "add":
+                        server.add_handler(addr, func)
+                    else:
+                        server.remove_handler(addr)
+                if server.results and time.monotonic() >= next_flush:
+                    next_flush = time.monotonic() + self._flush_interval
+                    for addr, value in server.results.items():
+                        try:
+                            size = microosc.create_osc_packet(
+                                _result_msg(addr, value), tx_buf
+                            )
+                        except _ENCODE_ERRORS:
+                            counters[base + ERRORS] += 1
+                            continue
+                        if ring.put(tx_buf, size):
+                            counters[base + RESULTS] += 1
+                        else:
+                            counters[base + RESULTS_DROPPED] += 1
+                    server.results.clear()
+        finally:
+            ring.close()
+
+
+def _detach(msg):
+    """A copy of msg that does not refer to a reused message or receive buffer"""
+    if isinstance(msg, microosc.OscMsgView):
+        return msg.materialize()
+    args = microosc._copy_blobs(list(msg.args))  # pylint: disable=protected-access
+    return microosc.OscMsg(msg.addr, args, msg.types)
+
+
+class ThreadPoolOSCServer(microosc.OSCServer):
+    """
+    An `microosc.OSCServer` whose handlers run on a thread pool, so slow
+    handlers do not stall `poll()`. Messages to the same OSC Address are
+    handled one at a time, in the order received, messages to different
+    addresses run in parallel. Each address has a queue of at most
+    ``max_queue`` messages, ``overflow`` says what happens when it is full.
+
+    Messages are copied before being queued (blobs too), so ``reuse_msg``,
+    static memory mode and ``lazy_args`` can still be used for receiving.
+    Handler exceptions are counted in `queue_stats()` and otherwise ignored.
+    With ``stats`` enabled, ``handler_time`` is timed on the pool threads, and
+    ``dispatch_time`` only covers queueing each message.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        socket_source,
+        host,
+        port,
+        dispatch_map=None,
+        num_threads=4,
+        max_queue=64,
+        overflow=OVERFLOW_DROP_OLDEST,
+        executor=None,
+        **kwargs,
+    ):
+        """
+        :param socket socket_source: source of sockets, e.g. the `socket` module
+        :param str host: hostname or IP address to receive on
+        :param int port: port to receive on
+        :param dict dispatch_map: map of OSC Addresses to functions, run on the pool
+        :param int num_threads: number of pool threads, if no executor is given
+        :param int max_queue: most messages waiting per OSC Address
+        :param str overflow: `OVERFLOW_DROP_OLDEST`, `OVERFLOW_DROP_NEWEST`
+          or `OVERFLOW_COALESCE`
+        :param executor: a `concurrent.futures.Executor` to run handlers on
+          instead of a new `ThreadPoolExecutor`, it is not shut down by `close()`
+        :param kwargs: other `microosc.OSCServer` arguments, e.g. ``reuse_msg``
+        """
+        if overflow not in _OVERFLOWS:
+            raise ValueError("unknown overflow policy: " + repr(overflow))
+        super().__init__(socket_source, host, port, dispatch_map, **kwargs)
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(num_threads, "osc-handler")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queues = {}  # addr -> deque of (msg, entries), while a drain is scheduled
+        self._counts = dict.fromkeys(
+            ("queued", "handled", "dropped", "coalesced", "errors", "max_depth"), 0
+        )
+
+    def _dispatch(self, msg):
+        entries = self._route(msg.addr)
+        stats = self.stats
+        if stats is not None:
+            if not entries:
+                stats.unmatched += 1
+            for entry in entries:
+                stats.route_hits[entry[2]] = stats.route_hits.get(entry[2], 0) + 1
+        if not entries:
+            return
+        item = (_detach(msg), entries)
+        addr = msg.addr
+        counts = self._counts
+        with self._lock:
+            counts["queued"] += 1
+            queue = self._queues.get(addr)
+            if queue is None:  # no drain scheduled for addr, start one
+                self._queues[addr] = deque((item,))
+                counts["max_depth"] = max(counts["max_depth"], 1)
+                self._executor.submit(self._drain, addr)
+                return
+            if len(queue) >= self.max_queue:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    counts["dropped"] += 1
+                    return
+                if self.overflow == OVERFLOW_COALESCE:
+                    queue[-1] = item
+                    counts["coalesced"] += 1
+                    return
+                queue.popleft()
+                counts["dropped"] += 1
+            queue.append(item)
+            counts["max_depth"] = max(counts["max_depth"], len(queue))
+
+    def _drain(self, addr):
+        """Pool thread: handle queued messages for addr, in order"""
+        counts = self._counts
+        for _ in range(_DRAIN_BATCH):
+            with self._lock:
+                queue = self._queues[addr]
+                if not queue:
+                    del self._queues[addr]
+                    if not self._queues:
+                        self._idle.notify_all()
+                    return
+                msg, entries = queue.popleft()
+            stats = self.stats
+            for entry in entries:
+                start = time.monotonic_ns()
+                try:
+                    self._call(entry[1], msg)
+                except Exception:  # pylint: disable=broad-except
+                    with self._lock:
+                        counts["errors"] += 1
+                if stats is not None:
+                    with self._lock:  # pool threads share the histogram
+                        stats.add_time(stats.handler_time, time.monotonic_ns() - start)
+            with self._lock:
+                counts["handled"] += 1
+        self._executor.submit(self._drain, addr)  # let other addresses have a turn
+
+    def queue_depths(self):
+        """:return dict: number of messages waiting per OSC Address"""
+        with self._lock:
+            return {addr: len(queue) for addr, queue in self._queues.items()}
+
+    def queue_stats(self):
+        """
+        :return dict: messages ``queued``, ``handled``, ``dropped`` and ``coalesced``
+          by full queues, handler ``errors``, the deepest any queue has been
+          (``max_depth``), and the messages ``waiting`` now
+        """
+        with self._lock:
+            stats = dict(self._counts)
+            stats["waiting"] = sum(len(queue) for queue in self._queues.values())
+        return stats
+
+    def join(self, timeout=None):
+        """
+        Wait until all queued messages have been handled.
+
+        :param float timeout: most seconds to wait, default is no limit
+        :return bool: True if all were handled, False on timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._queues, timeout)
+
+    def close(self, wait=True):
+        """
+        Stop the pool (if it was created here) and the socket.
+
+        :param bool wait: if True, first wait for queued messages to be handled
+        """
+        if wait:
+            self.join()
+        if self._own_executor:
+            self._executor.shutdown(wait=wait)
+        self._sock.close()
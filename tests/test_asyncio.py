@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+import microosc
+import microosc_asyncio
+
+
+def test_async_roundtrip():
+    async def run():
+        received = []
+        done = asyncio.Event()
+
+        async def slow_handler(msg):
+            await asyncio.sleep(0.01)
+            received.append(("slow", msg.args[0]))
+            if len(received) == 6:
+                done.set()
+
+        def fast_handler(msg):
+            received.append(("fast", msg.args[0]))
+
+        server = await microosc_asyncio.create_server(
+            "127.0.0.1", 0, {"/slow": slow_handler, "/fast": fast_handler}
+        )
+        port = server.transport.get_extra_info("sockname")[1]
+        client = await microosc_asyncio.create_client("127.0.0.1", port)
+        for i in range(3):
+            client.send(microosc.OscMsg("/slow", [i], ("i",)))
+        client.send_bundle([microosc.OscMsg("/fast", [i], ("i",)) for i in range(3)])
+        await client.drain()
+
+        await asyncio.wait_for(done.wait(), 2)
+        await server.join()
+        client.close()
+        server.close()
+        return received
+
+    received = asyncio.run(run())
+    for kind in ("fast", "slow"):
+        values = sorted(value for k, value in received if k == kind)
+        assert values == [0, 1, 2]
+
+
+def test_async_stats():
+    async def run():
+        received = []
+        done = asyncio.Event()
+
+        async def handler(msg):
+            received.append(msg.args[0])
+            done.set()
+
+        server = await microosc_asyncio.create_server("127.0.0.1", 0, {"/a": handler})
+        stats = server.enable_stats()
+        port = server.transport.get_extra_info("sockname")[1]
+        client = await microosc_asyncio.create_client("127.0.0.1", port)
+        client.send(microosc.OscMsg("/a", [7], ["i"]))
+        await client.drain()
+        await asyncio.wait_for(done.wait(), 2)
+        await server.join()
+        client.close()
+        server.close()
+        return received, stats
+
+    received, stats = asyncio.run(run())
+    assert received == [7]
+    assert stats.packets_in == 1 and stats.route_hits == {"/a": 1}
+
+
+def test_async_lazy_args():
+    async def run():
+        received = []
+        done = asyncio.Event()
+
+        async def handler(msg):
+            received.append((type(msg), msg.args[0]))
+            done.set()
+
+        server = await microosc_asyncio.create_server("127.0.0.1", 0, {"/a": handler})
+        server.lazy_args = True
+        stats = server.enable_stats()
+        port = server.transport.get_extra_info("sockname")[1]
+        client = await microosc_asyncio.create_client("127.0.0.1", port)
+        client.send(microosc.OscMsg("/a", [7], ("i",)))
+        await client.drain()
+        await asyncio.wait_for(done.wait(), 2)
+        await server.join()
+        client.close()
+        server.close()
+        return received, stats
+
+    received, stats = asyncio.run(run())
+    assert received == [(microosc.OscMsgView, 7)]
+    assert stats.packets_in == 1 and stats.route_hits == {"/a": 1}
@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+import pytest
+import microosc
+
+
+@pytest.mark.parametrize(
+    "otype, code, values",
+    [
+        ("f", "f", [i * 0.25 for i in range(256)]),
+        ("i", "i", list(range(-32, 32))),
+        ("d", "d", [i / 3 for i in range(100)]),
+        ("h", "q", [i << 40 for i in range(16)]),
+    ],
+)
+def test_array_roundtrip(otype, code, values):
+    buf = bytearray(4096)
+    arr = array(code, values)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/bins", arr, otype * len(arr)), buf
+    )
+    # same bytes as packing a list value by value
+    ref = bytearray(4096)
+    ref_msg = microosc.OscMsg("/bins", values, otype * len(arr))
+    assert microosc.create_osc_packet(ref_msg, ref) == size
+    assert buf[:size] == ref[:size]
+
+    msg = microosc.parse_osc_array(buf, size)
+    assert msg.addr == "/bins" and msg.args == arr and msg.args.typecode == code
+    out = array(code, bytes(arr.itemsize * len(arr)))
+    assert microosc.parse_osc_array(buf, size, out).args is out
+    assert out == arr
+    assert microosc.parse_osc_packet(buf, size).args == values
+
+
+def test_array_mismatch():
+    buf = bytearray(256)
+    ints = array("i", range(10))
+    size = microosc.create_osc_packet(microosc.OscMsg("/x", ints, "f" * 10), buf)
+    assert microosc.parse_osc_packet(buf, size).args == [float(i) for i in range(10)]
+    with pytest.raises(ValueError):
+        microosc.parse_osc_array(buf, size, array("i", range(10)))
+    size = microosc.create_osc_packet(microosc.OscMsg("/x", [1, "a"], "is"), buf)
+    with pytest.raises(ValueError):
+        microosc.parse_osc_array(buf, size)
+    with pytest.raises(ValueError):
+        microosc.parse_osc_array(buf, 12)  # truncated
+    # too big for buffer, which must not grow
+    with pytest.raises(microosc._PARSE_ERRORS):
+        microosc.create_osc_packet(
+            microosc.OscMsg("/x", array("f", range(80)), "f" * 80), buf
+        )
+    assert len(buf) == 256
+
+
+def test_numpy_roundtrip():
+    np = pytest.importorskip("numpy")
+    buf = bytearray(2048)
+    frame = np.linspace(0, 1, 200, dtype=np.float32)
+    size = microosc.create_osc_packet(microosc.OscMsg("/led", frame, "f" * 200), buf)
+    out = np.zeros(200, dtype=np.float32)
+    microosc.parse_osc_array(buf, size, out)
+    assert np.array_equal(out, frame)
@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+
+import pytest
+import microosc
+
+
+def test_bundle_roundtrip():
+    packet = bytearray(256)
+
+    inner = microosc.OscBundle(5 << 32, [microosc.OscMsg("/b", [7], ("i",))])
+    bundle = microosc.OscBundle(
+        microosc.TIMETAG_IMMEDIATELY,
+        [microosc.OscMsg("/1/xy", [0.5, 0.25], ("f", "f")), inner],
+    )
+    packet_size = microosc.create_osc_bundle(bundle, packet)
+    assert packet_size == microosc.osc_packet_size(bundle)
+    assert packet[:8] == microosc.BUNDLE_TAG
+
+    bundle2 = microosc.parse_osc_packet(packet, packet_size)
+    assert bundle2.timetag == microosc.TIMETAG_IMMEDIATELY
+    assert bundle2.contents[0].addr == "/1/xy"
+    assert bundle2.contents[0].args == pytest.approx([0.5, 0.25])
+    assert bundle2.contents[1].timetag == 5 << 32
+    assert bundle2.contents[1].contents[0].args == [7]
+
+
+def test_timetag_conversion():
+    t = 1700000000.25
+    timetag = microosc.timetag_from_time(t)
+    assert timetag & 0xFFFFFFFF == 1 << 30
+    assert microosc.time_from_timetag(timetag) == pytest.approx(t)
+
+
+def test_send_bundle_packs_datagrams():
+    received = []
+    now = [1000.0]
+    server = microosc.OSCServer(
+        socket,
+        "127.0.0.1",
+        0,
+        {"/": received.append},
+        clock=lambda: now[0],
+        buf_size=1500,
+    )
+    port = server._sock.getsockname()[1]
+    client = microosc.OSCClient(socket, "127.0.0.1", port, buf_size=1500)
+
+    msgs = [microosc.OscMsg("/fader%d" % i, [i * 0.01], ("f",)) for i in range(30)]
+    assert client.send_bundle(msgs) == 1
+    assert client.send_bundle(msgs, mtu=200) > 1
+
+    server._sock.settimeout(0.5)
+    while len(received) < 60:
+        server.poll()
+    assert [m.addr for m in received[:30]] == [m.addr for m in msgs]
+
+    # bundles in the future wait until the clock passes their time tag
+    received.clear()
+    client.send_bundle(msgs[:2], timetag=microosc.timetag_from_time(1001.0))
+    server.poll()
+    assert not received and len(server._scheduled) == 1
+    now[0] = 1001.5
+    server.poll()
+    assert len(received) == 2
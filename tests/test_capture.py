@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import time
+
+import microosc
+import microosc_capture
+from tests.test_server import make_pair
+
+
+def write_capture(path, count=100):
+    buf = bytearray(64)
+    with microosc_capture.CaptureWriter(str(path), index_interval=1.0) as writer:
+        for i in range(count):
+            size = microosc.create_osc_packet(microosc.OscMsg("/n", [i], ("i",)), buf)
+            writer.write(buf, size, ("10.0.0.2", 9000), t=1000.0 + i * 0.1)
+    return buf
+
+
+def test_capture_roundtrip_and_seek(tmp_path):
+    path = tmp_path / "cap.osc"
+    write_capture(path)
+    with microosc_capture.CaptureReader(str(path)) as reader:
+        recs = list(reader.records(start=1005.0, end=1005.5))
+        values = [
+            microosc.parse_osc_packet(bytearray(r.data), len(r.data)).args[0]
+            for r in recs
+        ]
+        assert recs[0].src == ("10.0.0.2", 9000)
+        del recs
+        assert values == [50, 51, 52, 53, 54, 55]
+
+    (tmp_path / "cap.osc.idx").unlink()  # rebuilt from the capture
+    with microosc_capture.CaptureReader(str(path)) as reader:
+        assert len(reader._index_times) == 10
+        assert sum(1 for r in reader.records(start=1009.95)) == 0
+    assert (tmp_path / "cap.osc.idx").exists()
+
+
+def test_replay_into_dispatcher(tmp_path):
+    path = tmp_path / "cap.osc"
+    write_capture(path)
+    received = []
+    dispatcher = microosc.OSCDispatcher(
+        {"/n": lambda msg: received.append(msg.args[0])}
+    )
+    with microosc_capture.CaptureReader(str(path)) as reader:
+        assert microosc_capture.replay(reader, dispatcher, speed=0) == 100
+    assert received == list(range(100))
+
+
+def test_replay_timing(tmp_path):
+    path = tmp_path / "cap.osc"
+    write_capture(path, count=11)
+    now = [0.0]
+    sleeps = []
+
+    def sleep(secs):
+        sleeps.append(secs)
+        now[0] += secs
+
+    dispatcher = microosc.OSCDispatcher({"/": lambda msg: None})
+    with microosc_capture.CaptureReader(str(path)) as reader:
+        microosc_capture.replay(
+            reader, dispatcher, speed=2.0, sleep=sleep, clock=lambda: now[0]
+        )
+    assert abs(now[0] - 0.5) < 1e-9  # 1 second of traffic at double speed
+
+
+def test_server_capture_and_client_replay(tmp_path):
+    path = str(tmp_path / "cap.osc")
+    server, client, received = make_pair(buf_size=256)
+    with microosc_capture.CaptureWriter(path) as writer:
+        server.capture = writer.write
+        for i in range(5):
+            client.send(microosc.OscMsg("/n", [i], ("i",)))
+        time.sleep(0.05)
+        server.poll_batch()
+    server.capture = None
+    assert [m.args[0] for m in received] == list(range(5))
+
+    received.clear()
+    with microosc_capture.CaptureReader(path) as reader:
+        assert microosc_capture.replay(reader, client, speed=0) == 5
+    time.sleep(0.05)
+    server.poll_batch()
+    assert [m.args[0] for m in received] == list(range(5))
@@ -0,0 +1,53 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import microosc_clients
+
+
+class FakeClient:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append([(msg.addr, list(msg.args))])
+        return 1
+
+    def send_bundle(self, msgs):
+        self.sent.append([(m.addr, list(m.args)) for m in msgs])
+        return 1
+
+
+def test_latest_value_wins():
+    client = FakeClient()
+    co = microosc_clients.CoalescingOSCClient(client, max_addresses=4)
+    for i in range(100):
+        co.update("/fader1", [i / 100], ("f",))
+        co.update("/fader2", [i], ("i",))
+    assert co.flush() == 1
+    assert client.sent == [[("/fader1", [0.99]), ("/fader2", [99])]]
+    assert co.flush() == 0
+
+
+def test_deadband_and_min_interval():
+    client = FakeClient()
+    co = microosc_clients.CoalescingOSCClient(client, deadband=0.05)
+    co.set_limits("/slow", min_interval=10)
+    co.update("/fader", [0.5], ("f",))
+    co.flush(now=100)
+    assert not co.update("/fader", [0.52], ("f",))  # within deadband
+    assert co.update("/fader", [0.6], ("f",))
+    co.update("/slow", [1], ("i",))
+    co.flush(now=101)
+    assert client.sent[-1] == [("/slow", [1]), ("/fader", [0.6])]  # in slot order
+    co.update("/slow", [2], ("i",))
+    assert co.flush(now=105) == 0  # too soon for /slow
+    assert co.flush(now=111) == 1
+    assert client.sent[-1] == [("/slow", [2])]
+
+
+def test_full_table_sends_immediately():
+    client = FakeClient()
+    co = microosc_clients.CoalescingOSCClient(client, max_addresses=1)
+    co.update("/a", [1], ("i",))
+    co.update("/b", [2], ("i",))
+    assert client.sent == [[("/b", [2])]]
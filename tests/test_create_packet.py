@@ -47,6 +47,27 @@ def test_string():
     print("msg2", packet2_size, packet2, msg2)
 
 
+def test_parse_into_reused_msg():
+    packet = bytearray(64)
+    reused = microosc.MutableOscMsg()
+
+    msg1 = microosc.OscMsg("/1/mix", [1, 0.5, "hi", 2], ("i", "f", "s", "i"))
+    packet_size = microosc.create_osc_packet(msg1, packet)
+    msg2 = microosc.parse_osc_packet(packet, packet_size, reused)
+    args = msg2.args
+
+    assert msg2 is reused
+    assert msg2.addr == "/1/mix"
+    assert msg2.args == [1, 0.5, "hi", 2]
+    assert msg2.types == ["i", "f", "s", "i"]
+
+    msg3 = microosc.OscMsg("/2", [7], ("i",))
+    packet_size = microosc.create_osc_packet(msg3, packet)
+    microosc.parse_osc_packet(packet, packet_size, reused)
+    assert reused.args is args  # the same list is refilled
+    assert reused.addr == "/2" and reused.args == [7]
+
+
 if __name__ == "__main__":
     print("test_construction")
 
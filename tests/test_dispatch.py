@@ -0,0 +1,169 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+import time
+
+import microosc
+
+
+def make_trie(keys):
+    trie = microosc._DispatchTrie()
+    for key in keys:
+        trie.add(key, key)  # use the key itself as the "handler"
+    return trie
+
+
+def test_prefix_semantics_match_startswith():
+    keys = ["/", "/1/fader", "/1", "/1/", "/Note1", "/1/fader3/x", "/2/xy"]
+    trie = make_trie(keys)
+    addrs = ["/1/fader3", "/1/fader", "/10/x", "/1", "/Note10", "/2/xy1", "/3", "/"]
+    for addr in addrs:
+        expected = [k for k in keys if addr.startswith(k)]
+        assert trie.match(addr) == expected, addr
+
+
+def test_add_remove():
+    trie = make_trie(["/a/b", "/a/bc", "/x"])
+    assert trie.match("/a/bcd") == ["/a/b", "/a/bc"]
+    trie.remove("/a/b")
+    assert trie.match("/a/bcd") == ["/a/bc"]
+    trie.remove("/a/bc")
+    assert trie.match("/a/bcd") == []
+    assert not trie.root.children
+    trie.add("/a/b", "/a/b")
+    assert trie.match("/a/b") == ["/a/b"]
+
+
+def test_address_patterns():
+    trie = make_trie(["/1/fader1", "/1/fader2", "/1/fader10", "/2/fader1", "/1/xy"])
+    assert trie.match("/1/fader?") == ["/1/fader1", "/1/fader2"]
+    assert trie.match("/*/fader1") == ["/1/fader1", "/2/fader1"]
+    assert trie.match("/1/fader[2-9]") == ["/1/fader2"]
+    assert trie.match("/1/fader[!2]") == ["/1/fader1"]
+    # "/1/fader1" is a prefix of "/1/fader10"
+    assert trie.match("/1/{xy,fader10}") == ["/1/fader1", "/1/fader10", "/1/xy"]
+
+
+def test_address_patterns_with_prefix_keys():
+    trie = make_trie(["/1/fader", "/1/fa", "/1/xy", "/2/fader1"])
+    assert trie.match("/1/fader[1]") == ["/1/fader", "/1/fa"]
+    assert trie.match("/1/fader?") == ["/1/fader", "/1/fa"]
+    assert trie.match("/1/f*") == ["/1/fader", "/1/fa"]
+    assert trie.match("/1/fa?") == ["/1/fa"]
+    assert trie.match("/1/{fader,xy}2") == ["/1/fader", "/1/fa", "/1/xy"]
+    assert trie.match("/*/fader") == ["/1/fader", "/1/fa"]
+
+
+def test_match_address_part():
+    assert microosc.match_address_part("a*c", "abbbc")
+    assert not microosc.match_address_part("a*c", "abbbd")
+    assert microosc.match_address_part("[a-c]x", "bx")
+    assert microosc.match_address_part("{foo,bar}?", "bar1")
+    assert not microosc.match_address_part("{foo,bar}", "baz")
+    assert microosc.match_address_part("{foo,bar}?", "ba", partial=True)
+    assert not microosc.match_address_part("fa?", "fader", partial=True)
+
+
+def test_pathological_pattern_is_fast():
+    seen = []
+    dispatcher = microosc.OSCDispatcher({"/" + "a" * 40 + "/x": seen.append})
+    buf = bytearray(128)
+    for stars in (7, 12, 20):
+        addr = "/" + "*a" * stars + "*b/x"  # never matches, many ways to try
+        size = microosc.create_osc_packet(microosc.OscMsg(addr, [], []), buf)
+        start = time.monotonic()
+        dispatcher._handle_packet(buf, size)  # pylint: disable=protected-access
+        assert time.monotonic() - start < 0.5
+    assert not seen
+    assert microosc.match_address_part("*a" * 30 + "*", "a" * 40)
+
+
+def test_dispatch_map_edited_in_place():
+    seen = []
+    server = microosc.OSCServer(
+        socket, "127.0.0.1", 0, {"/a": lambda m: seen.append("a")}
+    )
+    dispatch_map = server.dispatch_map
+    msg = microosc.OscMsg("/a/b", [], ())
+    server._dispatch(msg)
+    dispatch_map["/a/b"] = lambda m: seen.append("ab")
+    server._dispatch(msg)
+    del dispatch_map["/a"]
+    server._dispatch(msg)
+    assert seen == ["a", "a", "ab", "ab"]
+    server._sock.close()
+
+
+def test_dispatch_map_same_size_edits():
+    seen = []
+    server = microosc.OSCServer(
+        socket, "127.0.0.1", 0, {"/a": lambda m: seen.append("a")}
+    )
+    dispatch_map = server.dispatch_map
+    server._dispatch(microosc.OscMsg("/a", [], ()))
+    del dispatch_map["/a"]
+    dispatch_map["/b"] = lambda m: seen.append("b")
+    server._dispatch(microosc.OscMsg("/a", [], ()))
+    server._dispatch(microosc.OscMsg("/b", [], ()))
+    assert seen == ["a", "b"]
+    dispatch_map["/b"] = lambda m: seen.append("b2")  # replaced in place
+    server._dispatch(microosc.OscMsg("/b", [], ()))
+    dispatch_map.update({"/b": lambda m: seen.append("b3")})
+    server._dispatch(microosc.OscMsg("/b", [], ()))
+    dispatch_map |= {"/b": lambda m: seen.append("b4")}
+    server._dispatch(microosc.OscMsg("/b", [], ()))
+    assert server.dispatch_map is dispatch_map
+    assert dispatch_map.pop("/b") and not dispatch_map
+    server._dispatch(microosc.OscMsg("/b", [], ()))
+    assert seen == ["a", "b", "b2", "b3", "b4"]
+    server._sock.close()
+
+
+def test_state_store():
+    handled = []
+    dispatcher = microosc.OSCDispatcher({"/": handled.append})
+    dispatcher.enable_state_store(max_addresses=2)
+    for i in range(50):
+        dispatcher._dispatch_packet(microosc.OscMsg("/1/fader1", [i * 0.01], ("f",)))
+    dispatcher._dispatch_packet(microosc.OscMsg("/1/fader2", [1], ("i",)))
+    dispatcher._dispatch_packet(microosc.OscMsg("/1/fader3", [2], ("i",)))  # table full
+
+    changed = [(m.addr, list(m.args)) for m in dispatcher.changed()]
+    assert changed == [("/1/fader1", [0.49]), ("/1/fader2", [1])]
+    assert [m.addr for m in handled] == ["/1/fader3"]
+    assert list(dispatcher.changed()) == []
+    assert dispatcher.get("/1/fader2").args == [1]
+    assert dispatcher.get("/nope") is None
+
+    dispatcher._dispatch_packet(microosc.OscMsg("/1/fader2", [5], ("i",)))
+    assert [m.args for m in dispatcher.changed()] == [[5]]
+
+
+def test_route_cache_and_interning():
+    handled = []
+    dispatcher = microosc.OSCDispatcher(
+        {"/1/fader": lambda m: handled.append(("a", m.addr))}
+    )
+    dispatcher.route_cache_size = 2
+    buf = bytearray(64)
+    msgs = []
+    for addr in ("/1/fader1", "/1/fader2", "/1/fader1", "/1/fader3"):
+        size = microosc.create_osc_packet(microosc.OscMsg(addr, [1], ("i",)), buf)
+        dispatcher._handle_packet(buf, size)
+    assert list(dispatcher._routes) == ["/1/fader1", "/1/fader3"]  # fader2 least recent
+
+    size = microosc.create_osc_packet(microosc.OscMsg("/1/fader1", [1], ("i",)), buf)
+    # invalidates cache
+    dispatcher.add_handler("/1/fader1", lambda m: msgs.append(m.addr))
+    dispatcher._handle_packet(buf, size)
+    dispatcher._handle_packet(buf, size)
+    assert msgs == ["/1/fader1", "/1/fader1"]
+    assert msgs[0] is msgs[1]  # same interned string
+    dispatcher.remove_handler("/1/fader")
+    handled.clear()
+    dispatcher._handle_packet(buf, size)
+    assert handled == [] and len(msgs) == 3
+    dispatcher.dispatch_map = {}
+    dispatcher._handle_packet(buf, size)
+    assert len(msgs) == 3
@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+import threading
+
+import microosc
+
+
+def test_query_reply_and_timeout():
+    params = {"/param/gain": 0.75}
+    seen = []
+
+    def answer(msg, src):
+        seen.append(src)
+        device.reply(microosc.OscMsg(msg.addr, [params[msg.addr]], ("f",)))
+
+    device = microosc.OSCEndpoint(socket, "127.0.0.1", 0, {"/param": answer})
+    device_addr = ("127.0.0.1", device._sock.getsockname()[1])
+    controller = microosc.OSCEndpoint(
+        socket, "127.0.0.1", 0, {"/": lambda msg, src: None}, remote=device_addr
+    )
+    controller_port = controller._sock.getsockname()[1]
+
+    running = True
+
+    def serve():
+        while running:
+            device.poll()
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    try:
+        reply = controller.query(microosc.OscMsg("/param/gain", [], ()))
+        assert reply.addr == "/param/gain" and reply.args == [0.75]
+        assert seen == [("127.0.0.1", controller_port)]
+        assert (
+            controller.query(microosc.OscMsg("/nothing", [], ()), timeout=0.05) is None
+        )
+
+        answers = []
+        controller.request(
+            microosc.OscMsg("/param/gain", [], ()), lambda msg, src: answers.append(src)
+        )
+        while not answers:
+            controller.poll()
+        assert answers == [device_addr]
+    finally:
+        running = False
+        thread.join()
+
+
+def test_stats_count_handlers():
+    seen = []
+    endpoint = microosc.OSCEndpoint(
+        socket, "127.0.0.1", 0, {"/a": lambda m, s: seen.append(s)}
+    )
+    stats = endpoint.enable_stats()
+    endpoint.source = ("10.0.0.1", 9000)
+    buf = bytearray(64)
+    for addr in ("/a/1", "/b"):
+        size = microosc.create_osc_packet(microosc.OscMsg(addr, [], ()), buf)
+        endpoint._handle_packet(buf, size)
+    assert seen == [("10.0.0.1", 9000)]
+    assert stats.route_hits == {"/a": 1} and stats.unmatched == 1
+    assert sum(stats.handler_time) == 1
+    endpoint._sock.close()
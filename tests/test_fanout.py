@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+import time
+
+import microosc
+import microosc_clients
+
+
+def make_servers(count):
+    servers, received = [], []
+    for _ in range(count):
+        got = []
+        servers.append(microosc.OSCServer(socket, "127.0.0.1", 0, {"/": got.append}))
+        received.append(got)
+    return servers, received
+
+
+def drain(servers):
+    time.sleep(0.05)
+    for server in servers:
+        server.poll_batch()
+
+
+def test_fanout_filters_and_join_leave():
+    servers, received = make_servers(3)
+    ports = [server._sock.getsockname()[1] for server in servers]
+    client = microosc_clients.FanoutOSCClient(
+        socket,
+        [("127.0.0.1", ports[0]), ("127.0.0.1", ports[1], ("/mixer", "/fx"))],
+        buf_size=256,
+    )
+    assert client.send(microosc.OscMsg("/mixer/gain", [0.5], ("f",))) == 2
+    assert client.send(microosc.OscMsg("/lights/1", [1], ("i",))) == 1
+    tmpl = client.template("/fx/wet", ("f",))
+    assert client.send_template(tmpl, 0.25) == 2
+    drain(servers)
+    assert [m.addr for m in received[0]] == ["/mixer/gain", "/lights/1", "/fx/wet"]
+    assert [m.addr for m in received[1]] == ["/mixer/gain", "/fx/wet"]
+
+    client.add_destination("127.0.0.1", ports[2])
+    client.remove_destination("127.0.0.1", ports[0])
+    msgs = [microosc.OscMsg("/lights/%d" % i, [i], ("i",)) for i in range(3)]
+    msgs.append(microosc.OscMsg("/mixer/mute", [True], ("T",)))
+    assert client.send_bundle(msgs) == 2  # one bundle each to ports 1 and 2
+    drain(servers)
+    assert len(received[0]) == 3
+    assert [m.addr for m in received[1][2:]] == ["/mixer/mute"]
+    assert [m.addr for m in received[2]] == [
+        "/lights/0",
+        "/lights/1",
+        "/lights/2",
+        "/mixer/mute",
+    ]
+    assert client.destinations == [("127.0.0.1", ports[1]), ("127.0.0.1", ports[2])]
+
+
+class FailingSocket:
+    """Wraps a socket so sending to one destination fails"""
+
+    def __init__(self, sock, bad_dest):
+        self._sock = sock
+        self.bad_dest = bad_dest
+
+    def sendto(self, data, dest):
+        if dest == self.bad_dest:
+            raise OSError(101, "Network is unreachable")
+        return self._sock.sendto(data, dest)
+
+
+def test_fanout_failing_destination():
+    servers, received = make_servers(3)
+    dests = [("127.0.0.1", server._sock.getsockname()[1]) for server in servers]
+    client = microosc_clients.FanoutOSCClient(socket, dests, buf_size=256)
+    real_sock = client._sock
+    client._sock = FailingSocket(real_sock, dests[1])
+    stats = client.enable_stats()
+    assert client.send(microosc.OscMsg("/a", [1], ("i",))) == 2
+    msgs = [microosc.OscMsg("/b", [i], ("i",)) for i in range(2)]
+    assert client.send_bundle(msgs) == 2
+    drain(servers)
+    assert [len(got) for got in received] == [3, 0, 3]
+    assert stats.packets_out == 4
+    assert stats.send_errors == {101: 2}
+    real_sock.close()
@@ -0,0 +1,179 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import random
+
+import pytest
+import microosc
+
+_PARSE_ERRORS = microosc._PARSE_ERRORS  # pylint: disable=protected-access
+
+_VALUES = {
+    "f": lambda rnd: rnd.randrange(-1000, 1000) / 8,  # exact in float32
+    "i": lambda rnd: rnd.randrange(-(2**31), 2**31),
+    "h": lambda rnd: rnd.randrange(-(2**63), 2**63),
+    "d": lambda rnd: rnd.random(),
+    "s": lambda rnd: "s" * rnd.randrange(12),
+    "b": lambda rnd: bytes(rnd.randrange(256) for _ in range(rnd.randrange(9))),
+    "c": lambda rnd: chr(rnd.randrange(32, 127)),
+    "T": lambda rnd: True,
+    "N": lambda rnd: None,
+}
+
+
+def random_msg(rnd, depth=0):
+    args, types = [], []
+    for _ in range(rnd.randrange(8)):
+        if depth < 2 and rnd.random() < 0.1:
+            inner = random_msg(rnd, depth + 1)
+            args.append(inner.args)
+            types += ["["] + list(inner.types) + ["]"]
+            continue
+        otype = rnd.choice(list(_VALUES))
+        args.append(_VALUES[otype](rnd))
+        types.append(otype)
+    addr = "/" + "/".join("a" * rnd.randrange(1, 6) for _ in range(rnd.randrange(1, 4)))
+    return microosc.OscMsg(addr, args, types)
+
+
+def plain(value):
+    """Packet contents as comparable values, with blobs as bytes"""
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    if isinstance(value, memoryview):
+        return bytes(value)
+    return value
+
+
+def outcome(data, size):
+    """What parsing data[:size] gives: the parsed packet, or the error type"""
+    try:
+        return plain(microosc.parse_osc_packet(data, size))
+    except _PARSE_ERRORS:
+        return "error"
+
+
+def test_roundtrip_random_messages():
+    rnd = random.Random(1)
+    buf = bytearray(1024)
+    for _ in range(500):
+        msg = random_msg(rnd)
+        size = microosc.create_osc_packet(msg, buf)
+        parsed = microosc.parse_osc_packet(buf, size)
+        assert parsed.addr == msg.addr and plain(parsed.args) == msg.args
+        assert plain(microosc.OscMsgView(buf, size).args) == msg.args
+
+
+def mutations(rnd, packet):
+    """Truncated, bit-flipped, shuffled and garbage versions of a valid packet"""
+    size = len(packet)
+    yield packet[: rnd.randrange(0, size + 1) // 4 * 4]
+    for _ in range(4):
+        bad = bytearray(packet)
+        for _ in range(rnd.randrange(1, 4)):
+            bad[rnd.randrange(size)] ^= 1 << rnd.randrange(8)
+        yield bad
+    bad = bytearray(packet)
+    bad[rnd.randrange(size)] = 0
+    yield bad
+    yield bytearray(rnd.randrange(256) for _ in range(size))
+    yield b"/" + bytes(rnd.randrange(1, 256) for _ in range(size - 1))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_malformed_packets_stay_in_bounds(seed):
+    """Parsing a packet in a reused buffer full of stale bytes gives the same
+    result as parsing an exact copy, so nothing past packet_size is read"""
+    rnd = random.Random(seed)
+    stale = bytearray(b"\xff" * 1024)
+    for _ in range(300):
+        msg = random_msg(rnd)
+        if rnd.random() < 0.3:
+            packet = bytearray(1024)
+            size = microosc.create_osc_bundle(microosc.OscBundle(1, [msg, msg]), packet)
+        else:
+            packet = bytearray(1024)
+            size = microosc.create_osc_packet(msg, packet)
+        for bad in mutations(rnd, bytes(packet[:size])):
+            n = len(bad)
+            stale[:] = b"\xff" * 1024
+            stale[:n] = bad
+            assert outcome(stale, n) == outcome(bytearray(bad), n)
+
+
+def test_bad_sizes_rejected_up_front():
+    buf = bytearray(64)
+    size = microosc.create_osc_packet(microosc.OscMsg("/abc", [1.0], "f"), buf)
+    for bad_size in (0, size - 1, size + 2, 65):
+        with pytest.raises(ValueError):
+            microosc.parse_osc_packet(buf, bad_size)
+    buf[0] = ord("x")
+    with pytest.raises(ValueError):
+        microosc.parse_osc_packet(buf, size)
+
+
+def test_truncated_args_and_bundles():
+    buf = bytearray(b"\xff" * 256)
+    size = microosc.create_osc_packet(microosc.OscMsg("/abc", [1, 2, 3], "iii"), buf)
+    with pytest.raises(ValueError):
+        microosc.parse_osc_packet(buf, size - 4)
+    size = microosc.create_osc_bundle(
+        microosc.OscBundle(1, [microosc.OscMsg("/abc", [1], "i")]), buf
+    )
+    with pytest.raises(ValueError):
+        microosc.parse_osc_packet(buf, size - 4)  # element runs past the packet
+    buf[19] += 1  # element size not a multiple of 4
+    with pytest.raises(ValueError):
+        microosc.parse_osc_packet(buf, size)
+
+
+def test_args_not_read_past_packet_size():
+    # a string with no null before packet_size, then stale nulls in the buffer
+    buf = bytearray(b"/a\x00\x00,s\x00\x00abcd" + bytes(64))
+    # a blob claiming more bytes than are left in the packet
+    blob = bytearray(b"/a\x00\x00,b\x00\x00\x00\x00\x00\x08abcd" + bytes(64))
+    for data, size in ((buf, 12), (blob, 16)):
+        with pytest.raises(ValueError):
+            microosc.parse_osc_packet(data, size)
+        with pytest.raises(ValueError):
+            microosc.OscMsgView(data, size).args[0]
+
+
+def test_dispatcher_survives_flood():
+    rnd = random.Random(7)
+    dispatcher = microosc.OSCDispatcher({"/": lambda msg: None})
+    dispatcher.enable_stats()
+    buf = bytearray(256)
+    dropped = 0
+    for _ in range(2000):
+        n = rnd.randrange(0, 64) // 4 * 4
+        buf[:n] = bytes(rnd.randrange(256) for _ in range(n))
+        buf[0] = rnd.choice(b"/#x")
+        if not dispatcher._handle_packet(buf, n):  # pylint: disable=protected-access
+            dropped += 1
+    assert 0 < dropped == sum(dispatcher.stats.parse_errors.values())
+
+
+def nested_bundles(depth):
+    packet = b"/a\x00\x00,\x00\x00\x00"
+    for _ in range(depth):
+        packet = b"#bundle\x00" + bytes(8) + len(packet).to_bytes(4, "big") + packet
+    return bytearray(packet)
+
+
+def test_deep_nesting_rejected():
+    dispatcher = microosc.OSCDispatcher({"/": lambda msg: None})
+    dispatcher.enable_stats()
+    deep = nested_bundles(3000)  # ~60KB, would blow the recursion limit
+    assert not dispatcher._handle_packet(deep, len(deep))  # pylint: disable=protected-access
+    ok = nested_bundles(8)
+    assert dispatcher._handle_packet(ok, len(ok))  # pylint: disable=protected-access
+
+    buf = bytearray(b"/a\x00\x00," + b"[" * 3000 + b"]" * 3000 + bytes(3))
+    size = len(buf)
+    with pytest.raises(ValueError):
+        microosc.parse_osc_packet(buf, size)
+    view = microosc.OscMsgView(buf, size)
+    with pytest.raises(ValueError):
+        view.args[0]  # pylint: disable=pointless-statement
+    assert sum(dispatcher.stats.parse_errors.values()) == 1
@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import pytest
+import microosc
+
+
+@pytest.mark.parametrize(
+    "args, types",
+    [
+        ([], ""),
+        ([1, 2.5, 3], "ifi"),
+        ([1, "hello", 2.5, b"\x01\x02\x03", "x", 7], "isfbsi"),
+        ([True, None, 3, 1 << 40, 0.125, "a", microosc.IMPULSE], "TNihdsI"),
+        ([1, [2, "two", [3.5]], "after", 9], "i[is[f]]si"),
+    ],
+)
+def test_view_matches_parse(args, types):
+    buf = bytearray(256)
+    size = microosc.create_osc_packet(microosc.OscMsg("/a/b", args, types), buf)
+    eager = microosc.parse_osc_packet(buf, size)
+    view = microosc.OscMsgView(buf, size)
+    assert view.addr == "/a/b" and view.types == eager.types
+    assert len(view.args) == len(eager.args)
+    assert view.args == eager.args
+    assert [view.args[i] for i in range(-1, -len(args) - 1, -1)] == eager.args[::-1]
+    assert view.args[1:3] == eager.args[1:3]
+    assert view.materialize() == eager
+    with pytest.raises(IndexError):
+        view.args[len(args)]
+    with pytest.raises(IndexError):
+        view.args[-len(args) - 1]
+
+
+def test_materialize_copies_blobs():
+    buf = bytearray(64)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/b", [[b"ab"], b"cd"], "[b]b"), buf
+    )
+    msg = microosc.OscMsgView(buf, size).materialize()
+    buf[:] = bytes(64)
+    assert msg.args == [[b"ab"], b"cd"]
+    assert isinstance(msg.args[1], bytes) and isinstance(msg.args[0][0], bytes)
+
+
+def test_dispatcher_lazy_args():
+    seen = []
+    dispatcher = microosc.OSCDispatcher(
+        {"/wide": lambda m: seen.append((type(m), m.args[0]))}
+    )
+    dispatcher.lazy_args = True
+    buf = bytearray(512)
+    size = microosc.create_osc_packet(
+        microosc.OscMsg("/wide", list(range(64)), "i" * 64), buf
+    )
+    dispatcher._handle_packet(buf, size)
+    assert seen == [(microosc.OscMsgView, 0)]
+
+    # bundles are still parsed eagerly
+    bundle = microosc.OscBundle(1, [microosc.OscMsg("/wide", [5], "i")])
+    size = microosc.create_osc_bundle(bundle, buf)
+    dispatcher._handle_packet(buf, size)
+    assert seen[1] == (microosc.OscMsg, 5)
+
+
+def test_dispatcher_lazy_args_malformed():
+    seen = []
+    dispatcher = microosc.OSCDispatcher({"/bad": lambda m: seen.append(m.args[1])})
+    dispatcher.lazy_args = True
+    stats = dispatcher.enable_stats()
+    buf = bytearray(64)
+    size = microosc.create_osc_packet(microosc.OscMsg("/bad", [1, "abc"], "is"), buf)
+    buf[size - 1] = ord("x")  # string is no longer terminated
+    assert not dispatcher._handle_packet(buf, size)
+    assert seen == [] and stats.parse_errors == {"ValueError": 1}
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+
+import pytest
+import microosc
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.opts = []
+        self.bound = None
+
+    def setsockopt(self, level, option, value):
+        self.opts.append((level, option, value))
+
+    def bind(self, addr):
+        self.bound = addr
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+
+class RecordingSource:
+    AF_INET = socket.AF_INET
+    SOCK_DGRAM = socket.SOCK_DGRAM
+
+    def __init__(self):
+        self.sock = RecordingSocket()
+
+    def socket(self, family, sock_type):
+        return self.sock
+
+
+def test_is_multicast():
+    assert microosc.is_multicast("224.0.0.1")
+    assert microosc.is_multicast("239.255.255.250")
+    assert not microosc.is_multicast("223.1.1.1")
+    assert not microosc.is_multicast("240.0.0.1")
+    assert not microosc.is_multicast("localhost")
+
+
+def test_server_joins_and_leaves_groups():
+    source = RecordingSource()
+    server = microosc.OSCServer(
+        source, "239.1.2.3", 5000, {}, timeout=0.5, rcvbuf=1 << 20, interface="10.0.0.2"
+    )
+    sock = source.sock
+    join = (
+        microosc.IPPROTO_IP,
+        microosc.IP_ADD_MEMBERSHIP,
+        bytes([239, 1, 2, 3, 10, 0, 0, 2]),
+    )
+    assert (microosc.SOL_SOCKET, microosc.SO_RCVBUF, 1 << 20) in sock.opts
+    assert join in sock.opts and sock.timeout == 0.5
+    assert server.groups == ["239.1.2.3"]
+
+    server.join_group("226.0.0.9", "10.0.0.3")
+    server.leave_group("239.1.2.3")
+    drop = (
+        microosc.IPPROTO_IP,
+        microosc.IP_DROP_MEMBERSHIP,
+        bytes([239, 1, 2, 3, 10, 0, 0, 2]),
+    )
+    assert sock.opts[-1] == drop
+    assert server.groups == ["226.0.0.9"]
+    with pytest.raises(ValueError):
+        server.join_group("10.0.0.1")
+
+
+def test_client_multicast_options():
+    source = RecordingSource()
+    microosc.OSCClient(
+        source,
+        "239.1.2.3",
+        5000,
+        ttl=8,
+        sndbuf=65536,
+        interface="10.0.0.2",
+        multicast_loop=False,
+    )
+    assert source.sock.opts == [
+        (microosc.SOL_SOCKET, microosc.SO_SNDBUF, 65536),
+        (microosc.IPPROTO_IP, microosc.IP_MULTICAST_TTL, 8),
+        (microosc.IPPROTO_IP, microosc.IP_MULTICAST_IF, bytes([10, 0, 0, 2])),
+        (microosc.IPPROTO_IP, microosc.IP_MULTICAST_LOOP, 0),
+    ]
+    unicast = RecordingSource()
+    microosc.OSCClient(unicast, "127.0.0.1", 5000)
+    assert unicast.sock.opts == []
+
+
+def test_kernel_buffer_sizes():
+    server = microosc.OSCServer(socket, "127.0.0.1", 0, {}, rcvbuf=1 << 18)
+    client = microosc.OSCClient(socket, "127.0.0.1", 5000, sndbuf=1 << 17)
+    # Linux doubles the size asked for, others may cap it
+    assert server._sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 1 << 17
+    assert client._sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) >= 1 << 16
+    server._sock.close()
+    client._sock.close()
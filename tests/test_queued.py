@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import time
+import socket
+
+import pytest
+import microosc
+import microosc_clients
+
+
+def make_queued_pair(**kwargs):
+    received = []
+    server = microosc.OSCServer(
+        socket, "127.0.0.1", 0, {"/": received.append}, buf_size=2048, batch_size=64
+    )
+    port = server._sock.getsockname()[1]
+    client = microosc_clients.QueuedOSCClient(socket, "127.0.0.1", port, **kwargs)
+    return server, client, received
+
+
+def drain(server, count, timeout=2):
+    deadline = time.monotonic() + timeout
+    while count() and time.monotonic() < deadline:
+        server.poll_batch()
+
+
+def test_packs_messages_into_mtu_bundles():
+    server, client, received = make_queued_pair(mtu=256)
+    stats = client.enable_stats()
+    for i in range(40):
+        assert client.send(microosc.OscMsg("/n", [i], "i")) in (0, 1)
+    client.flush()
+    drain(server, lambda: len(received) < 40)
+    assert [msg.args[0] for msg in received] == list(range(40))
+    # 12 bytes per "/n ,i" message plus 4 for its size, 16 for each bundle header
+    assert stats.packets_out == 40 // ((256 - 16) // 16) + 1
+    assert stats.bytes_out <= 40 * 16 + 16 * stats.packets_out
+
+
+def test_single_message_sent_plain():
+    server, client, _ = make_queued_pair()
+    client.send(microosc.OscMsg("/one", [1.5], "f"))
+    assert client.poll() == 0  # not due yet
+    time.sleep(client.max_delay)
+    assert client.poll() == 1
+    buf = bytearray(64)
+    server._sock.settimeout(1)
+    size = server._sock.recv_into(buf)
+    assert buf[0] == ord("/")
+    expected = microosc.OscMsg("/one", [1.5], ["f"])
+    assert microosc.parse_osc_packet(buf, size) == expected
+
+
+def test_oversize_detected_up_front():
+    _, client, _ = make_queued_pair(mtu=64)
+    with pytest.raises(ValueError):
+        client.send(microosc.OscMsg("/big", ["x" * 60], "s"))
+    assert client.flush() == 0  # nothing was queued
+
+    plain = microosc.OSCClient(socket, "127.0.0.1", 9, buf_size=32)
+    with pytest.raises(ValueError):
+        plain.send(microosc.OscMsg("/big", ["x" * 60], "s"))
+    assert len(plain._buf) == 32
+
+
+def test_other_sends_flush_first():
+    server, client, received = make_queued_pair()
+    client.send(microosc.OscMsg("/a", [1], "i"))
+    client.send_template(client.template("/b", "i"), 2)
+    drain(server, lambda: len(received) < 2)
+    assert [msg.addr for msg in received] == ["/a", "/b"]
+
+
+def test_background_flusher():
+    server, client, received = make_queued_pair(mtu=128, arena_size=512, max_delay=0.01)
+    client.start_flusher()
+    try:
+        for i in range(500):
+            client.send(microosc.OscMsg("/n", [i], "i"))
+            if i % 50 == 0:
+                server.poll_batch()  # keep the socket buffer from filling
+        client.send(microosc.OscMsg("/last", [0], "i"))
+        drain(server, lambda: len(received) < 501)  # sent by the deadline, no flush()
+    finally:
+        client.stop_flusher()
+    assert [msg.args[0] for msg in received[:500]] == list(range(500))
+    assert received[-1].addr == "/last"
@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import pytest
+import microosc
+
+
+def send(dispatcher, addr, args, types):
+    buf = bytearray(128)
+    size = microosc.create_osc_packet(microosc.OscMsg(addr, args, types), buf)
+    return dispatcher._handle_packet(buf, size)  # pylint: disable=protected-access
+
+
+def test_bind_placeholders_to_args():
+    calls, others = [], []
+    dispatcher = microosc.OSCDispatcher({"/": others.append})
+    dispatcher.bind("/mixer/ch/{n}", ",fif", lambda *a: calls.append(a))
+    dispatcher.bind("/ch{n}/{name}", "f", lambda *a: calls.append(a))
+    send(dispatcher, "/mixer/ch/3", [0.5, 1, -0.25], "fif")
+    send(dispatcher, "/mixer/ch/3", [0.75, 0, 0.0], "fif")
+    send(dispatcher, "/ch12/pan", [0.5], "f")
+    assert calls == [(3, 0.5, 1, -0.25), (3, 0.75, 0, 0.0), (12, "pan", 0.5)]
+    assert not others
+
+    # other type tags, addresses or sizes go to the dispatch_map
+    send(dispatcher, "/mixer/ch/3", [0.5, 1], "fi")
+    send(dispatcher, "/mixer/ch/3/x", [0.5, 1, 0.5], "fif")
+    send(dispatcher, "/mixer/ch/", [0.5, 1, 0.5], "fif")
+    send(dispatcher, "/ch/pan", [0.5], "f")
+    assert len(calls) == 3 and len(others) == 4
+
+
+def test_bind_record():
+    seen, others = [], []
+    dispatcher = microosc.OSCDispatcher({"/": others.append})
+    schema = dispatcher.bind(
+        "/mixer/ch/{n}",
+        ",fif",
+        lambda r: seen.append((r, r.n, r.gain, r.mute, r.pan)),
+        names=("gain", "mute", "pan"),
+    )
+    send(dispatcher, "/mixer/ch/1", [0.5, 1, -0.25], "fif")
+    send(dispatcher, "/mixer/ch/2", [0.25, 0, 0.5], "fif")
+    assert [s[1:] for s in seen] == [(1, 0.5, 1, -0.25), (2, 0.25, 0, 0.5)]
+    assert seen[0][0] is seen[1][0] is schema.record  # one reused record
+
+    dispatcher.unbind(schema)
+    send(dispatcher, "/mixer/ch/1", [0.5, 1, -0.25], "fif")
+    assert len(seen) == 2 and others[0].args == [0.5, 1, -0.25]
+
+
+def test_bind_in_bundle_with_stats_and_state():
+    calls, others = [], []
+    dispatcher = microosc.OSCDispatcher({"/": others.append})
+    dispatcher.bind("/mixer/ch/{n}", ",fif", lambda *a: calls.append(a))
+    stats = dispatcher.enable_stats()
+    bundle = microosc.OscBundle(
+        microosc.TIMETAG_IMMEDIATELY,
+        [
+            microosc.OscMsg("/mixer/ch/3", [0.5, 1, -0.25], ("f", "i", "f")),
+            microosc.OscMsg("/mixer/ch/3", [0.5, 1], ("f", "i")),  # other types
+        ],
+    )
+    buf = bytearray(128)
+    size = microosc.create_osc_bundle(bundle, buf)
+    assert dispatcher._handle_packet(buf, size)  # pylint: disable=protected-access
+    assert calls == [(3, 0.5, 1, -0.25)]
+    assert [m.args for m in others] == [[0.5, 1]]
+    assert stats.route_hits == {"/mixer/ch/{n}": 1, "/": 1}
+
+    send(dispatcher, "/mixer/ch/4", [0.25, 0, 0.5], "fif")
+    assert calls[-1] == (4, 0.25, 0, 0.5)
+    assert stats.route_hits["/mixer/ch/{n}"] == 2 and stats.unmatched == 0
+
+    # the state store keeps bound messages, and dispatches them if asked
+    dispatcher.enable_state_store(dispatch=True)
+    send(dispatcher, "/mixer/ch/5", [0.75, 1, 0.0], "fif")
+    assert calls[-1] == (5, 0.75, 1, 0.0)
+    assert dispatcher.get("/mixer/ch/5").args == [0.75, 1, 0.0]
+
+
+def test_schema_rejects_truncated():
+    calls = []
+    dispatcher = microosc.OSCDispatcher({"/": calls.append})
+    dispatcher.bind("/x", "ii", lambda *a: calls.append(a))
+    buf = bytearray(b"\xff" * 64)
+    size = microosc.create_osc_packet(microosc.OscMsg("/x", [1, 2], "ii"), buf)
+    assert not dispatcher._handle_packet(buf, size - 4)  # pylint: disable=protected-access
+    assert not calls
+
+
+def test_schema_types_checked():
+    with pytest.raises(ValueError):
+        microosc.OscSchema("/x", "s", print)
+    with pytest.raises(ValueError):
+        microosc.OscSchema("/x", "ff", print, names=("a",))
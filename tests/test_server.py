@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+
+import microosc
+
+
+def make_pair(**kwargs):
+    received = []
+    server = microosc.OSCServer(
+        socket, "127.0.0.1", 0, {"/": received.append}, **kwargs
+    )
+    port = server._sock.getsockname()[1]
+    client = microosc.OSCClient(socket, "127.0.0.1", port, buf_size=512)
+    return server, client, received
+
+
+def test_poll_batch_drains_burst():
+    server, client, received = make_pair(batch_size=64)
+    for i in range(50):
+        client.send(microosc.OscMsg("/n", [i], ("i",)))
+    client.send(microosc.OscMsg("/big", ["x" * 200], ("s",)))  # > buf_size
+
+    processed = dropped = 0
+    for _ in range(10):
+        p, d = server.poll_batch()
+        processed += p
+        dropped += d
+        if processed + dropped >= 51:
+            break
+    assert processed == 50
+    assert dropped == 1
+    assert [m.args[0] for m in received] == list(range(50))
+
+
+def test_poll_batch_limits():
+    server, client, received = make_pair(batch_size=8, buf_size=64)
+    for i in range(20):
+        client.send(microosc.OscMsg("/n", [i], ("i",)))
+    server._sock.settimeout(0.5)
+    server.poll()  # wait for the first to arrive
+    assert server.poll_batch(max_packets=4) == (4, 0)
+    total = 5
+    while total < 20:
+        total += server.poll_batch()[0]
+    assert len(received) == 20
+
+
+def test_stats():
+    server, client, received = make_pair(batch_size=8, buf_size=64)
+    server.dispatch_map = {"/a": lambda msg: None}
+    stats = server.enable_stats()
+    tx_stats = client.enable_stats()
+
+    client.send(microosc.OscMsg("/a/1", [1], ("i",)))
+    client.send(microosc.OscMsg("/b", [2], ("i",)))  # unmatched
+    client.send(microosc.OscMsg("/big", ["x" * 100], ("s",)))  # truncated
+    bad = b"/\xff\x00\x00,\x00\x00\x00"  # not ascii
+    client._sock.sendto(bad, ("127.0.0.1", server._sock.getsockname()[1]))
+
+    server._sock.settimeout(0.5)
+    for _ in range(4):
+        server.poll()
+    server.poll_batch()  # nothing left, a timeout is not an error
+
+    assert tx_stats.packets_out == 3
+    assert stats.packets_in == 4
+    assert stats.truncated == 1
+    assert stats.unmatched == 1
+    assert stats.route_hits == {"/a": 1}
+    assert sum(stats.parse_errors.values()) == 1
+    assert stats.recv_errors == {}
+    assert sum(stats.handler_time) == 1
+    assert sum(stats.parse_time) == 2
+    snap = stats.snapshot()
+    stats.reset()
+    assert snap["packets_in"] == 4 and stats.packets_in == 0
+
+
+def test_idle_poll_is_not_an_error():
+    server, client, _ = make_pair(timeout=0.01)
+    stats = server.enable_stats()
+    for _ in range(3):
+        server.poll()  # times out, nothing was sent
+    assert stats.packets_in == 0
+    assert stats.recv_errors == {}
+    server._sock.close()
+    client._sock.close()
+
+
+def test_packet_of_buf_size_not_truncated():
+    server, client, received = make_pair(buf_size=64)
+    stats = server.enable_stats()
+    server._sock.settimeout(0.5)
+    fits = microosc.OscMsg("/fits", ["x" * 50], ("s",))  # exactly 64 bytes
+    assert microosc.osc_packet_size(fits) == 64
+    client.send(fits)
+    client.send(microosc.OscMsg("/too/big", ["x" * 50], ("s",)))  # 68 bytes
+    server.poll()
+    server.poll()
+    assert [m.addr for m in received] == ["/fits"]
+    assert stats.truncated == 1
+
+    client.send(fits)
+    client.send(fits)
+    server.poll()  # wait for them to arrive
+    assert server.poll_batch() == (1, 0)
+    assert len(received) == 3
+    server._sock.close()
+    client._sock.close()
@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+import tracemalloc
+
+import microosc
+
+
+def peak_alloc(func, iterations=1000):
+    """Peak bytes allocated while calling func over and over, after warming up"""
+    for _ in range(50):
+        func()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in range(iterations):
+            func()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def test_static_mode_send_receive_allocates_nothing():
+    last = {"/1/fader1": None, "/1/xy1": None}
+
+    def on_fader(msg):
+        last["/1/fader1"] = msg.args[0]
+
+    def on_xy(msg):
+        last["/1/xy1"] = msg.args[1]
+
+    server = microosc.OSCServer(
+        socket,
+        "127.0.0.1",
+        0,
+        {"/1/fader": on_fader, "/1/xy": on_xy},
+        static_addresses=8,
+    )
+    port = server._sock.getsockname()[1]
+    client = microosc.OSCClient(socket, "127.0.0.1", port, static_addresses=8)
+    fader = microosc.OscMsg("/1/fader1", [0.5], ("f",))
+    xy = microosc.OscMsg("/1/xy1", [0.25, 0.75], ("f", "f"))
+
+    def send_and_receive():
+        client.send(fader)
+        server.poll()
+        client.send(xy)
+        server.poll()
+
+    # allow for the loop itself and for noise, well below any buffer, message or string
+    floor = peak_alloc(lambda: None)
+    assert peak_alloc(send_and_receive) <= floor + 64
+    assert last == {"/1/fader1": 0.5, "/1/xy1": 0.75}
+
+
+def test_static_strings_table():
+    table = microosc._StaticStrings(3)
+    buf = bytearray(64)
+    addrs = [
+        "/mixer/ch1/fader",
+        "/mixer/ch2/fader",
+        "/mixer/ch3/fader",
+        "/mixer/ch4/fader",
+    ]
+    for addr in addrs + addrs:
+        microosc.pack_string(addr, buf, 0)
+        value, end = table.read(buf, 0, 0)
+        assert value == addr and end == 20
+    assert table.count == 3  # the fourth is decoded every time
+    microosc.pack_string(",ff", buf, 0)
+    assert table.read(buf, 0, 1) == ("ff", 4)
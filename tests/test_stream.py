@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import os
+import socket
+
+import pytest
+import microosc
+import microosc_stream
+
+
+def test_slip_encode_escapes():
+    data = bytearray(b"/a\x00\x00,b\x00\x00\x00\x00\x00\x02\xc0\xdb\x00\x00")
+    out = bytearray(64)
+    end = microosc_stream.slip_encode(data, len(data), out)
+    assert (
+        out[:end]
+        == b"\xc0/a\x00\x00,b\x00\x00\x00\x00\x00\x02\xdb\xdc\xdb\xdd\x00\x00\xc0"
+    )
+
+    packets = []
+    decoder = microosc_stream.OSCStreamDecoder(
+        lambda d, n: packets.append(bytes(d[:n]))
+    )
+    for i in range(end):  # one byte at a time
+        decoder.feed(out[i : i + 1])
+    assert packets == [bytes(data)]
+
+
+@pytest.mark.parametrize(
+    "framing", [microosc_stream.FRAMING_SLIP, microosc_stream.FRAMING_LENGTH]
+)
+def test_socketpair_roundtrip(framing):
+    a, b = socket.socketpair()
+    b.setblocking(False)
+    received = []
+    blobs = []  # blob args are views into the receive buffer, copy them in the handler
+    dispatch_map = {
+        "/blob": lambda m: blobs.append(bytes(m.args[0])),
+        "/n": received.append,
+    }
+    receiver = microosc_stream.OSCStreamReceiver(b, dispatch_map, framing=framing)
+    stats = receiver.enable_stats()
+    client = microosc_stream.OSCStreamClient(a, framing=framing)
+
+    client.send(microosc.OscMsg("/blob", [bytes(range(256))[:50]], ("b",)))
+    client.send_bundle([microosc.OscMsg("/n", [i], ("i",)) for i in range(5)])
+    while receiver.poll():
+        pass
+    assert blobs == [bytes(range(50))]
+    assert [m.args[0] for m in received] == list(range(5))
+    assert stats.packets_in == 2 and sum(stats.parse_time) == 2
+    a.close()
+    b.close()
+
+
+@pytest.mark.parametrize(
+    "framing", [microosc_stream.FRAMING_SLIP, microosc_stream.FRAMING_LENGTH]
+)
+def test_pipe_and_overflow(framing):
+    rfd, wfd = os.pipe()
+    os.set_blocking(rfd, False)
+    reader = open(rfd, "rb", buffering=0)
+    writer = open(wfd, "wb", buffering=0)
+    received = []
+    receiver = microosc_stream.OSCStreamReceiver(
+        reader, {"/": received.append}, framing=framing, buf_size=64
+    )
+    client = microosc_stream.OSCStreamClient(writer, framing=framing, buf_size=256)
+
+    client.send(microosc.OscMsg("/big", ["x" * 100], ("s",)))  # too big for receiver
+    client.send(microosc.OscMsg("/ok", [1.5], ("f",)))
+    while receiver.poll():
+        pass
+    assert [m.addr for m in received] == ["/ok"]
+    assert receiver.decoder.overflows == 1
+    reader.close()
+    writer.close()
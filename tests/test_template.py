@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import socket
+
+import pytest
+import microosc
+
+
+def test_template_matches_create_osc_packet():
+    packet1 = bytearray(64)
+    packet2 = bytearray(64)
+
+    tmpl = microosc.OscTemplate("/1/xyz", ("f", "i", "f"))
+    size1 = tmpl.pack_into(packet1, 0, 0.5, 3, 0.25)
+    msg = microosc.OscMsg("/1/xyz", [0.5, 3, 0.25], ("f", "i", "f"))
+    size2 = microosc.create_osc_packet(msg, packet2)
+
+    assert size1 == size2 == tmpl.size
+    assert packet1 == packet2
+
+
+def test_template_rejects_strings():
+    with pytest.raises(ValueError):
+        microosc.OscTemplate("/1/message", ("s",))
+
+
+def test_send_template():
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(("127.0.0.1", 0))
+    rx.settimeout(0.5)
+    client = microosc.OSCClient(socket, "127.0.0.1", rx.getsockname()[1])
+
+    tmpl = client.template("/1/xy1", ("f", "f"))
+    for i in range(3):
+        client.send_template(tmpl, i * 0.25, 1.0)
+        data = bytearray(rx.recv(128))
+        msg = microosc.parse_osc_packet(data, len(data))
+        assert msg.addr == "/1/xy1"
+        assert msg.args == pytest.approx([i * 0.25, 1.0])
+
+    client.send(microosc.OscMsg("/x", [1], ("i",)))  # overwrites the header
+    client.send_template(tmpl, 0.5, 0.5)
+    rx.recv(128)
+    data = bytearray(rx.recv(128))
+    assert microosc.parse_osc_packet(data, len(data)).addr == "/1/xy1"
+    rx.close()
@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import pytest
+import microosc
+
+
+def roundtrip(msg):
+    packet = bytearray(256)
+    packet_size = microosc.create_osc_packet(msg, packet)
+    assert packet_size % 4 == 0
+    assert packet_size == microosc.osc_packet_size(msg)
+    return microosc.parse_osc_packet(packet, packet_size)
+
+
+def test_all_types():
+    args = [
+        1.5, 2, 2**40, 5 << 32, 0.1, 0xFF00FF80, b"\x90\x3c\x7f\x00",
+        "hi", "sym", b"blob!", "x", True, False, None, microosc.IMPULSE,
+    ]  # fmt: skip
+    types = ("f", "i", "h", "t", "d", "r", "m", "s", "S", "b", "c", "T", "F", "N", "I")
+    msg = roundtrip(microosc.OscMsg("/all", args, types))
+
+    assert msg.types == list(types)
+    assert msg.args[0] == 1.5
+    assert msg.args[1:6] == [2, 2**40, 5 << 32, 0.1, 0xFF00FF80]
+    assert msg.args[6] == b"\x90\x3c\x7f\x00"
+    assert msg.args[7:9] == ["hi", "sym"]
+    assert isinstance(msg.args[9], memoryview)
+    assert bytes(msg.args[9]) == b"blob!"
+    assert msg.args[10:] == ["x", True, False, None, microosc.IMPULSE]
+
+
+def test_arrays():
+    types = ("i", "[", "f", "[", "s", "]", "]", "i")
+    msg = roundtrip(microosc.OscMsg("/arr", [1, [0.5, ["a"]], 3], types))
+    assert msg.args == [1, [0.5, ["a"]], 3]
+    assert msg.types == list(types)
+
+
+def test_coerce_and_unknown():
+    msg = roundtrip(microosc.OscMsg("/c", [3.7, 4], ("i", "f")))
+    assert msg.args == [3, pytest.approx(4.0)]
+    with pytest.raises(ValueError):
+        microosc.create_osc_packet(microosc.OscMsg("/x", [1], ("Q",)), bytearray(64))
+    packet = bytearray(b"/x\x00\x00,qi\x00\x00\x00\x00\x05")
+    with pytest.raises(ValueError):
+        microosc.parse_osc_packet(packet, len(packet))
+    with pytest.raises(ValueError):
+        microosc.OscMsgView(packet, len(packet)).args[0]
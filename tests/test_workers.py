@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 Tod Kurt
+# SPDX-License-Identifier: MIT
+
+import time
+import socket
+import threading
+
+import pytest
+import microosc
+import microosc_workers
+
+
+def test_shm_ring():
+    ring = microosc_workers.ShmRing(64)
+    out = bytearray(64)
+    try:
+        for i in range(20):  # enough to wrap around several times
+            data = bytes([i]) * (5 + i % 7)
+            assert ring.put(data, len(data))
+            assert ring.get(out) == len(data)
+            assert out[: len(data)] == data
+        assert ring.get(out) == -1
+        count = 0
+        while ring.put(b"x" * 20, 20):
+            count += 1
+        assert 1 <= count <= 64 // 24  # stops when full
+        while ring.get(out) == 20:
+            count -= 1
+        assert count == 0
+    finally:
+        ring.close(unlink=True)
+
+
+def count_handler(msg):
+    count_handler.total = getattr(count_handler, "total", 0) + msg.args[0]
+    return count_handler.total
+
+
+def test_workers_share_port():
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    server = microosc_workers.MultiprocessOSCServer(
+        "127.0.0.1", port, {"/count": count_handler}, num_workers=2
+    )
+    server.start()
+    try:
+        time.sleep(0.3)  # let workers bind
+        client = microosc.OSCClient(socket, "127.0.0.1", port)
+        for _ in range(100):
+            client.send(microosc.OscMsg("/count", [1], ("i",)))
+        results = []
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            server.collect(results.append)
+            if server.stats()["packets"] >= 100 and results:
+                break
+            time.sleep(0.02)
+        stats = server.stats()
+        assert stats["packets"] == 100
+        assert sum(stats["per_worker"]) == 100
+        assert results and all(r.addr == "/count" for r in results)
+    finally:
+        server.stop()
+
+
+def bad_result_handler(msg):
+    kind = msg.args[0]
+    if kind == 0:
+        raise RuntimeError("handler failed")
+    return {1: b"\xff", 2: "\u00e9", 3: 2**70, 4: "x" * 2000, 5: object()}.get(
+        kind, kind
+    )
+
+
+def test_worker_survives_handler_errors():
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    server = microosc_workers.MultiprocessOSCServer(
+        "127.0.0.1",
+        port,
+        {"/bad": bad_result_handler},
+        num_workers=1,
+        flush_interval=0.01,
+    )
+    server.start()
+    try:
+        time.sleep(0.3)  # let workers bind
+        client = microosc.OSCClient(socket, "127.0.0.1", port)
+        results = []
+        for kind in (0, 1, 2, 3, 4, 5, 6):
+            client.send(microosc.OscMsg("/bad", [kind], ("i",)))
+            time.sleep(0.1)  # so each result is flushed on its own
+            server.collect(results.append)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not any(
+            list(r.args) == [6] for r in results
+        ):
+            server.collect(results.append)
+            time.sleep(0.02)
+        stats = server.stats()
+        assert stats["packets"] == 7
+        assert stats["errors"] == 5  # raised, non-ASCII, int, too long, object
+        assert [list(r.args) for r in results] == [[b"\xff"], [6]]
+    finally:
+        server.stop()
+
+
+def make_pool_server(dispatch_map, **kwargs):
+    return microosc_workers.ThreadPoolOSCServer(
+        socket, "127.0.0.1", 0, dispatch_map, **kwargs
+    )
+
+
+def feed(server, addr, values):
+    buf = bytearray(64)
+    for value in values:
+        size = microosc.create_osc_packet(microosc.OscMsg(addr, [value], "i"), buf)
+        server._handle_packet(buf, size)  # pylint: disable=protected-access
+
+
+def test_thread_pool_order_and_parallelism():
+    seen = []
+    b_done = threading.Event()
+
+    def slow_a(msg):
+        assert b_done.wait(2)  # /b runs while /a is blocked
+        seen.append(("a", msg.args[0]))
+
+    def fast_b(msg):
+        seen.append(("b", msg.args[0]))
+        if msg.args[0] == 99:
+            b_done.set()
+
+    server = make_pool_server(
+        {"/a": slow_a, "/b": fast_b}, reuse_msg=True, max_queue=200
+    )
+    osc_stats = server.enable_stats()
+    feed(server, "/a", range(100))
+    feed(server, "/b", range(100))
+    assert server.join(5)
+    server.close()
+    assert [v for k, v in seen if k == "a"] == list(range(100))
+    assert [v for k, v in seen if k == "b"] == list(range(100))
+    assert seen.index(("b", 99)) < seen.index(("a", 0))
+    stats = server.queue_stats()
+    assert stats["queued"] == stats["handled"] == 200 and stats["waiting"] == 0
+    assert osc_stats.route_hits == {"/a": 100, "/b": 100}
+    assert sum(osc_stats.handler_time) == 200
+
+
+@pytest.mark.parametrize(
+    "overflow, expected, dropped, coalesced",
+    [
+        (microosc_workers.OVERFLOW_DROP_OLDEST, [0, 4, 5], 3, 0),
+        (microosc_workers.OVERFLOW_DROP_NEWEST, [0, 1, 2], 3, 0),
+        (microosc_workers.OVERFLOW_COALESCE, [0, 1, 5], 0, 3),
+    ],
+)
+def test_thread_pool_overflow(overflow, expected, dropped, coalesced):
+    seen = []
+    started, release = threading.Event(), threading.Event()
+
+    def handler(msg):
+        started.set()
+        release.wait(2)
+        seen.append(msg.args[0])
+
+    server = make_pool_server({"/q": handler}, max_queue=2, overflow=overflow)
+    feed(server, "/q", [0])
+    assert started.wait(2)  # 0 is being handled, the rest queue up
+    feed(server, "/q", range(1, 6))
+    assert server.queue_depths() == {"/q": 2}
+    release.set()
+    server.close()
+    assert seen == expected
+    stats = server.queue_stats()
+    assert stats["dropped"] == dropped and stats["coalesced"] == coalesced
+    assert stats["max_depth"] == 2
+
+
+def test_thread_pool_detaches_blobs():
+    seen = []
+    server = make_pool_server({"/blob": seen.append}, reuse_msg=True)
+    buf = bytearray(64)
+    size = microosc.create_osc_packet(microosc.OscMsg("/blob", [b"abcd"], "b"), buf)
+    server._handle_packet(buf, size)  # pylint: disable=protected-access
+    buf[:] = bytes(64)
+    server.close()
+    assert seen[0].args == [b"abcd"] and isinstance(seen[0].args[0], bytes)